@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmark MarkdownToPDFTool render time and peak memory against table size.
+
+Usage:
+    python benchmarks/bench_markdown_to_pdf.py [--rows 500 1000 2000 4000] [--rows-per-table 40]
+
+With chunked rendering the per-row time should stay roughly flat as the row
+count grows (linear total time), and peak traced memory should not scale with
+the number of rows laid out.
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from internal_audit_validation_system.tools.custom_tool import MarkdownToPDFTool
+
+HEADER = (
+    "| Source Name | Section / Clause | Key Excerpt | Relevance to Observation | "
+    "Document Path / URL | Effective Date | Confidence | Link or Reference |\n"
+    "|---|---|---|---|---|---|---|---|\n"
+)
+
+
+def _synthetic_table(rows: int) -> str:
+    body = "".join(
+        f"| HKMA SPM Module {i % 17} | {i % 9}.{i % 5}.{i % 3} | "
+        f"Authorized institutions should assess customer risk profile item {i} before sale. | "
+        f"Demonstrates regulatory requirement {i}. | https://www.hkma.gov.hk/doc/{i}.pdf | "
+        f"2023-0{1 + i % 9}-01 | High | N/A |\n"
+        for i in range(rows)
+    )
+    return "# Policy Retrieval\n\n" + HEADER + body
+
+
+def _render(rows: int, rows_per_table: int, workdir: Path):
+    md_path = workdir / f"table_{rows}.md"
+    md_path.write_text(_synthetic_table(rows), encoding="utf-8")
+    tool = MarkdownToPDFTool(rows_per_table=rows_per_table)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    message = tool._run(str(md_path))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if not message.startswith("Success"):
+        raise RuntimeError(message)
+    return elapsed, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--rows-per-table", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>8} {'seconds':>10} {'ms/row':>8} {'peak MiB':>10}")
+        for rows in args.rows:
+            elapsed, peak = _render(rows, args.rows_per_table, Path(tmp))
+            print(f"{rows:>8} {elapsed:>10.2f} {elapsed * 1000 / rows:>8.2f} {peak / 2**20:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
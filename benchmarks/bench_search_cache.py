@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Benchmark CachedSearchTool against a local search stand-in.
+
+Simulates several concurrent observations whose agents issue overlapping
+regulator queries, then a second "run" that repeats them, and reports wall
+time and backend calls with the cache, single-flight and normalisation in place.
+
+Usage:
+    python benchmarks/bench_search_cache.py [--latency 1.0] [--workers 8]
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from internal_audit_validation_system.tools.search import CachedSearchTool, LocalSearchBackend, search_stats
+
+QUERIES = [
+    "HKMA suitability assessment site:hkma.gov.hk",
+    "site:hkma.gov.hk suitability assessment HKMA",
+    "SFC Code of Conduct paragraph 5.2 know your client",
+    "sfc code of conduct know your client paragraph 5.2",
+    "SFC risk profiling investment products site:sfc.hk",
+    "HKMA investor protection measures selling investment products",
+    "hkma investor protection measures, selling investment products",
+    "SFC suitability FAQ site:sfc.hk",
+]
+
+
+def _run_batch(tool: CachedSearchTool, workers: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda query: tool._run(search_query=query), QUERIES * 4))
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="Simulated seconds per backend call")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent agents issuing queries")
+    args = parser.parse_args()
+
+    backend = LocalSearchBackend(latency=args.latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = CachedSearchTool(backend=backend, cache_path=str(Path(tmp) / "search.sqlite3"))
+        cold = _run_batch(tool, args.workers)
+        cold_calls = backend.calls
+        warm = _run_batch(tool, args.workers)
+
+    total = len(QUERIES) * 4
+    print(f"queries per run:        {total}")
+    print(f"uncached estimate:      {total * args.latency:.2f}s sequential, {total} backend calls")
+    print(f"cold run:               {cold:.2f}s, {cold_calls} backend calls")
+    print(f"warm run:               {warm:.2f}s, {backend.calls - cold_calls} backend calls")
+    print(f"stats:                  {search_stats().as_dict()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,36 +12,16 @@ import re
 import html
 from pathlib import Path
 
-def parse_markdown_table(md_content):
-    """Extract table data from markdown content."""
-    lines = md_content.strip().split('\n')
+from internal_audit_validation_system.policy_table import load_policy_table, parse_markdown_table as parse_policy_table
 
-    # Find the table
-    table_start = None
-    for i, line in enumerate(lines):
-        if '|' in line and 'Source Name' in line:
-            table_start = i
-            break
 
-    if table_start is None:
+def parse_markdown_table(md_content):
+    """Extract table data from markdown content."""
+    table = parse_policy_table(md_content)
+    if table is None:
         return None, []
-
-    # Parse header
-    header_line = lines[table_start]
-    headers = [cell.strip() for cell in header_line.split('|')[1:-1]]
-
-    # Skip separator line
-    data_start = table_start + 2
-
-    # Parse data rows
-    table_data = [headers]
-    for line in lines[data_start:]:
-        if not line.strip() or not line.startswith('|'):
-            break
-        cells = [cell.strip() for cell in line.split('|')[1:-1]]
-        table_data.append(cells)
-
-    return headers, table_data
+    table_data = table.cells()
+    return table_data[0], table_data
 
 def create_pdf(md_file, pdf_file=None):
     """Create PDF from markdown file."""
@@ -50,12 +30,9 @@ def create_pdf(md_file, pdf_file=None):
     if pdf_file is None:
         pdf_file = md_path.parent / f"{md_path.stem}.pdf"
 
-    # Read markdown content
-    with open(md_path, 'r', encoding='utf-8') as f:
-        md_content = f.read()
-
-    # Parse table
-    headers, table_data = parse_markdown_table(md_content)
+    # Read the typed table from the JSON sidecar, parsing the markdown if there is none
+    policy_table = load_policy_table(md_path)
+    table_data = policy_table.cells() if policy_table is not None else []
 
     if not table_data:
         print("No table found in markdown file")
@@ -0,0 +1,191 @@
+"""Deterministic consolidation of the HKMA and SFC policy tables.
+
+Merging two tables and dropping duplicates does not need an LLM. ``merge_tables``
+normalises clause identifiers ("Paragraph 5.1.3", "para. 5.1.3" -> "5.1.3")
+and URLs (scheme, ``www.``, trailing slashes, fragments), treats rows with the
+same clause and the same document or a near-identical source name as
+duplicates, fills gaps in the kept row from the dropped one and orders the
+result by confidence. The coverage-balance note is computed from the merged
+rows, so the aggregator LLM only writes the "top three critical requirements"
+summary (see ``InternalAuditValidationSystemCrew.retrieve_relevant_policies``).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field, fields, replace
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence
+
+from internal_audit_validation_system.policy_table import ALL_HEADERS, PolicyRow, PolicyTable, normalise_url
+from internal_audit_validation_system.revision import keyed_markdown
+
+# Minimum similarity of normalised source names (or excerpts) to treat rows as duplicates
+SOURCE_SIMILARITY = 0.85
+EXCERPT_SIMILARITY = 0.9
+
+REGULATORS = ("HKMA", "SFC")
+_REGULATOR_MARKERS = {
+    "HKMA": ("hkma", "hong kong monetary authority"),
+    "SFC": ("sfc.hk", "sfc ", "securities and futures commission"),
+}
+# Regulator each retrieval task covers
+TASK_REGULATORS = {"retrieve_hkma_policies": "HKMA", "retrieve_sfc_policies": "SFC"}
+_CONFIDENCE_RANK = {"high": 0, "med": 1, "medium": 1, "low": 2}
+_MISSING = {"", "n/a", "na", "unknown", "-", "none"}
+_CLAUSE_PREFIX = re.compile(r"\b(?:paragraphs?|paras?\.?|sections?|clauses?|s\.|§)\s*", re.IGNORECASE)
+
+
+def normalise_clause(clause: str) -> str:
+    """Canonical clause identifier, e.g. ``"Para. 5.1.3 (a)"`` -> ``"5.1.3(a)"``."""
+    text = _CLAUSE_PREFIX.sub("", clause.lower())
+    text = re.sub(r"\s*\(\s*", "(", text)
+    text = re.sub(r"\s*\)", ")", text)
+    return re.sub(r"\s+", " ", text).strip(" .;,:")
+
+
+def _normalise_text(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", value.lower()).strip()
+
+
+def _similar(left: str, right: str, threshold: float) -> bool:
+    left, right = _normalise_text(left), _normalise_text(right)
+    if not left or not right:
+        return False
+    return left == right or SequenceMatcher(None, left, right).ratio() >= threshold
+
+
+def _is_missing(value: str) -> bool:
+    return value.strip().lower() in _MISSING
+
+
+def regulator_of(row: PolicyRow, default: Optional[str] = None) -> Optional[str]:
+    """HKMA or SFC, judged from the row's URL and source name, else ``default``."""
+    haystack = f"{row.url or ''} {row.source_name} ".lower()
+    for regulator, markers in _REGULATOR_MARKERS.items():
+        if any(marker in haystack for marker in markers):
+            return regulator
+    return default
+
+
+@dataclass
+class _Entry:
+    row: PolicyRow
+    regulator: Optional[str]
+    clause: str
+    url: str
+
+
+def _duplicates(left: _Entry, right: _Entry) -> bool:
+    if left.clause and left.clause == right.clause:
+        if left.url and left.url == right.url:
+            return True
+        if _similar(left.row.source_name, right.row.source_name, SOURCE_SIMILARITY):
+            return True
+        # Differently worded source names (or a missing link) but the same quote
+        if (not left.url or not right.url) and _similar(left.row.key_excerpt, right.row.key_excerpt, EXCERPT_SIMILARITY):
+            return True
+    # Same document and the same quote, with clause identifiers the normaliser could not align
+    return bool(left.url) and left.url == right.url and _similar(
+        left.row.key_excerpt, right.row.key_excerpt, EXCERPT_SIMILARITY
+    )
+
+
+def _completeness(row: PolicyRow) -> int:
+    return sum(not _is_missing(getattr(row, item.name)) for item in fields(row))
+
+
+def _combine(kept: PolicyRow, dropped: PolicyRow) -> PolicyRow:
+    """Keep the more complete row and fill its missing fields from the other."""
+    if _completeness(dropped) > _completeness(kept):
+        kept, dropped = dropped, kept
+    filled = {
+        item.name: getattr(dropped, item.name)
+        for item in fields(kept)
+        if _is_missing(getattr(kept, item.name)) and not _is_missing(getattr(dropped, item.name))
+    }
+    confidence = min((kept.confidence, dropped.confidence), key=lambda value: _CONFIDENCE_RANK.get(value.lower(), 3))
+    return replace(kept, confidence=confidence, **filled)
+
+
+@dataclass
+class MergeResult:
+    """Merged table plus what the merge did."""
+
+    table: PolicyTable
+    duplicates_removed: int = 0
+    coverage: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def coverage_note(self) -> str:
+        counts = {regulator: self.coverage.get(regulator, 0) for regulator in REGULATORS}
+        note = (
+            f"**Coverage:** {counts['HKMA']} HKMA and {counts['SFC']} SFC "
+            f"{'entry' if sum(counts.values()) == 1 else 'entries'}"
+        )
+        other = self.coverage.get("Other", 0)
+        if other:
+            note += f" plus {other} from other sources"
+        note += f"; {self.duplicates_removed} duplicate(s) removed."
+        missing = [regulator for regulator, count in counts.items() if count == 0]
+        if missing:
+            note += f" Gap: no {' or '.join(missing)} requirements were located."
+        else:
+            high, low = max(counts, key=counts.get), min(counts, key=counts.get)
+            if counts[high] >= 3 * counts[low]:
+                note += f" Coverage is skewed towards {high}; {low} obligations may be under-represented."
+        return note
+
+
+def merge_tables(tables: Sequence[PolicyTable]) -> MergeResult:
+    """Merge policy tables in order, dropping duplicate rows and sorting by confidence."""
+    entries: List[_Entry] = []
+    duplicates = 0
+    for table in tables:
+        default = TASK_REGULATORS.get(table.task_name)
+        for row in table.rows:
+            entry = _Entry(row, regulator_of(row, default), normalise_clause(row.section_clause), normalise_url(row.url))
+            match = next((existing for existing in entries if _duplicates(existing, entry)), None)
+            if match is None:
+                entries.append(entry)
+                continue
+            duplicates += 1
+            match.row = _combine(match.row, entry.row)
+            match.url = match.url or entry.url
+
+    ordered = sorted(entries, key=lambda entry: _CONFIDENCE_RANK.get(entry.row.confidence.lower(), 3))
+    coverage: Dict[str, int] = {}
+    for entry in ordered:
+        key = entry.regulator or "Other"
+        coverage[key] = coverage.get(key, 0) + 1
+
+    headers = [header for header in ALL_HEADERS if any(header in table.headers for table in tables)]
+    merged = PolicyTable(
+        task_name="retrieve_relevant_policies",
+        headers=headers or list(ALL_HEADERS),
+        rows=[entry.row for entry in ordered],
+    )
+    return MergeResult(table=merged, duplicates_removed=duplicates, coverage=coverage)
+
+
+def _summary_section(summary: str) -> str:
+    """The LLM's critical-requirements summary without any table it may have echoed."""
+    lines = [line for line in summary.strip().splitlines() if not line.strip().startswith("|")]
+    text = "\n".join(lines).strip()
+    if "critical requirements" not in text.lower():
+        text = f"### Top Three Critical Requirements\n\n{text}"
+    return text
+
+
+def render_consolidated(result: MergeResult, summary: str, keyed: bool = False) -> str:
+    """Markdown for the consolidated task output: table, coverage note, then the LLM summary.
+
+    ``keyed`` adds the row-key column that delta revision patches refer to (see ``revision.py``).
+    """
+    parts: List[str] = []
+    if not result.table.rows:
+        parts.append("No relevant policy located.")
+    table = keyed_markdown(result.table) if keyed else result.table.to_markdown()
+    parts.extend([table, result.coverage_note, _summary_section(summary)])
+    return "\n\n".join(parts) + "\n"
+
@@ -0,0 +1,217 @@
+"""Batch planning: one shared policy retrieval per topic of related observations.
+
+In a batch, several observations usually map to the same regulatory area
+(suitability, KYC, ...), and separate runs would each search the same HKMA and
+SFC sources. ``plan_batch`` groups the observations into clusters:
+
+- by topic (``config/batch_topics.yaml``): an observation joins the topic whose
+  keywords it mentions most;
+- observations that match no topic are grouped by wording similarity, using the
+  warm-start index (``warm_start.py``) and ``AUDIT_BATCH_SIMILARITY`` (default 0.5).
+
+``run_batch`` then runs the retrieval stage once per cluster of two or more
+observations (``AUDIT_PIPELINE=retrieval`` for the cluster's ``query``), and the
+compliance stage once per observation, starting from the cluster's final table.
+Retrieval calls therefore grow with the number of topics, not observations.
+A single-observation cluster is an ordinary run. A run that raises is recorded
+as ``failed`` and the batch goes on; the report is always written.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from internal_audit_validation_system.policy_table import TASK_OUTPUT_BASENAMES, load_policy_table
+from internal_audit_validation_system.scheduler import RETRIEVAL_PIPELINE
+from internal_audit_validation_system.warm_start import (
+    FINAL_TASK,
+    REUSE,
+    ObservationIndex,
+    WarmStart,
+    find_warm_start,
+    observation_words,
+)
+
+DEFAULT_TOPICS_PATH = Path(__file__).resolve().parent / "config" / "batch_topics.yaml"
+DEFAULT_SIMILARITY = 0.5
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Runs the crew once for (inputs, warm_start, pipeline=...) and returns its run id and status
+RunCrew = Callable[..., Tuple[str, str]]
+
+
+def similarity_threshold() -> float:
+    """``AUDIT_BATCH_SIMILARITY``: how similar unmatched observations must be to share a retrieval."""
+    return float(os.environ.get("AUDIT_BATCH_SIMILARITY", DEFAULT_SIMILARITY))
+
+
+@dataclass(frozen=True)
+class Topic:
+    """A regulatory area observations can share a retrieval for."""
+
+    name: str
+    label: str
+    # Each keyword as its word stems; it matches when all of them occur
+    keywords: Tuple[Tuple[str, ...], ...] = ()
+
+    def matches(self, observation: str) -> int:
+        """Number of this topic's keywords the observation mentions."""
+        words = set(observation_words(observation))
+        return sum(1 for keyword in self.keywords if keyword and all(word in words for word in keyword))
+
+
+def load_topics(path: Path = DEFAULT_TOPICS_PATH) -> List[Topic]:
+    """Load the batch topics from YAML (topic name -> label and keywords), in file order."""
+    import yaml
+
+    raw = yaml.safe_load(Path(path).read_text()) or {}
+    return [
+        Topic(
+            name=name,
+            label=str((options or {}).get("label") or name),
+            keywords=tuple(tuple(observation_words(str(keyword))) for keyword in (options or {}).get("keywords") or ()),
+        )
+        for name, options in raw.items()
+    ]
+
+
+def load_observations(path: Path) -> List[str]:
+    """Observations from a text file, one per line; blank lines and ``#`` comments are ignored."""
+    lines = (line.strip() for line in Path(path).read_text(encoding="utf-8").splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+@dataclass
+class Cluster:
+    """Observations that share one policy retrieval."""
+
+    topic: Optional[str]
+    label: str
+    observations: List[str] = field(default_factory=list)
+
+    @property
+    def query(self) -> str:
+        """The observation the shared retrieval runs for."""
+        if len(self.observations) == 1:
+            return self.observations[0]
+        listed = " ".join(f"({index}) {observation}" for index, observation in enumerate(self.observations, 1))
+        return f"{self.label}, covering these related observations: {listed}"
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"topic": self.topic, "label": self.label, "observations": list(self.observations)}
+
+
+def plan_batch(
+    observations: Sequence[str],
+    topics: Optional[Sequence[Topic]] = None,
+    threshold: Optional[float] = None,
+) -> List[Cluster]:
+    """Group observations by topic, then by similarity; clusters in order of their first observation."""
+    topics = load_topics() if topics is None else topics
+    threshold = similarity_threshold() if threshold is None else threshold
+    clusters: List[Cluster] = []
+    by_topic: Dict[str, Cluster] = {}
+    unmatched: List[Cluster] = []
+    seen = set()
+    for observation in observations:
+        if observation in seen:
+            continue
+        seen.add(observation)
+        # Most keyword matches wins; ties go to the topic listed first
+        scored = [(topic.matches(observation), -index, topic) for index, topic in enumerate(topics)]
+        hits, _, topic = max(scored, key=lambda item: item[:2], default=(0, 0, None))
+        if hits:
+            if topic.name not in by_topic:
+                by_topic[topic.name] = Cluster(topic.name, topic.label)
+                clusters.append(by_topic[topic.name])
+            by_topic[topic.name].observations.append(observation)
+            continue
+        # No topic: join the unmatched cluster whose first observation is most similar, if similar enough
+        index = ObservationIndex([cluster.observations[0] for cluster in unmatched])
+        best = index.best(observation)
+        if best is not None and best[1] >= threshold:
+            unmatched[best[0]].observations.append(observation)
+            continue
+        unmatched.append(Cluster(None, observation, [observation]))
+        clusters.append(unmatched[-1])
+    return clusters
+
+
+def shared_table(run_dir: Path, query: str) -> Optional[WarmStart]:
+    """The final table of a cluster's shared retrieval, to reuse for each of its observations."""
+    table = load_policy_table(Path(run_dir) / f"{TASK_OUTPUT_BASENAMES[FINAL_TASK]}.md", FINAL_TASK)
+    if table is None or not table.rows:
+        return None
+    return WarmStart(mode=REUSE, run_id=Path(run_dir).name, observation=query, score=1.0, table=table)
+
+
+def _attempt(
+    run_crew: RunCrew,
+    observation: str,
+    warm_start: Callable[[str], Optional[WarmStart]],
+    pipeline: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the crew for one observation; a run that raises is reported as failed."""
+    try:
+        run_id, status = run_crew({"audit_observation": observation}, warm_start(observation), pipeline=pipeline)
+    except Exception as exc:
+        print(f"Run failed for \"{observation}\": {exc}")
+        return {"run_id": None, "status": FAILED, "error": f"{type(exc).__name__}: {exc}"}
+    return {"run_id": run_id, "status": status}
+
+
+def run_batch(
+    observations: Sequence[str],
+    run_crew: RunCrew,
+    output_dir: Path,
+    warm_start: Callable[[str], Optional[WarmStart]] = find_warm_start,
+) -> Path:
+    """Run a batch and write its report to ``output_dir/batch_{timestamp}.json``; returns the report path.
+
+    ``run_crew`` writes each run to ``output_dir/{run id}``. The report is written
+    even when the batch is interrupted, with the runs made so far.
+    """
+    observations = list(dict.fromkeys(observations))
+    clusters = plan_batch(observations)
+    print(f"Batch of {len(observations)} observations in {len(clusters)} retrieval group(s):")
+    for cluster in clusters:
+        print(f"- {cluster.label}: {len(cluster.observations)} observation(s)")
+    report: List[Dict[str, Any]] = []
+    retrievals = 0
+    report_path = Path(output_dir) / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    try:
+        for cluster in clusters:
+            entry: Dict[str, Any] = dict(cluster.as_dict(), retrieval=None, runs=[])
+            report.append(entry)
+            shared = None
+            if len(cluster.observations) > 1:
+                retrieval = _attempt(run_crew, cluster.query, warm_start, pipeline=RETRIEVAL_PIPELINE)
+                entry["retrieval"] = retrieval
+                retrievals += 1
+                if retrieval["status"] == COMPLETED:
+                    shared = shared_table(Path(output_dir) / retrieval["run_id"], cluster.query)
+                if shared is None:
+                    print(
+                        f"Shared retrieval for {cluster.label} has no final table ({retrieval['status']}); "
+                        "retrieving for each observation instead"
+                    )
+            retrievals += 0 if shared else len(cluster.observations)
+            for observation in cluster.observations:
+                run = _attempt(run_crew, observation, lambda observation: shared or warm_start(observation))
+                entry["runs"].append(dict(observation=observation, **run))
+    finally:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps({"observations": len(observations), "clusters": report}, indent=2))
+    failed = sum(run["status"] == FAILED for entry in report for run in entry["runs"])
+    print(
+        f"Batch done: {retrievals} policy retrieval(s) for {len(observations)} observations"
+        + (f", {failed} failed" if failed else "")
+        + f"; report: {report_path}"
+    )
+    return report_path
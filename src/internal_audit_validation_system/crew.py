@@ -1,35 +1,180 @@
 import os
 import json
+from pathlib import Path
+from typing import Any, Dict
+
+from pydantic import Field
 
 from crewai import LLM
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import (
-	SerperDevTool
-)
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
+from internal_audit_validation_system.tools.search import CachedSearchTool
 from internal_audit_validation_system.tools.custom_tool import (
-	SecureWebScraperTool,
+	FetchDocumentTool,
 	RobustFileReadTool,
-	PDFDownloadTool,
+	DocumentSectionTool,
 	MarkdownToPDFTool
 )
-
-
-
-
+from internal_audit_validation_system.evaluation.inline import InlineEvaluator
+from internal_audit_validation_system.aggregation import merge_tables, render_consolidated
+from internal_audit_validation_system.policy_table import (
+	ALL_HEADERS,
+	TASK_OUTPUT_BASENAMES,
+	PolicyTable,
+	load_policy_table,
+	write_sidecar,
+)
+from internal_audit_validation_system.revision import (
+	DELTA,
+	PATCH_MAX_RETRIES,
+	PatchError,
+	apply_patches,
+	parse_findings,
+	parse_patches,
+	render_revision,
+	revision_mode,
+)
+from internal_audit_validation_system.deadline import call_retries, call_timeout, current_deadline
+from internal_audit_validation_system.early_stop import EarlyStopMonitor, early_stop_enabled, load_stop_policies
+from internal_audit_validation_system.scheduler import FULL_PIPELINE, TaskGraph, pipeline
+from internal_audit_validation_system.verification import FANOUT, RowVerifier, reflection_engine, verifier_model
+from internal_audit_validation_system.warm_start import CONSOLIDATION_TASK, FINAL_TASK, REUSE, SEED, SKIP, WarmStart
+
+
+class DeadlineLLM(LLM):
+	"""LLM whose request timeout and retries are capped by the remaining run budget."""
+
+	def _prepare_completion_params(self, messages, tools=None):
+		params = super()._prepare_completion_params(messages, tools)
+		params["timeout"] = call_timeout(self.timeout, "LLM call")
+		# Each retry may take the whole timeout again; keep only the attempts that fit in the budget
+		if params.get("max_retries") is not None:
+			params["max_retries"] = call_retries(params["max_retries"], params["timeout"])
+		return params
+
+
+class DeadlineAgent(Agent):
+	"""Agent whose task time limit is the remaining run budget when the task starts."""
+
+	def execute_task(self, task, context=None, tools=None):
+		deadline = current_deadline()
+		if deadline is not None:
+			deadline.check(f"task '{task.name or task.description[:40]}'")
+			self.max_execution_time = max(1, int(deadline.remaining()))
+		return super().execute_task(task, context=context, tools=tools)
+
+
+class EarlyStopAgent(DeadlineAgent):
+	"""Agent whose loop ends once its findings meet the task's stop policy (see early_stop.py)."""
+
+	stop_policies: Any = Field(default=None, exclude=True)
+
+	def create_agent_executor(self, tools=None, task=None):
+		super().create_agent_executor(tools=tools, task=task)
+		policy = (self.stop_policies or {}).get(task.name) if task is not None else None
+		if policy is not None:
+			executor = self.agent_executor
+			executor.step_callback = EarlyStopMonitor(
+				task.name, policy, executor, lambda: self._token_process.total_tokens, then=executor.step_callback
+			)
+
+
+class FanOutReviewer(DeadlineAgent):
+	"""Reviewer that runs ``review(inputs, throttle)`` instead of an agent loop (see verification.py)."""
+
+	review: Any = Field(default=None, exclude=True)
+
+	def execute_task(self, task, context=None, tools=None):
+		deadline = current_deadline()
+		if deadline is not None:
+			deadline.check(f"task '{task.name or task.description[:40]}'")
+		# The crew's requests-per-minute limiter, shared with every other agent
+		throttle = self._rpm_controller.check_or_wait if self._rpm_controller else None
+		inputs = getattr(self.crew, "_inputs", None) or {}
+		return self.review(inputs, throttle)
+
+
+
+
+class GraphCrew(Crew):
+	"""Crew running its tasks as a dependency graph built from their context (see scheduler.py)."""
+
+	# Outputs by task name of tasks that are not run (e.g. retrieval skipped by a warm start)
+	preset_outputs: Dict[str, Any] = Field(default_factory=dict, exclude=True)
+
+	def _execute_tasks(self, tasks, start_index=0, was_replayed=False):
+		if any(isinstance(item, ConditionalTask) for item in tasks):
+			# Conditional tasks decide on the previous task's output, which only a sequence defines
+			return super()._execute_tasks(tasks, start_index, was_replayed)
+		names = [item.name or f"task_{index}" for index, item in enumerate(tasks)]
+		by_name = dict(zip(names, tasks))
+		index_of = {name: index for index, name in enumerate(names)}
+		name_of = {id(item): name for name, item in by_name.items()}
+		graph = TaskGraph.build(
+			names,
+			{
+				name: [name_of.get(id(needed), needed.name) for needed in item.context]
+				if isinstance(item.context, list) and name not in self.preset_outputs else []
+				for name, item in by_name.items()
+			},
+		)
+		# Tasks before start_index (when replaying) are not run again
+		done = {name: by_name[name].output for name in names[:start_index or 0]}
+		for name, output in self.preset_outputs.items():
+			if name in by_name:
+				by_name[name].output = done[name] = output
+
+		def agent_of(name):
+			agent_to_use = self._get_agent_to_use(by_name[name])
+			if agent_to_use is None:
+				raise ValueError(
+					f"No agent available for task: {by_name[name].description}. "
+					f"Ensure that either the task has an assigned agent or a manager agent is provided."
+				)
+			return agent_to_use
+
+		def execute(name):
+			task_to_run, agent_to_use = by_name[name], agent_of(name)
+			tools = self._prepare_tools(agent_to_use, task_to_run, task_to_run.tools or agent_to_use.tools or [])
+			self._log_task_start(task_to_run, agent_to_use.role)
+			# The tasks in its context have finished, so their outputs are set
+			return task_to_run.execute_sync(agent=agent_to_use, context=self._get_context(task_to_run, []), tools=tools)
+
+		def record(name, output):
+			self._process_task_result(by_name[name], output)
+			self._store_execution_log(by_name[name], output, index_of[name], was_replayed)
+
+		results = graph.run(execute, resource=lambda name: id(agent_of(name)), done=done, on_done=record)
+		return self._create_crew_output([results[name] for name in names if results[name] is not None])
 
 
 @CrewBase
 class InternalAuditValidationSystemCrew:
     """InternalAuditValidationSystem crew"""
 
-    def __init__(self, timestamp: str = None):
+    def __init__(
+        self,
+        timestamp: str = None,
+        inline_evaluator: InlineEvaluator = None,
+        warm_start: WarmStart = None,
+        pipeline: str = None,
+    ):
         """Initialize the crew with optional timestamp for output path configuration.
 
         Args:
             timestamp: Timestamp string (YYYYMMDD_HHMMSS) to use for output directory.
                       If provided, all task output files will be saved to output/{timestamp}/
+            inline_evaluator: Optional evaluator whose guardrails score each task output
+                      as soon as it completes (retrying or aborting per its policies).
+            warm_start: Optional final policy table of a similar past run (see warm_start.py)
+                      that seeds or replaces the HKMA and SFC retrieval.
+            pipeline: Tasks to schedule, ``full`` or ``retrieval``; defaults to ``AUDIT_PIPELINE``.
         """
+        self._inline_evaluator = inline_evaluator
+        self._warm_start = warm_start
+        self._pipeline = pipeline
         # The CrewBase decorator's __init__ will call our original __init__ via super(),
         # then load configurations. We need to update paths AFTER that happens.
         # So we store the timestamp and use __setattr__ hook or just update immediately
@@ -56,37 +201,182 @@ class InternalAuditValidationSystemCrew:
         Args:
             timestamp: Timestamp string to use in output paths
         """
-        task_output_mapping = {
-            "retrieve_hkma_policies": "hkma_policy_retrieval",
-            "retrieve_sfc_policies": "sfc_policy_retrieval",
-            "retrieve_relevant_policies": "policy_retrieval_aggregated",
-            "reflect_policy_retrieval": "retrieval_review",
-            "revise_policy_retrieval": "policy_retrieval_final",
-            "analyze_compliance_status": "compliance_analysis",
-            "prepare_peer_review_package": "peer_review_package",
-            "reflection_of_compliance_status": "compliance_reflection",
-            "review_compliance_analysis": "review_report",
-        }
-
-        for task_key, base_filename in task_output_mapping.items():
+        for task_key, base_filename in TASK_OUTPUT_BASENAMES.items():
             if task_key in self.tasks_config:
                 # Update to timestamped path: output/TIMESTAMP/filename.md
                 self.tasks_config[task_key]["output_file"] = f"output/{timestamp}/{base_filename}.md"
 
+    def _policy_table_sidecar(self, task_name: str) -> dict:
+        """Task keyword arguments writing the typed policy table next to the markdown output."""
+        def write(output) -> None:
+            write_sidecar(self.tasks_config[task_name]["output_file"], output.raw, task_name)
+
+        return {"callback": write}
+
+    def _consolidation(self, task_name: str) -> dict:
+        """Task keyword arguments merging the HKMA and SFC tables in code around the agent's summary.
+
+        The guardrail replaces the agent's answer with the merged table, the coverage
+        note and the summary, then applies inline evaluation if enabled. crewAI saves
+        the agent's original answer to ``output_file``, so the callback writes the
+        consolidated markdown (and its sidecar) instead.
+        """
+        inline = self._inline_evaluation(task_name)
+        inline_guardrail = inline.get("guardrail")
+
+        def consolidate(task_output):
+            tables = [
+                load_policy_table(self.tasks_config[name]["output_file"], name)
+                for name in ("retrieve_hkma_policies", "retrieve_sfc_policies")
+            ]
+            result = merge_tables([table for table in tables if table is not None])
+            markdown = render_consolidated(result, task_output.raw, keyed=revision_mode() == DELTA)
+            if inline_guardrail is not None:
+                return inline_guardrail(markdown)
+            return True, markdown
+
+        return {
+            "guardrail": consolidate,
+            "guardrail_max_retries": inline.get("guardrail_max_retries", 0),
+            "callback": self._output_writer(task_name),
+        }
+
+    def _output_writer(self, task_name: str):
+        """Task callback writing the guardrail-replaced output (and its sidecar) to ``output_file``."""
+        def write(output) -> None:
+            path = Path(self.tasks_config[task_name]["output_file"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(output.raw, encoding="utf-8")
+            write_sidecar(path, output.raw, task_name)
+
+        return write
+
+    def _consolidated_table(self) -> PolicyTable:
+        table = load_policy_table(
+            self.tasks_config["retrieve_relevant_policies"]["output_file"], "retrieve_relevant_policies"
+        )
+        return table or PolicyTable(task_name="retrieve_relevant_policies", headers=list(ALL_HEADERS))
+
+    def _reflection_findings(self) -> dict:
+        """Task keyword arguments requiring reflection to report its findings by row key."""
+        def validate(task_output):
+            try:
+                parse_findings(task_output.raw, self._consolidated_table())
+            except PatchError as exc:
+                return False, f"{exc}\nEnd your answer with the findings JSON block described in the expected output."
+            return True, task_output.raw
+
+        return {"guardrail": validate, "guardrail_max_retries": PATCH_MAX_RETRIES}
+
+    def _delta_revision(self, task_name: str) -> dict:
+        """Task keyword arguments applying the reviser's row patches to the consolidated table in code.
+
+        Like ``_consolidation``, the guardrail replaces the agent's answer (the
+        patches and a summary) with the revised table, and the callback writes it.
+        """
+        inline = self._inline_evaluation(task_name)
+        inline_guardrail = inline.get("guardrail")
+
+        def revise(task_output):
+            try:
+                result = apply_patches(self._consolidated_table(), parse_patches(task_output.raw), task_name)
+            except PatchError as exc:
+                return False, f"Your patches could not be applied:\n{exc}\nAnswer again with a corrected patches JSON block."
+            markdown = render_revision(result, task_output.raw)
+            if inline_guardrail is not None:
+                return inline_guardrail(markdown)
+            return True, markdown
+
+        return {
+            "guardrail": revise,
+            "guardrail_max_retries": max(inline.get("guardrail_max_retries", 0), PATCH_MAX_RETRIES),
+            "callback": self._output_writer(task_name),
+        }
+
+    def _fan_out_reviewer(self) -> Agent:
+        """Stand-in for the senior reviewer that verifies the consolidated table in parallel row groups."""
+        llm = DeadlineLLM(model=verifier_model(), temperature=0, max_retries=2, timeout=60)
+
+        def review(inputs, throttle) -> str:
+            verifier = RowVerifier.from_env(lambda prompt: llm.call([{"role": "user", "content": prompt}]), throttle)
+            return verifier.verify(self._consolidated_table(), inputs.get("audit_observation", "")).render()
+
+        return FanOutReviewer(
+            config=self.agents_config["senior_audit_reviewer"],
+            allow_delegation=False,
+            llm=llm,
+            review=review,
+        )
+
+    def _stop_policies(self) -> dict:
+        """Early-stop policies by task name; empty when ``AUDIT_EARLY_STOP`` is off."""
+        if not hasattr(self, "_early_stop_policies"):
+            self._early_stop_policies = load_stop_policies() if early_stop_enabled() else {}
+        return self._early_stop_policies
+
+    def _retrieval_config(self, task_name: str) -> dict:
+        """Task config for a retrieval agent: warm-start seed rows and the early-stop instruction, if they apply."""
+        cfg = dict(self.tasks_config[task_name])
+        warm_start = getattr(self, "_warm_start", None)
+        if warm_start is not None and warm_start.mode == SEED:
+            seed = warm_start.seed_table(task_name)
+            if seed.rows:
+                cfg["description"] += (
+                    "\nA similar observation (\"" + warm_start.observation + "\") was audited before and these rows "
+                    "were confirmed for it:\n\n" + seed.to_markdown() + "\n\nStart from these rows: re-verify that "
+                    "each source, link, section and date is current and relevant to this observation, drop or "
+                    "correct the ones that are not, then search only for requirements they do not cover."
+                )
+        if task_name in self._stop_policies():
+            cfg["description"] += (
+                "\nWhenever you confirm new rows, write your findings table so far (same columns) in your Thought. "
+                "Your search ends automatically once the findings are sufficient, and you then give your final answer."
+            )
+        return cfg
+
+    def _warm_start_outputs(self) -> dict:
+        """Preset task outputs when a warm start replaces retrieval.
+
+        ``skip`` presets the cached table as the consolidated table, so only
+        reflection and revision run; ``reuse`` presets it as the final table, so
+        only the compliance stage runs. The markdown (and its sidecar) is written
+        right away, so later tasks read it exactly as if it had been retrieved.
+        """
+        warm_start = getattr(self, "_warm_start", None)
+        task_name = {SKIP: CONSOLIDATION_TASK, REUSE: FINAL_TASK}.get(warm_start.mode) if warm_start else None
+        if task_name is None:
+            return {}
+        if warm_start.mode == SKIP:
+            raw = render_consolidated(merge_tables([warm_start.table]), warm_start.summary, keyed=revision_mode() == DELTA)
+        else:
+            raw = warm_start.table.to_markdown()
+        preset = getattr(self, task_name)()
+        output = TaskOutput(description=preset.description, name=task_name, raw=raw, agent=preset.agent.role)
+        self._output_writer(task_name)(output)
+        return {task_name: output}
+
+    def _inline_evaluation(self, task_name: str) -> dict:
+        """Task keyword arguments wiring in inline evaluation, if enabled."""
+        evaluator = getattr(self, "_inline_evaluator", None)
+        if evaluator is None:
+            return {}
+        return evaluator.task_options(task_name)
+
 
     @agent
     def hkma_policy_retrieval_specialist(self) -> Agent:
 
         
-        return Agent(
+        return EarlyStopAgent(
             config=self.agents_config["hkma_policy_retrieval_specialist"],
+            stop_policies=self._stop_policies(),
 
 
 			tools=[
 				RobustFileReadTool(),
-				SecureWebScraperTool(),
-				PDFDownloadTool(),
-				SerperDevTool(n_results=10)
+				FetchDocumentTool(),
+				DocumentSectionTool(),
+				CachedSearchTool(n_results=10)
             ],
             reasoning=False,
             max_reasoning_attempts=None,
@@ -95,7 +385,7 @@ class InternalAuditValidationSystemCrew:
             max_iter=25,
             max_rpm=None,
             max_execution_time=None,
-            llm=LLM(
+            llm=DeadlineLLM(
                 model="gpt-4o-mini",
                 temperature=0.7,
                 max_retries=5,
@@ -108,15 +398,16 @@ class InternalAuditValidationSystemCrew:
     def sfc_policy_retrieval_specialist(self) -> Agent:
 
         
-        return Agent(
+        return EarlyStopAgent(
             config=self.agents_config["sfc_policy_retrieval_specialist"],
+            stop_policies=self._stop_policies(),
 
 
 			tools=[
 				RobustFileReadTool(),
-				SecureWebScraperTool(),
-				PDFDownloadTool(),
-				SerperDevTool(n_results=10)
+				FetchDocumentTool(),
+				DocumentSectionTool(),
+				CachedSearchTool(n_results=10)
             ],
             reasoning=False,
             max_reasoning_attempts=None,
@@ -125,7 +416,7 @@ class InternalAuditValidationSystemCrew:
             max_iter=25,
             max_rpm=None,
             max_execution_time=None,
-            llm=LLM(
+            llm=DeadlineLLM(
                 model="gpt-4o-mini",
                 temperature=0.7,
                 max_retries=5,
@@ -138,14 +429,14 @@ class InternalAuditValidationSystemCrew:
     def policy_aggregator(self) -> Agent:
 
 
-        return Agent(
+        return DeadlineAgent(
             config=self.agents_config["policy_aggregator"],
 
 
             tools=[
-                # SerperDevTool added to enable URL verification and prevent hallucination
+                # Serper search (cached) added to enable URL verification and prevent hallucination
                 # when the agent needs to add new policy sources during revision
-                SerperDevTool(n_results=10),
+                CachedSearchTool(n_results=10),
                 # MarkdownToPDFTool allows agent to convert final markdown reports to PDF
                 MarkdownToPDFTool()
             ],
@@ -156,7 +447,7 @@ class InternalAuditValidationSystemCrew:
             max_iter=15,
             max_rpm=None,
             max_execution_time=None,
-            llm=LLM(
+            llm=DeadlineLLM(
                 model="gpt-4o-mini",
                 temperature=0.7,
                 max_retries=5,
@@ -169,15 +460,15 @@ class InternalAuditValidationSystemCrew:
     def policy_retrieval_specialist(self) -> Agent:
 
         
-        return Agent(
+        return DeadlineAgent(
             config=self.agents_config["policy_retrieval_specialist"],
 
 
 			tools=[
 				RobustFileReadTool(),
-				SecureWebScraperTool(),
-				PDFDownloadTool(),
-				SerperDevTool(n_results=10)
+				FetchDocumentTool(),
+				DocumentSectionTool(),
+				CachedSearchTool(n_results=10)
             ],
             reasoning=False,
             max_reasoning_attempts=None,
@@ -186,7 +477,7 @@ class InternalAuditValidationSystemCrew:
             max_iter=25,
             max_rpm=None,
             max_execution_time=None,
-            llm=LLM(
+            llm=DeadlineLLM(
                 model="gpt-4o-mini",
                 temperature=0.7,
                 max_retries=5,
@@ -199,7 +490,7 @@ class InternalAuditValidationSystemCrew:
     def audit_analysis_expert(self) -> Agent:
 
 
-        return Agent(
+        return DeadlineAgent(
             config=self.agents_config["audit_analysis_expert"],
 
 
@@ -213,7 +504,7 @@ class InternalAuditValidationSystemCrew:
             max_iter=25,
             max_rpm=None,
             max_execution_time=None,
-            llm=LLM(
+            llm=DeadlineLLM(
                 model="gpt-4o-mini",
                 temperature=0.7,
                 max_retries=5,
@@ -226,7 +517,7 @@ class InternalAuditValidationSystemCrew:
     def peer_review_coordinator(self) -> Agent:
 
         
-        return Agent(
+        return DeadlineAgent(
             config=self.agents_config["peer_review_coordinator"],
             
             
@@ -240,7 +531,7 @@ class InternalAuditValidationSystemCrew:
             max_iter=25,
             max_rpm=None,
             max_execution_time=None,
-            llm=LLM(
+            llm=DeadlineLLM(
                 model="gpt-4o-mini",
                 temperature=0.7,
                 max_retries=5,
@@ -253,7 +544,7 @@ class InternalAuditValidationSystemCrew:
     def senior_audit_reviewer(self) -> Agent:
 
 
-        return Agent(
+        return DeadlineAgent(
             config=self.agents_config["senior_audit_reviewer"],
 
 
@@ -268,7 +559,7 @@ class InternalAuditValidationSystemCrew:
             max_iter=15,  # Reduced from 25 since no external research needed
             max_rpm=None,
             max_execution_time=None,
-            llm=LLM(
+            llm=DeadlineLLM(
                 model="gpt-4o-mini",
                 temperature=0.7,
                 max_retries=5,
@@ -281,32 +572,34 @@ class InternalAuditValidationSystemCrew:
     
     @task
     def retrieve_relevant_policies(self) -> Task:
-        # Override description to enforce consolidation-only behavior
+        # The tables are merged in code (aggregation.py); the agent only writes the summary
         cfg = dict(self.tasks_config["retrieve_relevant_policies"])
+        # The consolidated markdown is written by the task callback, see _consolidation
+        cfg.pop("output_file", None)
         cfg["description"] = (
-            "Consolidate the HKMA and SFC policy retrieval outputs for \"{audit_observation}\" "
-            "into a single, deduplicated table.\n\n"
+            "The HKMA and SFC policy tables for \"{audit_observation}\" in your context are merged, "
+            "deduplicated and checked for coverage balance automatically; do NOT reproduce or rewrite the table.\n\n"
             "Work ONLY from the context provided by retrieve_hkma_policies and retrieve_sfc_policies. "
             "Do not perform any new retrieval, web search, file reads, or external lookups.\n\n"
-            "Your consolidation should:\n"
-            "- Merge both input tables and remove duplicates (same Source Name + Section/Clause + URL)\n"
-            "- Normalize section/paragraph identifiers and keep key excerpts verbatim (≤ 1 sentence)\n"
-            "- Ensure provenance completeness (paths/URLs, effective dates); use \"Unknown\" only if truly unavailable\n"
-            "- Provide a short bullet list of the top three most critical requirements across both regulators\n"
-            "- Add a one-line note on coverage balance (HKMA vs SFC) and call out any gaps"
+            "Write a short section titled \"Top Three Critical Requirements\" with exactly three bullet points, "
+            "each naming the requirement, its regulator and source, and its section/clause."
+        )
+        cfg["expected_output"] = (
+            "A \"### Top Three Critical Requirements\" heading followed by exactly three markdown bullet points. "
+            "No table and no other sections."
         )
         return Task(
             config=cfg,
             markdown=True,
-
-
+            **self._consolidation("retrieve_relevant_policies"),
         )
 
     @task
     def retrieve_hkma_policies(self) -> Task:
         return Task(
-            config=self.tasks_config["retrieve_hkma_policies"],
+            config=self._retrieval_config("retrieve_hkma_policies"),
             markdown=True,
+            **self._policy_table_sidecar("retrieve_hkma_policies"),
 
 
         )
@@ -314,24 +607,74 @@ class InternalAuditValidationSystemCrew:
     @task
     def retrieve_sfc_policies(self) -> Task:
         return Task(
-            config=self.tasks_config["retrieve_sfc_policies"],
+            config=self._retrieval_config("retrieve_sfc_policies"),
             markdown=True,
+            **self._policy_table_sidecar("retrieve_sfc_policies"),
 
 
         )
     
     @task
     def reflect_policy_retrieval(self) -> Task:
+        if revision_mode() != DELTA:
+            return Task(
+                config=self.tasks_config["reflect_policy_retrieval"],
+                markdown=True,
+            )
+        # Delta revision: findings by row key instead of a rewritten table
+        cfg = dict(self.tasks_config["reflect_policy_retrieval"])
+        cfg["description"] += (
+            "\nEvery table row has a key in its Key column (R1, R2, ...). Refer to rows ONLY by that key and do NOT "
+            "reproduce or rewrite the table."
+        )
+        cfg["expected_output"] = (
+            "1) Verdict: PASS or NEEDS REVISION with a brief rationale.\n"
+            "2) Bullet list of issues, each naming the row key, the column and the exact fix.\n"
+            "3) Gaps/additional sources to check next.\n"
+            "4) Finally a fenced ```json block: {\"verdict\": \"PASS\" or \"NEEDS REVISION\", \"findings\": "
+            "[{\"key\": \"R3\", \"column\": \"Effective Date\", \"issue\": \"...\", \"fix\": \"...\"}], "
+            "\"gaps\": [\"...\"]}. Use \"key\": null for a finding about the table as a whole."
+        )
+        if reflection_engine() == FANOUT:
+            cfg["agent"] = self._fan_out_reviewer()
         return Task(
-            config=self.tasks_config["reflect_policy_retrieval"],
+            config=cfg,
             markdown=True,
+            **self._reflection_findings(),
         )
 
     @task
     def revise_policy_retrieval(self) -> Task:
+        if revision_mode() != DELTA:
+            return Task(
+                config=self.tasks_config["revise_policy_retrieval"],
+                markdown=True,
+                **self._policy_table_sidecar("revise_policy_retrieval"),
+            )
+        # Delta revision: the agent returns row patches, applied to the stored table in code
+        cfg = dict(self.tasks_config["revise_policy_retrieval"])
+        # The revised markdown is written by the task callback, see _delta_revision
+        cfg.pop("output_file", None)
+        cfg["context"] = [self.retrieve_relevant_policies(), self.reflect_policy_retrieval()]
+        cfg["description"] += (
+            "\nDELTA REVISION: the consolidated table in your context is the stored table, and every row has a key "
+            "(R1, R2, ...). Do NOT reproduce the table. Return only the changes as patches; rows you do not patch "
+            "are kept exactly as they are."
+        )
+        cfg["expected_output"] = (
+            "A fenced ```json block {\"patches\": [...]} with one object per change:\n"
+            "- {\"op\": \"modify\", \"key\": \"R2\", \"fields\": {\"<column>\": \"<new value>\"}, \"reason\": \"...\"} "
+            "listing only the changed columns\n"
+            "- {\"op\": \"delete\", \"key\": \"R5\", \"reason\": \"...\"}\n"
+            "- {\"op\": \"add\", \"fields\": {<all eight columns>}, \"reason\": \"...\"} for new sources\n"
+            "Columns are: " + ", ".join(ALL_HEADERS) + ". Use an empty list if no change is needed.\n"
+            "After the block, provide a brief summary of improvements made, new sources added, and any remaining "
+            "limitations."
+        )
         return Task(
-            config=self.tasks_config["revise_policy_retrieval"],
+            config=cfg,
             markdown=True,
+            **self._delta_revision("revise_policy_retrieval"),
         )
 
     @task
@@ -339,6 +682,8 @@ class InternalAuditValidationSystemCrew:
         return Task(
             config=self.tasks_config["analyze_compliance_status"],
             markdown=True,
+            **self._inline_evaluation("analyze_compliance_status"),
+            **self._policy_table_sidecar("analyze_compliance_status"),
             
             
         )
@@ -348,6 +693,7 @@ class InternalAuditValidationSystemCrew:
         return Task(
             config=self.tasks_config["review_compliance_analysis"],
             markdown=True,
+            **self._inline_evaluation("review_compliance_analysis"),
             
             
         )
@@ -373,20 +719,37 @@ class InternalAuditValidationSystemCrew:
 
     @crew
     def crew(self) -> Crew:
-        """Creates the InternalAuditValidationSystem crew"""
-        return Crew(
-            agents=self.agents,  # Automatically created by the @agent decorator
-            tasks=[
-                self.retrieve_hkma_policies(),
-                self.retrieve_sfc_policies(),
-                self.retrieve_relevant_policies(),
-                self.reflect_policy_retrieval(),
-                self.revise_policy_retrieval(),
-                # self.analyze_compliance_status(),
-                # self.review_compliance_analysis()
-            ],  # Run only these tasks
-            # tasks=self.tasks,  # Uncomment to run all tasks
+        """Creates the InternalAuditValidationSystem crew
+
+        Tasks run as soon as the tasks in their context have finished (see
+        scheduler.py), e.g. the HKMA and SFC retrievals run concurrently. A
+        warm start that replaces retrieval presets the consolidated or final
+        table instead, and the tasks before it are not scheduled.
+        """
+        preset_outputs = self._warm_start_outputs()
+        tasks = [
+            self.retrieve_hkma_policies(),
+            self.retrieve_sfc_policies(),
+            self.retrieve_relevant_policies(),
+            self.reflect_policy_retrieval(),
+            self.revise_policy_retrieval(),
+        ]
+        tasks = tasks[min((index for index, item in enumerate(tasks) if item.name in preset_outputs), default=0):]
+        if (getattr(self, "_pipeline", None) or pipeline()) == FULL_PIPELINE:
+            tasks += [
+                self.analyze_compliance_status(),
+                self.prepare_peer_review_package(),
+                self.reflection_of_compliance_status(),
+                self.review_compliance_analysis(),
+            ]
+        agents = list(self.agents)  # Automatically created by the @agent decorator
+        # Agents built in code (e.g. the fan-out reviewer) join too, so they share the crew's rate limit
+        agents += [task.agent for task in tasks if task.agent is not None and all(task.agent is not known for known in agents)]
+        return GraphCrew(
+            agents=agents,
+            tasks=tasks,
             process=Process.sequential,
             verbose=True,
             max_rpm=10,  # Limit to 10 requests per minute to avoid rate limits
+            preset_outputs=preset_outputs,
         )
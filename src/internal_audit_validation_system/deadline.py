@@ -0,0 +1,104 @@
+"""Run-level deadline shared by tasks, tool calls and LLM requests.
+
+``main.run`` starts one deadline per crew run (``AUDIT_RUN_DEADLINE_SECONDS``,
+default 30 minutes). Every bounded operation asks it for its timeout instead of
+using a fixed value: an agent's ``max_execution_time`` is set to the remaining
+budget when its task starts, each LLM request gets ``min(configured timeout,
+remaining)`` and only as many retries as still fit in the budget, and HTTP fetches get ``min(30 s or 60 s, remaining)``. Once the
+budget is spent the next call raises ``DeadlineExceeded``, so a run ends within
+the deadline plus at most one in-flight call instead of running unbounded.
+
+The deadline is process-wide (like the run memo) because crewAI runs agents and
+tools on worker threads, which context variables would not follow.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+DEFAULT_RUN_DEADLINE_SECONDS = 30 * 60
+# No call is given less than this, so a nearly spent budget fails cleanly rather than instantly
+MIN_CALL_TIMEOUT = 1.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an operation starts after the run deadline has passed.
+
+    A ``TimeoutError`` so crewAI propagates it from agents without retrying.
+    """
+
+
+@dataclass
+class Deadline:
+    """A time budget measured on the monotonic clock from ``started_at``."""
+
+    budget: float
+    started_at: float = field(default_factory=time.monotonic)
+
+    def remaining(self) -> float:
+        return self.started_at + self.budget - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "the next step") -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Run deadline of {self.budget:.0f}s exceeded before {what}")
+
+    def timeout(self, cap: Optional[float] = None, what: str = "the next call") -> float:
+        """Timeout for one call: the remaining budget, capped at ``cap``."""
+        self.check(what)
+        remaining = max(self.remaining(), MIN_CALL_TIMEOUT)
+        return remaining if cap is None else min(cap, remaining)
+
+    def retries(self, configured: int, timeout: float) -> int:
+        """How many of ``configured`` retries of a ``timeout``-second call still fit in the budget."""
+        fits = int(self.remaining() // max(timeout, MIN_CALL_TIMEOUT)) - 1
+        return max(0, min(configured, fits))
+
+
+_CURRENT: Optional[Deadline] = None
+_LOCK = threading.Lock()
+
+
+def run_deadline_seconds() -> Optional[float]:
+    """``AUDIT_RUN_DEADLINE_SECONDS``; ``0`` or ``none`` disables the deadline."""
+    configured = os.environ.get("AUDIT_RUN_DEADLINE_SECONDS")
+    if configured is None:
+        return DEFAULT_RUN_DEADLINE_SECONDS
+    if configured.strip().lower() in ("", "0", "none"):
+        return None
+    return float(configured)
+
+
+def start_deadline(seconds: Optional[float]) -> Optional[Deadline]:
+    """Replace the process-wide deadline; ``None`` removes it."""
+    global _CURRENT
+    with _LOCK:
+        _CURRENT = Deadline(seconds) if seconds is not None else None
+        return _CURRENT
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _CURRENT
+
+
+def call_timeout(cap: Optional[float], what: str = "the next call") -> Optional[float]:
+    """``cap`` limited by the current deadline; raises ``DeadlineExceeded`` once it has passed."""
+    deadline = _CURRENT
+    if deadline is None:
+        return cap
+    return deadline.timeout(cap, what)
+
+
+def call_retries(configured: int, timeout: Optional[float]) -> int:
+    """``configured`` retries limited to the attempts of ``timeout`` seconds the current deadline leaves room for."""
+    deadline = _CURRENT
+    if deadline is None or timeout is None:
+        return configured
+    return deadline.retries(configured, timeout)
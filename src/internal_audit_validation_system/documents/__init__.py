@@ -0,0 +1,22 @@
+"""Local storage and prefetching of regulatory source documents.
+
+The crawler pre-populates the document store from configured HKMA/SFC seed
+pages and sitemaps so that the retrieval tools read warm local copies instead
+of scraping live during the agent loop. Bodies are stored content-addressed and
+compressed, so disk use grows with distinct document versions, not runs."""
+
+from .excerpts import ExcerptIndex, ExcerptMatch
+from .sections import Section, SectionIndex
+from .store import DocumentStore, DocumentVersion, RetentionPolicy, StoredDocument, default_store
+
+__all__ = [
+    "DocumentStore",
+    "DocumentVersion",
+    "ExcerptIndex",
+    "ExcerptMatch",
+    "RetentionPolicy",
+    "Section",
+    "SectionIndex",
+    "StoredDocument",
+    "default_store",
+]
@@ -0,0 +1,267 @@
+"""Prefetch crawler that warms the local document store ahead of crew runs.
+
+Starting from the regulator seed pages and sitemaps in
+``config/crawl_seeds.yaml`` the crawler downloads matching pages and PDFs into
+the ``DocumentStore``. Recrawls are incremental: stored ETag/Last-Modified
+validators are sent as conditional headers, and a 200 response whose content
+hash matches the stored copy only refreshes the fetch time. Requests to the
+same host are spaced by ``host_delay_seconds`` and overall concurrency is
+bounded by ``max_workers``.
+
+Usage:
+    python -m internal_audit_validation_system.documents.crawler [--config PATH] [--store DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+from internal_audit_validation_system.documents.store import DocumentStore, default_store
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "crawl_seeds.yaml"
+USER_AGENT = "InternalAuditValidationSystem-Prefetch/0.1"
+
+_HREF_PATTERN = re.compile(r"""href\s*=\s*["']([^"'#\s]+)""", re.IGNORECASE)
+_LOC_PATTERN = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+
+
+@dataclass
+class CrawlConfig:
+    """Seeds, scope and politeness settings for a crawl."""
+
+    seeds: List[str] = field(default_factory=list)
+    sitemaps: List[str] = field(default_factory=list)
+    allowed_hosts: List[str] = field(default_factory=list)
+    include_patterns: List[str] = field(default_factory=list)
+    max_depth: int = 1
+    max_documents: int = 200
+    max_workers: int = 4
+    host_delay_seconds: float = 1.0
+    timeout: float = 60
+    respect_robots: bool = True
+
+    @classmethod
+    def from_yaml(cls, path: Path = DEFAULT_CONFIG_PATH) -> "CrawlConfig":
+        import yaml
+
+        raw = yaml.safe_load(Path(path).read_text()) or {}
+        known = set(cls.__dataclass_fields__)
+        unknown = set(raw) - known
+        if unknown:
+            raise ValueError(f"Unknown crawl config keys: {', '.join(sorted(unknown))}")
+        return cls(**raw)
+
+    def in_scope(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        if self.allowed_hosts and not any(host == allowed or host.endswith("." + allowed) for allowed in self.allowed_hosts):
+            return False
+        return not self.include_patterns or any(re.search(pattern, url, re.IGNORECASE) for pattern in self.include_patterns)
+
+
+@dataclass
+class CrawlReport:
+    """Outcome counters for one crawl."""
+
+    fetched: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    not_modified: List[str] = field(default_factory=list)
+    disallowed: List[str] = field(default_factory=list)
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "fetched": len(self.fetched),
+            "unchanged": len(self.unchanged),
+            "not_modified": len(self.not_modified),
+            "disallowed": len(self.disallowed),
+            "failed": [{"url": url, "error": error} for url, error in self.failed],
+        }
+
+
+class HostThrottle:
+    """Serialises requests per host and spaces them by a minimum delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._guard = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._last: Dict[str, float] = {}
+
+    def acquire(self, host: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.setdefault(host, threading.Lock())
+        lock.acquire()
+        wait = self._last.get(host, 0.0) + self.delay - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        return lock
+
+    def release(self, host: str, lock: threading.Lock) -> None:
+        self._last[host] = time.monotonic()
+        lock.release()
+
+
+def _discover_links(base_url: str, body: bytes, content_type: str) -> List[str]:
+    text = body.decode("utf-8", errors="replace")
+    if "xml" in content_type or base_url.lower().endswith(".xml"):
+        candidates: Iterable[str] = _LOC_PATTERN.findall(text)
+    elif "html" in content_type:
+        candidates = (urljoin(base_url, href) for href in _HREF_PATTERN.findall(text))
+    else:
+        return []
+    links = []
+    for link in candidates:
+        link = urldefrag(link.strip())[0]
+        if link.startswith(("http://", "https://")):
+            links.append(link)
+    return links
+
+
+class Crawler:
+    """Breadth-first, bounded-concurrency crawler writing into a ``DocumentStore``."""
+
+    def __init__(self, config: CrawlConfig, store: Optional[DocumentStore] = None):
+        self.config = config
+        self.store = store or default_store()
+        self.report = CrawlReport()
+        self._throttle = HostThrottle(config.host_delay_seconds)
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_lock = threading.Lock()
+        self._report_lock = threading.Lock()
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None):
+        from internal_audit_validation_system.tools.http import _requests
+
+        requests = _requests()
+        host = urlparse(url).netloc
+        lock = self._throttle.acquire(host)
+        try:
+            return requests.get(
+                url,
+                headers={"User-Agent": USER_AGENT, **(headers or {})},
+                timeout=self.config.timeout,
+                verify=False,  # Regulator sites with certificate issues, as in the tools
+            )
+        finally:
+            self._throttle.release(host, lock)
+
+    def _allowed(self, url: str) -> bool:
+        if not self.config.respect_robots:
+            return True
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self._robots_lock:
+            known = origin in self._robots
+            parser = self._robots.get(origin)
+        if not known:
+            parser = None
+            try:
+                response = self._get(f"{origin}/robots.txt")
+                if response.status_code == 200:
+                    parser = RobotFileParser()
+                    parser.parse(response.text.splitlines())
+            except Exception:
+                parser = None  # Unreachable robots.txt: allow, the fetch itself will report errors
+            with self._robots_lock:
+                self._robots[origin] = parser
+        return parser is None or parser.can_fetch(USER_AGENT, url)
+
+    def _record(self, bucket: str, item) -> None:
+        with self._report_lock:
+            getattr(self.report, bucket).append(item)
+
+    def crawl_one(self, url: str) -> List[str]:
+        """Fetch or revalidate ``url`` into the store and return the links it exposes."""
+        if not self._allowed(url):
+            self._record("disallowed", url)
+            return []
+
+        stored = self.store.get(url)
+        conditional: Dict[str, str] = {}
+        if stored is not None:
+            if stored.etag:
+                conditional["If-None-Match"] = stored.etag
+            if stored.last_modified:
+                conditional["If-Modified-Since"] = stored.last_modified
+
+        try:
+            response = self._get(url, conditional)
+            if response.status_code == 304 and stored is not None:
+                self.store.touch(url, response.headers)
+                self._record("not_modified", url)
+                body, content_type = stored.content, stored.content_type
+            else:
+                response.raise_for_status()
+                body, content_type = response.content, response.headers.get("Content-Type", "")
+                if stored is not None and stored.sha256 == hashlib.sha256(body).hexdigest():
+                    self.store.touch(url, response.headers)
+                    self._record("unchanged", url)
+                else:
+                    self.store.put(url, body, response.headers)
+                    self._record("fetched", url)
+        except Exception as exc:
+            self._record("failed", (url, str(exc)))
+            return []
+
+        return _discover_links(url, body, content_type)
+
+    def run(self) -> CrawlReport:
+        frontier = list(dict.fromkeys(self.config.sitemaps + self.config.seeds))
+        seen = set(frontier)
+        depth = 0
+        budget = self.config.max_documents
+
+        with ThreadPoolExecutor(max_workers=max(self.config.max_workers, 1)) as pool:
+            while frontier and budget > 0:
+                batch, frontier = frontier[:budget], []
+                budget -= len(batch)
+                for url, links in zip(batch, pool.map(self.crawl_one, batch)):
+                    # Sitemap entries are targets in their own right, so they do not consume depth
+                    from_sitemap = url in self.config.sitemaps
+                    if depth >= self.config.max_depth and not from_sitemap:
+                        continue
+                    for link in links:
+                        if link not in seen and self.config.in_scope(link):
+                            seen.add(link)
+                            frontier.append(link)
+                depth += 1
+        return self.report
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Prefetch HKMA/SFC regulatory documents into the local store.")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG_PATH), help="Path to the crawl seeds YAML file.")
+    parser.add_argument("--store", help="Document store directory (default: AUDIT_DOCUMENT_STORE or .cache/documents).")
+    parser.add_argument("--max-documents", type=int, help="Override the configured document budget.")
+    parser.add_argument("--workers", type=int, help="Override the configured concurrency.")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    config = CrawlConfig.from_yaml(Path(args.config))
+    if args.max_documents is not None:
+        config.max_documents = args.max_documents
+    if args.workers is not None:
+        config.max_workers = args.workers
+    store = DocumentStore(Path(args.store)) if args.store else default_store()
+
+    started = time.perf_counter()
+    report = Crawler(config, store).run()
+    summary = dict(report.as_dict(), seconds=round(time.perf_counter() - started, 2))
+    summary["retention"] = store.prune()
+    summary["store"] = store.stats()
+    print(json.dumps(summary, indent=2))
+    return 1 if report.failed and not (report.fetched or report.unchanged or report.not_modified) else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
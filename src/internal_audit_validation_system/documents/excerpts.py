@@ -0,0 +1,242 @@
+"""Deterministic verification of policy-table excerpts against their sources.
+
+Each cited document is taken from the document store (every fetch made during
+a run is written through to it), reduced to plain text and indexed by word
+trigrams. A row's Key Excerpt is then checked against the document its link
+points at: an exact match of the normalised word sequence, else an
+approximate match when enough of the excerpt's trigrams fall inside one
+excerpt-sized window of the source (tolerating elisions, re-punctuation and
+the odd changed word). Indexes are cached per document version, so checking
+a table against already-indexed sources takes milliseconds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from internal_audit_validation_system.documents.store import DocumentStore, StoredDocument
+from internal_audit_validation_system.policy_table import PolicyRow, normalise_url
+
+NGRAM = 3
+# Share of the excerpt's trigrams that must occur within one window of the source
+APPROXIMATE_THRESHOLD = 0.6
+# Extra source words allowed in the matching window, relative to the excerpt length
+WINDOW_SLACK = 0.5
+
+EXACT = "exact"
+APPROXIMATE = "approximate"
+MISMATCH = "mismatch"
+UNINDEXED = "unindexed"
+# The cited document is stored but could not be read or indexed
+UNVERIFIABLE = "unverifiable"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words and numbers; punctuation, quotes and whitespace are ignored."""
+    text = unicodedata.normalize("NFKC", text).translate(_QUOTES).lower()
+    return _TOKEN.findall(text)
+
+
+class _TextExtractor(HTMLParser):
+    _SKIPPED = {"script", "style", "noscript", "template"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIPPED:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIPPED and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def document_text(document: StoredDocument) -> str:
+    """Plain text of a stored PDF, HTML page or text document."""
+    content_type = document.content_type.lower()
+    if "pdf" in content_type or document.content.startswith(b"%PDF"):
+        from internal_audit_validation_system.tools.pdf_extract import extract_pages
+
+        pages, _ = extract_pages(document.content)
+        return "\n".join(text for _, text in pages)
+    text = document.content.decode("utf-8", errors="replace")
+    if "html" in content_type or "<html" in text[:2048].lower():
+        parser = _TextExtractor()
+        parser.feed(text)
+        parser.close()
+        return " ".join(parser.parts)
+    return text
+
+
+class DocumentGrams:
+    """Word tokens of one document and the positions of each word trigram."""
+
+    def __init__(self, text: str, n: int = NGRAM):
+        self.n = n
+        self.tokens = tokenize(text)
+        self.joined = f" {' '.join(self.tokens)} "
+        self.postings: Dict[Tuple[str, ...], List[int]] = {}
+        for position in range(len(self.tokens) - n + 1):
+            self.postings.setdefault(tuple(self.tokens[position:position + n]), []).append(position)
+
+
+@dataclass(frozen=True)
+class ExcerptMatch:
+    """Outcome of checking one excerpt against one source document."""
+
+    status: str
+    score: float = 0.0
+    source_text: str = ""
+    note: str = ""
+
+    @property
+    def verified(self) -> bool:
+        return self.status in (EXACT, APPROXIMATE)
+
+
+def match_excerpt(excerpt: str, grams: DocumentGrams) -> ExcerptMatch:
+    """Exact, approximate or mismatched occurrence of ``excerpt`` in a document."""
+    words = tokenize(excerpt)
+    if not words:
+        return ExcerptMatch(MISMATCH)
+    if f" {' '.join(words)} " in grams.joined:
+        return ExcerptMatch(EXACT, 1.0, " ".join(words))
+    if len(words) < grams.n:
+        return ExcerptMatch(MISMATCH)
+
+    # (source position, excerpt trigram id) of every shared trigram, in source order. Repeated
+    # trigrams of the excerpt count once, so a repetitive excerpt cannot multiply the hits.
+    shared = {tuple(words[index:index + grams.n]) for index in range(len(words) - grams.n + 1)}
+    hits = sorted(
+        (position, gram_id)
+        for gram_id, gram in enumerate(shared)
+        for position in grams.postings.get(gram, ())
+    )
+    total = len(shared)
+    window = int(len(words) * (1 + WINDOW_SLACK))
+    # Slide one window over the hits, counting the trigrams inside it: linear in the hits
+    best, best_start = 0, 0
+    inside: Dict[int, int] = {}
+    stop = 0
+    for position, gram_id in hits:
+        while stop < len(hits) and hits[stop][0] < position + window:
+            inside[hits[stop][1]] = inside.get(hits[stop][1], 0) + 1
+            stop += 1
+        if len(inside) > best:
+            best, best_start = len(inside), position
+        inside[gram_id] -= 1
+        if not inside[gram_id]:
+            del inside[gram_id]
+    score = best / total
+    source_text = " ".join(grams.tokens[best_start:best_start + len(words)]) if best else ""
+    return ExcerptMatch(APPROXIMATE if score >= APPROXIMATE_THRESHOLD else MISMATCH, score, source_text)
+
+
+# Indexed documents by content hash, shared across tables and tasks of a run
+_GRAMS: "OrderedDict[str, DocumentGrams]" = OrderedDict()
+_GRAMS_LOCK = threading.Lock()
+_GRAMS_SIZE = 32
+
+
+def _document_grams(document: StoredDocument) -> DocumentGrams:
+    key = document.sha256 or hashlib.sha256(document.content).hexdigest()
+    with _GRAMS_LOCK:
+        if key in _GRAMS:
+            _GRAMS.move_to_end(key)
+            return _GRAMS[key]
+    grams = DocumentGrams(document_text(document))
+    with _GRAMS_LOCK:
+        _GRAMS[key] = grams
+        while len(_GRAMS) > _GRAMS_SIZE:
+            _GRAMS.popitem(last=False)
+    return grams
+
+
+@dataclass(frozen=True)
+class RowVerification:
+    """Verification of one table row (``row`` is 1-based)."""
+
+    row: int
+    url: Optional[str]
+    match: ExcerptMatch
+
+
+class ExcerptIndex:
+    """Trigram indexes of source documents keyed by normalised URL."""
+
+    def __init__(self):
+        self._documents: Dict[str, DocumentGrams] = {}
+        # Normalised URL -> why its stored document could not be indexed
+        self.errors: Dict[str, str] = {}
+
+    def add(self, url: str, text: str) -> None:
+        self._documents[normalise_url(url)] = DocumentGrams(text)
+
+    def add_document(self, document: StoredDocument) -> None:
+        self._documents[normalise_url(document.url)] = _document_grams(document)
+
+    def __contains__(self, url: str) -> bool:
+        return normalise_url(url) in self._documents
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @classmethod
+    def from_store(cls, store: DocumentStore, urls: Iterable[str]) -> "ExcerptIndex":
+        """Index the stored copies of ``urls``; URLs that were never fetched are skipped.
+
+        URLs are matched after normalisation, so a row citing ``http://www.sfc.hk/x/``
+        finds the document fetched as ``https://sfc.hk/x``. A stored document that
+        cannot be read or parsed is recorded in ``errors`` and makes only the rows
+        citing it unverifiable.
+        """
+        index = cls()
+        wanted = {normalise_url(url): url for url in urls if url}
+        missing = [key for key, url in wanted.items() if not index._add_stored(store, key, url)]
+        if missing:
+            stored = {normalise_url(url): url for url in store.urls()}
+            for key in missing:
+                if key in stored:
+                    index._add_stored(store, key, stored[key])
+        return index
+
+    def _add_stored(self, store: DocumentStore, key: str, url: str) -> bool:
+        """Index the stored copy of ``url``; False if the store has none."""
+        try:
+            document = store.get(url)
+            if document is None:
+                return False
+            self.add_document(document)
+        except Exception as exc:
+            # A corrupt blob or a PDF the extractor rejects; the other documents are still indexed
+            self.errors[key] = f"{type(exc).__name__}: {exc}"
+        return True
+
+    def verify(self, url: Optional[str], excerpt: str) -> ExcerptMatch:
+        key = normalise_url(url) if url else None
+        if key in self.errors:
+            return ExcerptMatch(UNVERIFIABLE, note=self.errors[key])
+        grams = self._documents.get(key) if key else None
+        if grams is None:
+            return ExcerptMatch(UNINDEXED)
+        return match_excerpt(excerpt, grams)
+
+    def verify_rows(self, rows: Sequence[PolicyRow]) -> List[RowVerification]:
+        return [RowVerification(number, row.url, self.verify(row.url, row.key_excerpt)) for number, row in enumerate(rows, 1)]
@@ -0,0 +1,144 @@
+"""Heading and clause index over extracted regulatory document text.
+
+SFC codes and HKMA manuals are organised as chapters, parts and numbered
+paragraphs ("5.1.3", "Chapter 3", "Schedule 7"). ``SectionIndex`` detects
+those headings in page-extracted text, records where each one starts and ends
+(characters and pages) and serves a single section or a page range, so agents
+can read "Paragraph 5.1.3" without pulling the whole document into context.
+"""
+
+import bisect
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+PageText = Tuple[int, str]
+
+# "5", "5.1", "5.1.3" followed by a capitalised title; at most three digits per part
+# keeps four-digit years ("2019 Annual") out of the index
+_NUMBERED_HEADING = re.compile(r"^(\d{1,3}(?:\.\d{1,3}){0,4})\.?\s+([A-Z(\"'][^\n]{0,150})$")
+# Titles after an undotted number that are really a date ("3 April 2020") or an
+# amount ("100 HKD minimum") in a clause's body
+_MONTH = re.compile(
+    r"^(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\b\.?", re.IGNORECASE
+)
+_CODE = re.compile(r"^[A-Z]{2,5}\b")
+_YEAR_END = re.compile(r"\b(?:19|20)\d{2}[.,;)]?$")
+_NAMED_HEADING = re.compile(
+    r"^(Chapter|Part|Section|Schedule|Appendix|Annex)\s+([0-9]{1,3}[A-Z]?|[IVXLC]{1,6}|[A-Z])\b[\s:.\-–—]*([^\n]{0,150})$",
+    re.IGNORECASE,
+)
+_QUERY_PREFIX = re.compile(r"^(?:paragraph|para\.?|clause|section|§)\s*", re.IGNORECASE)
+_NAMED_LEVEL = {"part": 0, "chapter": 0, "schedule": 0, "appendix": 0, "annex": 0, "section": 1}
+
+
+@dataclass(frozen=True)
+class Section:
+    """One detected heading and the span of text it governs."""
+
+    number: str
+    title: str
+    level: int
+    page_start: int
+    page_end: int
+    start: int
+    end: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.number} {self.title}".strip()
+
+
+def _heading(line: str) -> Optional[Tuple[str, str, int]]:
+    """``(number, title, level)`` for a heading line, or None."""
+    line = line.strip()
+    match = _NUMBERED_HEADING.match(line)
+    if match:
+        number, title = match.groups()
+        title = title.strip()
+        if "." not in number and (_MONTH.match(title) or _CODE.match(title) or _YEAR_END.search(title)):
+            return None
+        return number, title, number.count(".") + 1
+    match = _NAMED_HEADING.match(line)
+    if match:
+        kind, number, title = match.groups()
+        return f"{kind.title()} {number.upper()}", title.strip(), _NAMED_LEVEL[kind.lower()]
+    return None
+
+
+class SectionIndex:
+    """Table of contents with character and page offsets for one document."""
+
+    def __init__(self, pages: Sequence[PageText]):
+        self._pages = list(pages)
+        parts, offsets, position = [], [], 0
+        for page_number, text in self._pages:
+            offsets.append((position, page_number))
+            parts.append(text)
+            position += len(text) + 1
+        self.text = "\n".join(parts)
+        self._page_offsets = offsets
+        self.sections = self._detect()
+
+    def _page_at(self, offset: int) -> int:
+        if not self._page_offsets:
+            return 1
+        index = bisect.bisect_right([start for start, _ in self._page_offsets], offset) - 1
+        return self._page_offsets[max(index, 0)][1]
+
+    def _detect(self) -> List[Section]:
+        headings = []
+        position = 0
+        # Top-level number of the last numbered heading; an undotted number must follow on from it
+        # (or restart at 1), so a sentence opening with a number ("12 The client must") is body text
+        top: Optional[int] = None
+        for line in self.text.split("\n"):
+            heading = _heading(line)
+            if heading is not None and heading[0][0].isdigit():
+                first = int(heading[0].split(".")[0])
+                if "." not in heading[0] and top is not None and first not in (top + 1, 1):
+                    heading = None
+                else:
+                    top = first
+            if heading is not None:
+                headings.append((position, *heading))
+            position += len(line) + 1
+
+        sections = []
+        for index, (start, number, title, level) in enumerate(headings):
+            # A section runs until the next heading at the same or a higher level
+            end = len(self.text)
+            for next_start, _, _, next_level in headings[index + 1:]:
+                if next_level <= level:
+                    end = next_start
+                    break
+            sections.append(Section(number, title, level, self._page_at(start), self._page_at(max(end - 1, start)), start, end))
+        return sections
+
+    def find(self, query: str) -> Optional[Section]:
+        """Section by clause number ("5.1.3", "Paragraph 5.1.3", "Chapter 3") or title words."""
+        query = _QUERY_PREFIX.sub("", query.strip()).rstrip(".")
+        lowered = query.lower()
+        for section in self.sections:
+            if section.number.lower() == lowered:
+                return section
+        for section in self.sections:
+            if lowered and lowered in section.title.lower():
+                return section
+        return None
+
+    def section_text(self, section: Section) -> str:
+        return self.text[section.start:section.end].strip()
+
+    def page_range(self, first: int, last: int) -> str:
+        """Text of pages ``first``..``last`` (inclusive, 1-based) with the usual page markers."""
+        return "\n\n".join(
+            f"--- Page {page_number} ---\n{text}" for page_number, text in self._pages if first <= page_number <= last and text
+        )
+
+    def table_of_contents(self) -> str:
+        lines = [
+            f"{'  ' * section.level}{section.label} (pages {section.page_start}-{section.page_end})"
+            for section in self.sections
+        ]
+        return "\n".join(lines)
@@ -0,0 +1,293 @@
+"""Content-addressed, compressed store of fetched regulatory documents.
+
+Document bodies are stored once per distinct version as zlib-compressed blobs
+named by their SHA-256 (``<root>/blobs/ab/abcdef....z``), so re-fetching an
+unchanged PDF, or the same PDF under two URLs, costs no extra disk. A SQLite
+index records which version each URL currently points at, every version seen
+per URL (hash, size, first/last seen) and the HTTP validators needed to
+revalidate. ``prune`` applies the retention policy and garbage-collects blobs
+no version references any more.
+
+The crawler writes into the store ahead of a run; the tools read warm copies
+from it and write live downloads back through ``tools/http.py``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+DEFAULT_STORE_ROOT = Path(".cache") / "documents"
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+SCHEMA_VERSION = 1
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    "sha256 TEXT PRIMARY KEY, size INTEGER NOT NULL, stored_size INTEGER NOT NULL, created_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS documents ("
+    "url TEXT PRIMARY KEY, sha256 TEXT NOT NULL REFERENCES blobs(sha256), content_type TEXT NOT NULL, "
+    "fetched_at REAL NOT NULL, etag TEXT, last_modified TEXT)",
+    "CREATE TABLE IF NOT EXISTS versions ("
+    "url TEXT NOT NULL, sha256 TEXT NOT NULL REFERENCES blobs(sha256), size INTEGER NOT NULL, "
+    "first_seen REAL NOT NULL, last_seen REAL NOT NULL, PRIMARY KEY (url, sha256))",
+)
+
+
+@dataclass(frozen=True)
+class StoredDocument:
+    """A stored document body and the metadata needed to revalidate it."""
+
+    url: str
+    content: bytes
+    content_type: str
+    sha256: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+
+@dataclass(frozen=True)
+class DocumentVersion:
+    """One distinct body seen for a URL."""
+
+    url: str
+    sha256: str
+    size: int
+    first_seen: float
+    last_seen: float
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How many superseded versions to keep per URL and for how long.
+
+    The current version of every URL is always kept.
+    """
+
+    keep_versions: int = 3
+    max_version_age_days: Optional[float] = 365
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        keep = os.environ.get("AUDIT_DOCUMENT_KEEP_VERSIONS")
+        age = os.environ.get("AUDIT_DOCUMENT_RETENTION_DAYS")
+        return cls(
+            keep_versions=int(keep) if keep else cls.keep_versions,
+            max_version_age_days=float(age) if age else cls.max_version_age_days,
+        )
+
+
+def _lowered(headers: Optional[Mapping[str, str]]) -> Dict[str, str]:
+    return {key.lower(): value for key, value in (headers or {}).items()}
+
+
+class DocumentStore:
+    """Local document store shared by the crawler and the fetching tools.
+
+    A connection is opened per operation so the store is safe to share between
+    threads and between concurrent processes on the same machine.
+    """
+
+    def __init__(self, root: Path = DEFAULT_STORE_ROOT, compression_level: int = 6):
+        self.root = Path(root)
+        self.compression_level = compression_level
+        self._blobs_dir = self.root / "blobs"
+        self._blobs_dir.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.root / "index.sqlite3", timeout=30)
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self._blobs_dir / sha256[:2] / f"{sha256}.z"
+
+    def _read_blob(self, sha256: str) -> Optional[bytes]:
+        try:
+            return zlib.decompress(self._blob_path(sha256).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def _write_blob(self, sha256: str, content: bytes, compressed: Optional[bytes] = None) -> int:
+        """Write the blob unless an identical version is already stored; return its stored size.
+
+        Called inside the index write transaction, so ``prune`` cannot delete an
+        existing blob between this check and the row that refers to it.
+        """
+        path = self._blob_path(sha256)
+        if path.exists():
+            return path.stat().st_size
+        path.parent.mkdir(exist_ok=True)
+        if compressed is None:
+            compressed = zlib.compress(content, self.compression_level)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(compressed)
+        os.replace(temporary, path)
+        return len(compressed)
+
+    def get(self, url: str) -> Optional[StoredDocument]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT sha256, content_type, fetched_at, etag, last_modified FROM documents WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        sha256, content_type, fetched_at, etag, last_modified = row
+        content = self._read_blob(sha256)
+        if content is None:
+            return None
+        return StoredDocument(url, content, content_type, sha256, fetched_at, etag, last_modified)
+
+    def get_fresh(self, url: str, max_age: float = DEFAULT_MAX_AGE_SECONDS) -> Optional[StoredDocument]:
+        """Return the stored document if it was fetched or revalidated within ``max_age`` seconds."""
+        document = self.get(url)
+        if document is None or document.age() > max_age:
+            return None
+        return document
+
+    def get_version(self, sha256: str) -> Optional[bytes]:
+        """Body of any stored version by content hash."""
+        return self._read_blob(sha256)
+
+    def versions(self, url: str) -> List[DocumentVersion]:
+        """Every retained version of ``url``, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT url, sha256, size, first_seen, last_seen FROM versions WHERE url = ? ORDER BY last_seen DESC",
+                (url,),
+            ).fetchall()
+        return [DocumentVersion(*row) for row in rows]
+
+    def put(
+        self,
+        url: str,
+        content: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+        fetched_at: Optional[float] = None,
+    ) -> StoredDocument:
+        """Record ``content`` as the current version of ``url``, storing the blob only if it is new."""
+        lowered = _lowered(headers)
+        document = StoredDocument(
+            url=url,
+            content=content,
+            content_type=lowered.get("content-type", ""),
+            sha256=hashlib.sha256(content).hexdigest(),
+            fetched_at=fetched_at or time.time(),
+            etag=lowered.get("etag"),
+            last_modified=lowered.get("last-modified"),
+        )
+        # Compress outside the write lock; the blob may turn out to be stored already
+        compressed = None if self._blob_path(document.sha256).exists() else zlib.compress(content, self.compression_level)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            stored_size = self._write_blob(document.sha256, content, compressed)
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs (sha256, size, stored_size, created_at) VALUES (?, ?, ?, ?)",
+                (document.sha256, len(content), stored_size, document.fetched_at),
+            )
+            conn.execute(
+                "INSERT INTO versions (url, sha256, size, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (url, sha256) DO UPDATE SET last_seen = excluded.last_seen",
+                (url, document.sha256, len(content), document.fetched_at, document.fetched_at),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (url, sha256, content_type, fetched_at, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, document.sha256, document.content_type, document.fetched_at,
+                 document.etag, document.last_modified),
+            )
+        return document
+
+    def touch(self, url: str, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Mark a stored document as revalidated now (e.g. after HTTP 304)."""
+        lowered = _lowered(headers)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE documents SET fetched_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, lowered.get("etag"), lowered.get("last-modified"), url),
+            )
+            conn.execute(
+                "UPDATE versions SET last_seen = ? WHERE url = ? "
+                "AND sha256 = (SELECT sha256 FROM documents WHERE url = ?)",
+                (now, url, url),
+            )
+
+    def urls(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT url FROM documents ORDER BY url")]
+
+    def prune(self, policy: Optional[RetentionPolicy] = None) -> Dict[str, int]:
+        """Drop superseded versions outside ``policy`` and delete unreferenced blobs."""
+        policy = policy or RetentionPolicy.from_env()
+        cutoff = time.time() - policy.max_version_age_days * 86400 if policy.max_version_age_days is not None else None
+        with closing(self._connect()) as conn, conn:
+            # Blobs are unlinked before the transaction commits, so a concurrent put waits instead of
+            # finding a blob about to be deleted and recording a row that points at it
+            conn.execute("BEGIN IMMEDIATE")
+            current = dict(conn.execute("SELECT url, sha256 FROM documents"))
+            rows = conn.execute("SELECT url, sha256, last_seen FROM versions ORDER BY url, last_seen DESC").fetchall()
+            expired, kept = [], {}
+            for url, sha256, last_seen in rows:
+                if current.get(url) == sha256:
+                    continue
+                kept[url] = kept.get(url, 0) + 1
+                if kept[url] > policy.keep_versions or (cutoff is not None and last_seen < cutoff):
+                    expired.append((url, sha256))
+            conn.executemany("DELETE FROM versions WHERE url = ? AND sha256 = ?", expired)
+            orphans = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT sha256 FROM blobs WHERE sha256 NOT IN (SELECT sha256 FROM versions) "
+                    "AND sha256 NOT IN (SELECT sha256 FROM documents)"
+                )
+            ]
+            conn.executemany("DELETE FROM blobs WHERE sha256 = ?", [(sha256,) for sha256 in orphans])
+            for sha256 in orphans:
+                self._blob_path(sha256).unlink(missing_ok=True)
+        return {"versions_removed": len(expired), "blobs_removed": len(orphans)}
+
+    def stats(self) -> Dict[str, int]:
+        """Sizes of the store: URLs, distinct versions, raw and on-disk bytes."""
+        with closing(self._connect()) as conn:
+            urls = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            versions = conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0]
+            blobs, raw, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+        return {"urls": urls, "versions": versions, "blobs": blobs, "raw_bytes": raw, "stored_bytes": stored}
+
+
+_STORES: Dict[Path, DocumentStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def default_store() -> DocumentStore:
+    """The store under ``AUDIT_DOCUMENT_STORE`` (default ``.cache/documents``), shared per process."""
+    root = Path(os.environ.get("AUDIT_DOCUMENT_STORE", str(DEFAULT_STORE_ROOT))).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(root)
+        if store is None:
+            store = _STORES[root] = DocumentStore(root)
+        return store
+
+
+def document_max_age() -> float:
+    """Seconds a stored copy is served without revalidation (``AUDIT_DOCUMENT_MAX_AGE_DAYS``, default 7)."""
+    days = os.environ.get("AUDIT_DOCUMENT_MAX_AGE_DAYS")
+    return float(days) * 24 * 60 * 60 if days else DEFAULT_MAX_AGE_SECONDS
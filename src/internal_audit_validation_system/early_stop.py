@@ -0,0 +1,199 @@
+"""Early stop for the retrieval agents once their findings are sufficient.
+
+The HKMA and SFC specialists run with ``max_iter=25`` and often keep searching
+long after they have enough high-confidence rows. Each retrieval task has a
+``StopPolicy`` (``config/early_stop.yaml``). The agents are asked to keep their
+findings table in their Thought, and an ``EarlyStopMonitor`` on the agent's
+step callback checks that table after every step against the retrieval
+criteria:
+
+- the CPU checks of the post-run harness (table present, row content, link format)
+- a minimum number of rows
+- coverage of the task's regulator
+- a URL or path for every row
+- enough rows at the required confidence
+
+Once the policy is met the monitor lowers the executor's ``max_iter`` so the
+next step asks the agent for its final answer. The iterations and an estimate
+of the tokens saved are reported in ``run_metrics.json``; the records belong to
+the current run (``tools.memo.start_run``), so each run of a batch reports only
+its own. ``AUDIT_EARLY_STOP=off`` disables the monitor.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from internal_audit_validation_system.evaluation.criteria import retrieve_policies_checks, run_checks
+from internal_audit_validation_system.policy_table import PolicyTable, parse_markdown_table
+from internal_audit_validation_system.tools.memo import RunMemo, current_run_memo
+
+DEFAULT_POLICY_PATH = Path(__file__).resolve().parent / "config" / "early_stop.yaml"
+
+CONFIDENCE_LEVELS = {"low": 1, "med": 2, "medium": 2, "high": 3}
+# Checks of the retrieval harness that can judge an intermediate table
+STOP_CHECKS = ("table_present", "table_content_quality", "link_column_format")
+REGULATOR_DOMAINS = {"HKMA": "hkma.gov.hk", "SFC": "sfc.hk"}
+
+_MISSING = {"", "n/a", "na", "unknown", "-", "none"}
+
+
+def early_stop_enabled() -> bool:
+    """``AUDIT_EARLY_STOP``: on by default; ``off``, ``0`` or ``false`` disables it."""
+    return os.environ.get("AUDIT_EARLY_STOP", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+def _confidence(value: str) -> int:
+    return CONFIDENCE_LEVELS.get(value.strip().lower().rstrip("."), 0)
+
+
+def _cites(row, regulator: str) -> bool:
+    text = f"{row.source_name} {row.document_url} {row.link_or_reference}".lower()
+    domain = REGULATOR_DOMAINS.get(regulator.upper())
+    return regulator.lower() in text or (domain is not None and domain in text)
+
+
+@dataclass(frozen=True)
+class StopPolicy:
+    """When a retrieval agent's intermediate findings are good enough to stop searching."""
+
+    min_rows: int = 3
+    regulators: Tuple[str, ...] = ()
+    min_confidence: str = "High"
+    confident_rows: int = 0
+    require_links: bool = True
+
+    def __post_init__(self) -> None:
+        if self.min_confidence.lower() not in CONFIDENCE_LEVELS:
+            raise ValueError(f"Unknown min_confidence '{self.min_confidence}'. Expected one of: Low, Med, High")
+
+    def unmet(self, table: Optional[PolicyTable], task_name: str = "") -> List[str]:
+        """Criteria the findings table does not meet yet; empty when the agent can stop."""
+        if table is None:
+            return ["no findings table"]
+        checks = [check for check in retrieve_policies_checks if check.id in STOP_CHECKS]
+        if not self.require_links:
+            checks = [check for check in checks if check.id != "link_column_format"]
+        evaluation = run_checks(task_name, "", checks, fast=True, policy_table=table)
+        unmet = [f"{check_id}: {notes or 'failed'}" for check_id, notes in evaluation.failed]
+        if len(table.rows) < self.min_rows:
+            unmet.append(f"{len(table.rows)} of {self.min_rows} rows")
+        for regulator in self.regulators:
+            if not any(_cites(row, regulator) for row in table.rows):
+                unmet.append(f"no {regulator} source")
+        if self.require_links:
+            missing = [
+                str(number)
+                for number, row in enumerate(table.rows, start=1)
+                if row.url is None and row.document_url.strip().lower() in _MISSING
+            ]
+            if missing:
+                unmet.append(f"rows without a URL or path: {', '.join(missing)}")
+        level = _confidence(self.min_confidence)
+        confident = sum(1 for row in table.rows if _confidence(row.confidence) >= level)
+        if confident < self.confident_rows:
+            unmet.append(f"{confident} of {self.confident_rows} rows with {self.min_confidence} confidence")
+        return unmet
+
+
+def load_stop_policies(path: Path = DEFAULT_POLICY_PATH) -> Dict[str, StopPolicy]:
+    """Load per-task stop policies from YAML (task name -> policy fields)."""
+    import yaml
+
+    raw = yaml.safe_load(Path(path).read_text()) or {}
+    policies: Dict[str, StopPolicy] = {}
+    for task_name, options in raw.items():
+        options = dict(options or {})
+        policies[task_name] = StopPolicy(
+            min_rows=int(options.get("min_rows", 3)),
+            regulators=tuple(options.get("regulators") or ()),
+            min_confidence=str(options.get("min_confidence", "High")),
+            confident_rows=int(options.get("confident_rows", 0)),
+            require_links=bool(options.get("require_links", True)),
+        )
+    return policies
+
+
+@dataclass
+class EarlyStopRecord:
+    """How one retrieval task's agent loop ended."""
+
+    task_name: str
+    max_iter: int
+    iterations: int = 0
+    stopped_early: bool = False
+    rows: int = 0
+    # Upper bound: the agent could have used its whole max_iter budget
+    iterations_saved: int = 0
+    # iterations_saved times the tokens of the last step (the prompt only grows from there)
+    tokens_saved_estimate: int = 0
+
+
+# Records by run: a new run (a new run memo) starts without any
+_RECORDS: "weakref.WeakKeyDictionary[RunMemo, Dict[str, EarlyStopRecord]]" = weakref.WeakKeyDictionary()
+_RECORDS_LOCK = threading.Lock()
+
+
+def early_stop_stats() -> Dict[str, Dict[str, Any]]:
+    """Records of the retrieval tasks monitored in the current run, by task name."""
+    with _RECORDS_LOCK:
+        records = _RECORDS.get(current_run_memo(), {})
+        return {task_name: asdict(record) for task_name, record in records.items()}
+
+
+class EarlyStopMonitor:
+    """Step callback ending an agent's loop once its findings meet ``policy``.
+
+    ``executor`` is the agent's ``CrewAgentExecutor`` and ``tokens`` returns the
+    agent's running token total. ``then`` is the step callback it replaces, which
+    is still called for every step.
+    """
+
+    def __init__(
+        self,
+        task_name: str,
+        policy: StopPolicy,
+        executor: Any,
+        tokens: Callable[[], int] = lambda: 0,
+        then: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.task_name = task_name
+        self.policy = policy
+        self.executor = executor
+        self.tokens = tokens
+        self.then = then
+        self.unmet: List[str] = ["no findings table"]
+        self.record = EarlyStopRecord(task_name=task_name, max_iter=executor.max_iter)
+        self._tokens_before = tokens()
+        with _RECORDS_LOCK:
+            _RECORDS.setdefault(current_run_memo(), {})[task_name] = self.record
+
+    def __call__(self, step: Any) -> None:
+        if self.then is not None:
+            self.then(step)
+        # crewAI also calls the step callback with tool results; only the agent's own steps count
+        if not hasattr(step, "thought") or not hasattr(step, "text"):
+            return
+        record = self.record
+        record.iterations = self.executor.iterations + 1
+        tokens = self.tokens()
+        step_tokens, self._tokens_before = tokens - self._tokens_before, tokens
+        if record.stopped_early or not hasattr(step, "tool"):
+            return
+        table = parse_markdown_table(step.thought, self.task_name)
+        if table is None:
+            return
+        self.unmet = self.policy.unmet(table, self.task_name)
+        if self.unmet:
+            return
+        # The next iteration asks the agent for its final answer
+        self.executor.max_iter = min(self.executor.max_iter, record.iterations)
+        record.stopped_early = True
+        record.rows = len(table.rows)
+        record.iterations_saved = max(0, record.max_iter - record.iterations - 1)
+        record.tokens_saved_estimate = record.iterations_saved * step_tokens
@@ -4,6 +4,10 @@ This package groups helper functions used to score agent task outputs and provid
 structured diagnostics on pipeline quality."""
 
 from .criteria import (
+    COST_CPU,
+    COST_EXPENSIVE,
+    COST_IO,
+    CheckDefinition,
     EvaluateResult,
     TaskEvaluation,
     retrieve_policies_checks,
@@ -13,6 +17,10 @@ from .criteria import (
 )
 
 __all__ = [
+    "COST_CPU",
+    "COST_EXPENSIVE",
+    "COST_IO",
+    "CheckDefinition",
     "EvaluateResult",
     "TaskEvaluation",
     "retrieve_policies_checks",
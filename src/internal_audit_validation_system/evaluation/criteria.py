@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import re
-import requests
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from internal_audit_validation_system.policy_table import PolicyTable, REQUIRED_HEADERS, parse_markdown_table
 
 MarkdownText = str
-TaskContext = Dict[str, str]
+# Per-output context shared by the checks; "policy_table" holds the typed table
+# (from the task's JSON sidecar, or parsed once from the markdown)
+TaskContext = Dict[str, Any]
+
+# Cost classes: CPU checks run inline, I/O and expensive checks run in the background
+COST_CPU = "cpu"
+COST_IO = "io"
+COST_EXPENSIVE = "expensive"
 
 
 @dataclass(frozen=True)
@@ -17,6 +27,7 @@ class CheckDefinition:
     description: str
     evaluator: Callable[[MarkdownText, TaskContext], Tuple[bool, Optional[str]]]
     hint: Optional[str] = None
+    cost: str = COST_CPU
 
     def run(self, output: MarkdownText, context: TaskContext) -> Tuple[bool, Optional[str]]:
         """Execute the check safely and capture diagnostic notes."""
@@ -34,6 +45,8 @@ class TaskEvaluation:
     passed: List[str] = field(default_factory=list)
     failed: List[Tuple[str, Optional[str]]] = field(default_factory=list)
     score: float = 0.0
+    skipped: List[str] = field(default_factory=list)
+    durations: Dict[str, float] = field(default_factory=dict)
 
     def as_dict(self) -> Dict[str, object]:
         return {
@@ -41,6 +54,8 @@ class TaskEvaluation:
             "score": self.score,
             "passed": self.passed,
             "failed": [{"id": check_id, "notes": notes} for check_id, notes in self.failed],
+            "skipped": self.skipped,
+            "durations": {check_id: round(seconds, 4) for check_id, seconds in self.durations.items()},
         }
 
 
@@ -72,41 +87,23 @@ def _count_table_rows(output: MarkdownText) -> int:
     return max(0, len(tables) - 2)
 
 
-def _count_policy_table_rows(output: MarkdownText) -> int:
-    """Count rows in the policy table specifically by locating it via headers."""
-    headers = ["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Link or Reference"]
-    header_pattern = r"\|\s*" + r"\s*\|\s*".join(map(re.escape, headers)) + r"\s*\|"
-
-    # Find the header
-    header_match = re.search(header_pattern, output, re.IGNORECASE)
-    if not header_match:
-        return 0
-
-    # Find content after header
-    start_pos = header_match.end()
-    remaining = output[start_pos:]
+def _policy_table(output: MarkdownText, context: Optional[TaskContext] = None) -> Optional[PolicyTable]:
+    """The typed policy table for an output, preferring the one supplied in ``context``."""
+    if context is not None and "policy_table" in context:
+        return context["policy_table"]
+    return parse_markdown_table(output)
 
-    # Skip separator line (e.g., |---|---|---|)
-    lines = remaining.split('\n')
-    if len(lines) < 2:
-        return 0
 
-    # First line after header should be separator
-    if re.match(r'^\s*\|[\s\-:]+\|', lines[0]):
-        lines = lines[1:]
+def _policy_table_present(output: MarkdownText, context: Optional[TaskContext] = None) -> bool:
+    """A policy table with the required headers themselves, not just columns the parser could map."""
+    table = _policy_table(output, context)
+    return table is not None and table.has_columns(REQUIRED_HEADERS, exact=True)
 
-    # Count data rows until we hit a non-table line
-    rows = 0
-    for line in lines:
-        stripped = line.strip()
-        # Check if line is a table row
-        if stripped and re.match(r'^\|.+\|', stripped):
-            rows += 1
-        # Stop at markdown heading or significant non-table content
-        elif stripped and (re.match(r'^#+\s', stripped) or (not stripped.startswith('|') and len(stripped) > 10)):
-            break
 
-    return rows
+def _count_policy_table_rows(output: MarkdownText, context: Optional[TaskContext] = None) -> int:
+    """Count rows in the policy table (other tables in the output are ignored)."""
+    table = _policy_table(output, context)
+    return len(table.rows) if table is not None else 0
 
 
 def _section_present(output: MarkdownText, title: str) -> bool:
@@ -136,157 +133,96 @@ def _bullet_list_after_phrase(output: MarkdownText, phrase: str, min_items: int)
     return bool(re.search(bullet_pattern, remaining, re.MULTILINE))
 
 
-def _extract_policy_table_rows(output: MarkdownText) -> List[str]:
-    """Extract data rows from the policy table."""
-    headers = ["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Link or Reference"]
-    header_pattern = r"\|\s*" + r"\s*\|\s*".join(map(re.escape, headers)) + r"\s*\|"
-
-    # Find the header
-    header_match = re.search(header_pattern, output, re.IGNORECASE)
-    if not header_match:
-        return []
-
-    # Find content after header
-    start_pos = header_match.end()
-    remaining = output[start_pos:]
-
-    # Skip separator line
-    lines = remaining.split('\n')
-    if len(lines) < 2:
-        return []
-
-    # Skip first line if it's the separator
-    start_idx = 0
-    if lines and re.match(r'^\s*\|[\s\-:]+\|[\s\-:|]*$', lines[0]):
-        start_idx = 1
-
-    # Collect data rows (skip separator lines)
-    rows = []
-    for line in lines[start_idx:]:
-        stripped = line.strip()
-        # Skip empty lines and separator lines
-        if not stripped:
-            continue
-        # Stop at markdown heading
-        if re.match(r'^#+\s', stripped):
-            break
-        # Skip separator lines (only contain pipes, dashes, colons, spaces)
-        if re.match(r'^\|[\s\-:|]+\|$', stripped):
-            continue
-        # Add data rows
-        if re.match(r'^\|.+\|', stripped):
-            rows.append(stripped)
-        # Stop at significant non-table content
-        elif not stripped.startswith('|') and len(stripped) > 10:
-            break
-
-    return rows
-
-
-def _validate_table_content(output: MarkdownText) -> Tuple[bool, Optional[str]]:
+def _validate_table_content(output: MarkdownText, context: Optional[TaskContext] = None) -> Tuple[bool, Optional[str]]:
     """Check that table rows have meaningful content in key columns."""
-    rows = _extract_policy_table_rows(output)
-
-    if not rows:
+    table = _policy_table(output, context)
+    if table is None or not table.rows:
         return True, None  # No rows to validate (other checks will catch this)
 
-    for i, row in enumerate(rows):
-        # Split by | and get cells (first and last are empty due to leading/trailing |)
-        cells = row.split('|')
-        # Remove first and last empty cells
-        if len(cells) > 2:
-            cells = cells[1:-1]
-        cells = [cell.strip() for cell in cells]
-
-        if len(cells) >= 5:
-            source_name = cells[0]
-            key_excerpt = cells[2]
-
-            # Check for substantive content (not just whitespace or single characters)
-            if not source_name or len(source_name) < 2:
-                return False, f"Row {i+1} has empty or insufficient Source Name"
-            if not key_excerpt or len(key_excerpt) < 5:
-                return False, f"Row {i+1} has empty or insufficient Key Excerpt"
+    for i, row in enumerate(table.rows):
+        # Check for substantive content (not just whitespace or single characters)
+        if len(row.source_name) < 2:
+            return False, f"Row {i+1} has empty or insufficient Source Name"
+        if len(row.key_excerpt) < 5:
+            return False, f"Row {i+1} has empty or insufficient Key Excerpt"
 
     return True, None
 
 
-def _validate_link_column(output: MarkdownText) -> Tuple[bool, Optional[str]]:
+def _validate_link_column(output: MarkdownText, context: Optional[TaskContext] = None) -> Tuple[bool, Optional[str]]:
     """Check that Link column uses 'N/A' convention for missing links."""
-    rows = _extract_policy_table_rows(output)
-
-    if not rows:
+    table = _policy_table(output, context)
+    if table is None or not table.rows:
         return True, None  # No rows to validate
 
-    for i, row in enumerate(rows):
-        # Split by | and get cells (first and last are empty due to leading/trailing |)
-        cells = row.split('|')
-        # Remove first and last empty cells
-        if len(cells) > 2:
-            cells = cells[1:-1]
-        cells = [cell.strip() for cell in cells]
-
-        if len(cells) >= 5:
-            link_cell = cells[4]
-
-            # If not a URL and not empty, should be N/A
-            if link_cell and not re.match(r'^https?://', link_cell, re.IGNORECASE):
-                if not re.match(r'^n/?a$', link_cell, re.IGNORECASE):
-                    return False, f"Row {i+1} Link column should be a URL or 'N/A', found: '{link_cell}'"
+    for i, row in enumerate(table.rows):
+        link_cell = row.link_or_reference
+        # If not a URL and not empty, should be N/A
+        if link_cell and not re.match(r'^https?://', link_cell, re.IGNORECASE):
+            if not re.match(r'^n/?a$', link_cell, re.IGNORECASE):
+                return False, f"Row {i+1} Link column should be a URL or 'N/A', found: '{link_cell}'"
 
     return True, None
 
 
-def _validate_url_reachability(output: MarkdownText) -> Tuple[bool, Optional[str]]:
+def _validate_url_reachability(output: MarkdownText, context: Optional[TaskContext] = None) -> Tuple[bool, Optional[str]]:
     """Check that URLs in Link column are reachable (return HTTP 2xx or 3xx status).
 
     This validation helps detect hallucinated URLs that agents may fabricate
     by pattern-matching instead of using web search tools.
     """
-    rows = _extract_policy_table_rows(output)
-
-    if not rows:
+    table = _policy_table(output, context)
+    if table is None or not table.rows:
         return True, None  # No rows to validate
 
-    unreachable_urls = []
+    # Imported lazily so structural-only evaluation does not pay for the HTTP stack
+    import requests
+
+    from internal_audit_validation_system.tools.breaker import HostUnavailable, default_breaker
 
-    for i, row in enumerate(rows):
-        # Split by | and get cells
-        cells = row.split('|')
-        if len(cells) > 2:
-            cells = cells[1:-1]
-        cells = [cell.strip() for cell in cells]
-
-        if len(cells) >= 5:
-            link_cell = cells[4]
-
-            # Only check actual URLs, skip N/A entries
-            if link_cell and re.match(r'^https?://', link_cell, re.IGNORECASE):
-                try:
-                    # HEAD request is faster than GET for checking existence
-                    # Timeout of 10 seconds, disable SSL verification for known HKMA cert issues
-                    response = requests.head(
+    unreachable_urls = []
+    # Shared with the tools: hosts known to be down are reported without waiting out the timeout
+    breaker = default_breaker()
+
+    for i, row in enumerate(table.rows):
+        link_cell = row.link_or_reference
+
+        # Only check actual URLs, skip N/A entries
+        if link_cell and re.match(r'^https?://', link_cell, re.IGNORECASE):
+            try:
+                breaker.before(link_cell)
+            except HostUnavailable as e:
+                unreachable_urls.append((i+1, link_cell, f"Skipped: {e.host} is unavailable (circuit open)"))
+                continue
+            try:
+                # HEAD request is faster than GET for checking existence
+                # Timeout of 10 seconds, disable SSL verification for known HKMA cert issues
+                response = requests.head(
+                    link_cell,
+                    timeout=10,
+                    allow_redirects=True,
+                    verify=False  # Disable SSL verification due to HKMA server issues
+                )
+
+                # If HEAD fails, try GET (some servers don't support HEAD)
+                if response.status_code >= 400:
+                    response = requests.get(
                         link_cell,
                         timeout=10,
                         allow_redirects=True,
-                        verify=False  # Disable SSL verification due to HKMA server issues
+                        verify=False
                     )
+                breaker.record_status(link_cell, response.status_code)
 
-                    # If HEAD fails, try GET (some servers don't support HEAD)
-                    if response.status_code >= 400:
-                        response = requests.get(
-                            link_cell,
-                            timeout=10,
-                            allow_redirects=True,
-                            verify=False
-                        )
-
-                    # Accept 2xx and 3xx status codes as valid
-                    if response.status_code >= 400:
-                        unreachable_urls.append((i+1, link_cell, response.status_code))
+                # Accept 2xx and 3xx status codes as valid
+                if response.status_code >= 400:
+                    unreachable_urls.append((i+1, link_cell, response.status_code))
 
-                except requests.exceptions.RequestException as e:
-                    unreachable_urls.append((i+1, link_cell, f"Error: {str(e)}"))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                breaker.record_failure(link_cell, str(e))
+                unreachable_urls.append((i+1, link_cell, f"Error: {str(e)}"))
+            except requests.exceptions.RequestException as e:
+                unreachable_urls.append((i+1, link_cell, f"Error: {str(e)}"))
 
     if unreachable_urls:
         error_details = "\n".join([
@@ -298,51 +234,88 @@ def _validate_url_reachability(output: MarkdownText) -> Tuple[bool, Optional[str
     return True, None
 
 
+def _validate_excerpts(output: MarkdownText, context: Optional[TaskContext] = None) -> Tuple[bool, Optional[str]]:
+    """Check that each Key Excerpt occurs (verbatim or nearly) in the document its link cites.
+
+    Sources are read from the local document store; rows whose document was never
+    fetched, or could not be read or parsed, cannot be verified here and are not
+    counted as failures.
+    """
+    table = _policy_table(output, context)
+    if table is None or not table.rows:
+        return True, None  # No rows to validate
+
+    # Imported lazily: PDF and HTML text extraction is only needed when the check runs
+    from internal_audit_validation_system.documents.excerpts import MISMATCH, UNVERIFIABLE, ExcerptIndex
+    from internal_audit_validation_system.documents.store import default_store
+
+    index = ExcerptIndex.from_store(default_store(), [row.url for row in table.rows if row.url])
+    results = index.verify_rows(table.rows)
+    mismatches = [result for result in results if result.match.status == MISMATCH]
+    unverifiable = "\n".join(
+        f"  - Row {result.row}: unverifiable, {result.url} could not be read ({result.match.note})"
+        for result in results
+        if result.match.status == UNVERIFIABLE
+    )
+    if mismatches:
+        details = "\n".join(
+            f"  - Row {result.row}: excerpt not found in {result.url} (best match {result.match.score:.0%}"
+            + (f": '{result.match.source_text}')" if result.match.source_text else ")")
+            for result in mismatches
+        )
+        message = f"Found {len(mismatches)} excerpt(s) that do not match their cited source:\n{details}"
+        return False, message + (f"\n{unverifiable}" if unverifiable else "")
+    if unverifiable:
+        print(f"Excerpt verification skipped rows whose source could not be read:\n{unverifiable}")
+    return True, None
+
+
 # --- Task specific check collections -------------------------------------- #
 
 def _retrieve_checks() -> List[CheckDefinition]:
-    headers = [
-        "Source Name",
-        "Section / Clause",
-        "Key Excerpt",
-        "Relevance to Observation",
-        "Link or Reference",
-    ]
     return [
         CheckDefinition(
             id="table_present",
             description="Markdown table with required columns exists.",
-            evaluator=lambda output, _: (
-                _markdown_table_present(output, headers),
+            evaluator=lambda output, ctx: (
+                _policy_table_present(output, ctx),
                 "Missing table or incorrect headers."
-                if not _markdown_table_present(output, headers)
+                if not _policy_table_present(output, ctx)
                 else None,
             ),
         ),
         CheckDefinition(
             id="table_rows",
             description="Table contains at least one policy entry.",
-            evaluator=lambda output, _: (
-                (_count_policy_table_rows(output) >= 1),
-                f"Only {_count_policy_table_rows(output)} row(s) detected in policy table.",
+            evaluator=lambda output, ctx: (
+                (_count_policy_table_rows(output, ctx) >= 1),
+                f"Only {_count_policy_table_rows(output, ctx)} row(s) detected in policy table.",
             ),
         ),
         CheckDefinition(
             id="table_content_quality",
             description="Table rows contain meaningful content in Source Name and Key Excerpt columns.",
-            evaluator=lambda output, _: _validate_table_content(output),
+            evaluator=_validate_table_content,
         ),
         CheckDefinition(
             id="link_column_format",
             description="Link column uses 'N/A' for missing links or contains valid URLs.",
-            evaluator=lambda output, _: _validate_link_column(output),
+            evaluator=_validate_link_column,
         ),
         CheckDefinition(
             id="url_reachability",
             description="URLs in Link column are reachable (HTTP 2xx/3xx status) - prevents hallucinated URLs.",
-            evaluator=lambda output, _: _validate_url_reachability(output),
+            evaluator=_validate_url_reachability,
             hint="This check detects fabricated URLs that agents may generate by pattern-matching. "
-                 "If this fails, the agent likely hallucinated URLs instead of using web search tools."
+                 "If this fails, the agent likely hallucinated URLs instead of using web search tools.",
+            cost=COST_IO,
+        ),
+        CheckDefinition(
+            id="excerpt_verification",
+            description="Key Excerpts appear verbatim (or nearly) in the fetched source documents they cite.",
+            evaluator=_validate_excerpts,
+            hint="Quote the source text exactly; paraphrased or invented excerpts fail this check.",
+            cost=COST_IO,
         ),
         CheckDefinition(
             id="critical_requirements",
@@ -419,11 +392,8 @@ def _analyze_checks() -> List[CheckDefinition]:
         CheckDefinition(
             id="policy_table_present",
             description="Carries forward the policy table from Task 1.",
-            evaluator=lambda output, _: (
-                _markdown_table_present(
-                    output,
-                    ["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Link or Reference"],
-                ),
+            evaluator=lambda output, ctx: (
+                _policy_table_present(output, ctx),
                 "Policy table not found in analysis output.",
             ),
         ),
@@ -472,21 +442,62 @@ analyze_compliance_checks = _analyze_checks()
 review_analysis_checks = _review_checks()
 
 
-def run_checks(task_name: str, output: MarkdownText, checks: List[CheckDefinition]) -> TaskEvaluation:
-    """Evaluate a task output against a suite of checks and compute a score."""
+def _timed_run(check: CheckDefinition, output: MarkdownText, context: TaskContext) -> Tuple[bool, Optional[str], float]:
+    started = time.perf_counter()
+    ok, notes = check.run(output, context)
+    return ok, notes, time.perf_counter() - started
+
+
+def run_checks(
+    task_name: str,
+    output: MarkdownText,
+    checks: List[CheckDefinition],
+    fast: bool = False,
+    policy_table: Optional[PolicyTable] = None,
+) -> TaskEvaluation:
+    """Evaluate a task output against a suite of checks and compute a score.
+
+    I/O and expensive checks are started in background threads before the CPU
+    checks run inline, so slow network checks overlap with the cheap ones.
+    With ``fast=True`` only CPU checks run; the rest are listed as skipped and
+    excluded from the score. ``policy_table`` is the task's sidecar table; when
+    omitted the markdown is parsed once and shared by all checks.
+    """
     evaluation = TaskEvaluation(task_name=task_name)
-    if not checks:
+    context: TaskContext = {
+        "policy_table": policy_table if policy_table is not None else parse_markdown_table(output, task_name),
+    }
+    selected = [check for check in checks if not fast or check.cost == COST_CPU]
+    evaluation.skipped = [check.id for check in checks if check not in selected]
+    if not selected:
         evaluation.score = 1.0
         return evaluation
 
+    background = [check for check in selected if check.cost != COST_CPU]
+    outcomes: Dict[str, Tuple[bool, Optional[str], float]] = {}
+    executor = ThreadPoolExecutor(max_workers=len(background)) if background else None
+    try:
+        futures: Dict[str, Future] = {
+            check.id: executor.submit(_timed_run, check, output, context) for check in background
+        }
+        for check in selected:
+            if check.cost == COST_CPU:
+                outcomes[check.id] = _timed_run(check, output, context)
+        for check_id, future in futures.items():
+            outcomes[check_id] = future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
     passed = 0
-    for check in checks:
-        ok, notes = check.run(output, {})
+    for check in selected:
+        ok, notes, elapsed = outcomes[check.id]
+        evaluation.durations[check.id] = elapsed
         if ok:
             evaluation.passed.append(check.id)
             passed += 1
         else:
             evaluation.failed.append((check.id, notes))
 
-    evaluation.score = round(passed / len(checks), 2)
+    evaluation.score = round(passed / len(selected), 2)
     return evaluation
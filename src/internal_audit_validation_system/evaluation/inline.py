@@ -0,0 +1,149 @@
+"""Inline evaluation of task outputs while the crew is still running.
+
+Each configured task gets a crewAI guardrail that scores its output with the
+same criteria used by the post-run harness. Depending on the task policy a
+failure of a blocking check is only reported, sends the task back to its agent
+for a retry, or aborts the pipeline before later stages spend more tokens on a
+structurally broken output. A partial evaluation report is rewritten after
+every evaluated task so progress survives an abort.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from internal_audit_validation_system.evaluation.criteria import TaskEvaluation, run_checks
+from internal_audit_validation_system.evaluation.runner import TASK_TO_CHECKS
+
+REPORT = "report"
+RETRY = "retry"
+ABORT = "abort"
+ON_FAILURE_ACTIONS = (REPORT, RETRY, ABORT)
+
+DEFAULT_POLICY_PATH = Path(__file__).resolve().parent.parent / "config" / "inline_evaluation.yaml"
+PARTIAL_REPORT_FILENAME = "evaluation_partial.json"
+
+
+class EvaluationAborted(Exception):
+    """Raised from a task guardrail when an inline evaluation policy aborts the run."""
+
+    def __init__(self, evaluation: TaskEvaluation, blocking: List[Tuple[str, Optional[str]]]):
+        self.evaluation = evaluation
+        self.blocking = blocking
+        details = "; ".join(f"{check_id}: {notes or 'no details'}" for check_id, notes in blocking)
+        super().__init__(f"Inline evaluation aborted after task '{evaluation.task_name}': {details}")
+
+
+@dataclass(frozen=True)
+class InlinePolicy:
+    """How to react when a task output fails its blocking checks."""
+
+    on_failure: str = REPORT
+    max_retries: int = 0
+    # Empty means every executed check is blocking
+    blocking_checks: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.on_failure not in ON_FAILURE_ACTIONS:
+            raise ValueError(
+                f"Unknown on_failure action '{self.on_failure}'. Expected one of: {', '.join(ON_FAILURE_ACTIONS)}"
+            )
+
+    def blocking_failures(self, evaluation: TaskEvaluation) -> List[Tuple[str, Optional[str]]]:
+        if not self.blocking_checks:
+            return list(evaluation.failed)
+        return [(check_id, notes) for check_id, notes in evaluation.failed if check_id in self.blocking_checks]
+
+
+def load_policies(path: Path = DEFAULT_POLICY_PATH) -> Dict[str, InlinePolicy]:
+    """Load per-task inline policies from YAML (task name -> policy fields)."""
+    import yaml
+
+    raw = yaml.safe_load(Path(path).read_text()) or {}
+    policies: Dict[str, InlinePolicy] = {}
+    for task_name, options in raw.items():
+        options = dict(options or {})
+        policies[task_name] = InlinePolicy(
+            on_failure=str(options.get("on_failure", REPORT)),
+            max_retries=int(options.get("max_retries", 0)),
+            blocking_checks=tuple(options.get("blocking_checks") or ()),
+        )
+    return policies
+
+
+@dataclass
+class InlineEvaluator:
+    """Scores task outputs as they complete and applies the configured policies."""
+
+    audit_observation: str
+    policies: Dict[str, InlinePolicy]
+    report_path: Optional[Path] = None
+    results: Dict[str, TaskEvaluation] = field(default_factory=dict)
+    attempts: Dict[str, int] = field(default_factory=dict)
+    status: str = "running"
+
+    def evaluate(self, task_name: str, output: str) -> TaskEvaluation:
+        """Run the task's cheap (CPU) checks and record the result.
+
+        Network-bound checks are left to the post-run harness so inline scoring stays fast.
+        """
+        evaluation = run_checks(task_name, output, TASK_TO_CHECKS.get(task_name, []), fast=True)
+        self.results[task_name] = evaluation
+        self.attempts[task_name] = self.attempts.get(task_name, 0) + 1
+        return evaluation
+
+    def guardrail_for(self, task_name: str) -> Callable[[Any], Tuple[bool, Any]]:
+        """Build the crewAI guardrail enforcing the policy for ``task_name``."""
+        policy = self.policies.get(task_name, InlinePolicy())
+
+        def guardrail(task_output):
+            raw = getattr(task_output, "raw", task_output)
+            evaluation = self.evaluate(task_name, str(raw))
+            blocking = policy.blocking_failures(evaluation)
+            retries_left = policy.max_retries - (self.attempts[task_name] - 1)
+
+            if blocking and policy.on_failure == RETRY and retries_left > 0:
+                self.write_partial_report()
+                feedback = "\n".join(f"- {check_id}: {notes or 'no details'}" for check_id, notes in blocking)
+                return False, f"The output failed required structural checks:\n{feedback}"
+
+            if blocking and policy.on_failure in (RETRY, ABORT):
+                self.status = "aborted"
+                self.write_partial_report()
+                raise EvaluationAborted(evaluation, blocking)
+
+            self.write_partial_report()
+            return True, raw
+
+        return guardrail
+
+    def task_options(self, task_name: str) -> Dict[str, Any]:
+        """Keyword arguments to pass to ``Task`` so it is evaluated inline."""
+        if task_name not in TASK_TO_CHECKS:
+            return {}
+        policy = self.policies.get(task_name, InlinePolicy())
+        return {
+            "guardrail": self.guardrail_for(task_name),
+            "guardrail_max_retries": max(policy.max_retries, 0),
+        }
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "audit_observation": self.audit_observation,
+            "status": self.status,
+            "updated_at": datetime.utcnow().isoformat() + "Z",
+            "task_results": [
+                dict(evaluation.as_dict(), attempts=self.attempts.get(task_name, 0))
+                for task_name, evaluation in self.results.items()
+            ],
+        }
+
+    def write_partial_report(self) -> None:
+        if self.report_path is None:
+            return
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(json.dumps(self.as_dict(), indent=2))
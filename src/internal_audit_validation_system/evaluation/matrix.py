@@ -0,0 +1,296 @@
+"""Columnar check-result matrix for large evaluation sets.
+
+One row per evaluated task output (run x task), one column per check id. The
+outcome matrix is ``int8`` (1 passed, 0 failed, -1 skipped or not applicable),
+scores are ``float32`` and the task, model and run labels are integer codes into
+small lookup arrays, so 100k evaluations fit in a few megabytes and every
+aggregate is a handful of vectorised NumPy operations. Failure notes are kept
+out of the matrix in a JSON file next to it.
+
+``python -m internal_audit_validation_system.evaluation.matrix summary results.npz``
+prints pass rates and score distributions; ``diff baseline.npz candidate.npz``
+compares two result sets, e.g. the same regression set run on two model versions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from internal_audit_validation_system.evaluation.criteria import EvaluateResult
+
+PASSED = 1
+FAILED = 0
+NOT_RUN = -1
+
+GROUPINGS = ("check", "task", "model")
+NOTES_SUFFIX = ".notes.json"
+
+
+def _codes(labels: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """Integer codes and the sorted lookup table for a column of labels."""
+    names, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    return codes.astype(np.int32), [str(name) for name in names]
+
+
+@dataclass
+class ResultMatrix:
+    """Evaluations as columns of NumPy arrays; see the module docstring for the layout."""
+
+    check_ids: List[str]
+    outcomes: np.ndarray  # (rows, checks) int8
+    scores: np.ndarray  # (rows,) float32
+    task_codes: np.ndarray  # (rows,) int32 into task_names
+    task_names: List[str]
+    model_codes: np.ndarray  # (rows,) int32 into models
+    models: List[str]
+    run_ids: np.ndarray  # (rows,) str
+    # (row, column) -> failure notes
+    notes: Dict[Tuple[int, int], str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @classmethod
+    def from_results(
+        cls,
+        results: Sequence[EvaluateResult],
+        models: Optional[Sequence[str]] = None,
+        run_ids: Optional[Sequence[str]] = None,
+    ) -> "ResultMatrix":
+        """Build the matrix from evaluation results; ``models``/``run_ids`` label each result."""
+        check_ids = sorted(
+            {check_id for result in results for task in result.task_results for check_id in _task_checks(task)}
+        )
+        column = {check_id: index for index, check_id in enumerate(check_ids)}
+        rows = sum(len(result.task_results) for result in results)
+        outcomes = np.full((rows, len(check_ids)), NOT_RUN, dtype=np.int8)
+        scores = np.zeros(rows, dtype=np.float32)
+        task_labels, model_labels, run_labels = [], [], []
+        notes: Dict[Tuple[int, int], str] = {}
+
+        row = 0
+        for index, result in enumerate(results):
+            model = models[index] if models is not None else ""
+            run_id = run_ids[index] if run_ids is not None else str(index)
+            for task in result.task_results:
+                outcomes[row, [column[check_id] for check_id in task.passed]] = PASSED
+                for check_id, note in task.failed:
+                    outcomes[row, column[check_id]] = FAILED
+                    if note:
+                        notes[(row, column[check_id])] = note
+                scores[row] = task.score
+                task_labels.append(task.task_name)
+                model_labels.append(model)
+                run_labels.append(run_id)
+                row += 1
+
+        task_codes, task_names = _codes(task_labels)
+        model_codes, model_names = _codes(model_labels)
+        return cls(
+            check_ids=check_ids,
+            outcomes=outcomes,
+            scores=scores,
+            task_codes=task_codes,
+            task_names=task_names,
+            model_codes=model_codes,
+            models=model_names,
+            run_ids=np.asarray(run_labels, dtype=str),
+            notes=notes,
+        )
+
+    # --- Persistence ------------------------------------------------------- #
+
+    def save(self, path: Path) -> Path:
+        """Write ``path`` (.npz) and the notes next to it as ``<stem>.notes.json``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            check_ids=np.asarray(self.check_ids, dtype=str),
+            outcomes=self.outcomes,
+            scores=self.scores,
+            task_codes=self.task_codes,
+            task_names=np.asarray(self.task_names, dtype=str),
+            model_codes=self.model_codes,
+            models=np.asarray(self.models, dtype=str),
+            run_ids=self.run_ids,
+        )
+        notes = [[row, self.check_ids[column], note] for (row, column), note in sorted(self.notes.items())]
+        _notes_path(path).write_text(json.dumps(notes), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "ResultMatrix":
+        path = Path(path)
+        with np.load(path, allow_pickle=False) as data:
+            check_ids = [str(value) for value in data["check_ids"]]
+            matrix = cls(
+                check_ids=check_ids,
+                outcomes=data["outcomes"],
+                scores=data["scores"],
+                task_codes=data["task_codes"],
+                task_names=[str(value) for value in data["task_names"]],
+                model_codes=data["model_codes"],
+                models=[str(value) for value in data["models"]],
+                run_ids=data["run_ids"],
+            )
+        notes_path = _notes_path(path)
+        if notes_path.exists():
+            column = {check_id: index for index, check_id in enumerate(check_ids)}
+            matrix.notes = {
+                (row, column[check_id]): note for row, check_id, note in json.loads(notes_path.read_text(encoding="utf-8"))
+            }
+        return matrix
+
+    # --- Aggregates -------------------------------------------------------- #
+
+    def _groups(self, by: str) -> Tuple[np.ndarray, List[str]]:
+        if by == "task":
+            return self.task_codes, self.task_names
+        if by == "model":
+            return self.model_codes, self.models
+        raise ValueError(f"Unknown grouping '{by}'. Expected one of: {', '.join(GROUPINGS)}")
+
+    def pass_rates(self, by: str = "check") -> Dict[str, Dict[str, float]]:
+        """Pass rate of each check, overall (``by="check"``) or per task/model.
+
+        Skipped checks are excluded from the denominator; groups in which a check
+        never ran are left out.
+        """
+        passed = self.outcomes == PASSED
+        ran = self.outcomes != NOT_RUN
+        if by == "check":
+            counts = ran.sum(axis=0)
+            rates = np.divide(passed.sum(axis=0), counts, out=np.zeros(len(self.check_ids)), where=counts > 0)
+            return {"all": {check_id: float(rates[i]) for i, check_id in enumerate(self.check_ids) if counts[i]}}
+
+        codes, names = self._groups(by)
+        width = len(self.check_ids)
+        # Flattened (group, check) cell index for every matrix entry, summed in one bincount each
+        cells = (codes[:, None] * width + np.arange(width)).ravel()
+        size = len(names) * width
+        passed_counts = np.bincount(cells, weights=passed.ravel(), minlength=size).reshape(len(names), width)
+        ran_counts = np.bincount(cells, weights=ran.ravel(), minlength=size).reshape(len(names), width)
+        rates = np.divide(passed_counts, ran_counts, out=np.zeros_like(passed_counts), where=ran_counts > 0)
+        return {
+            name: {check_id: float(rates[g, c]) for c, check_id in enumerate(self.check_ids) if ran_counts[g, c]}
+            for g, name in enumerate(names)
+        }
+
+    def score_distribution(self, by: str = "task", bins: int = 10) -> Dict[str, Dict[str, object]]:
+        """Count, mean, quantiles and a histogram over [0, 1] of the scores per task or model."""
+        codes, names = self._groups(by)
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        edges = np.linspace(0.0, 1.0, bins + 1)
+        summary = {}
+        for g, name in enumerate(names):
+            scores = self.scores[order[boundaries[g]:boundaries[g + 1]]]
+            if not len(scores):
+                continue
+            p10, median, p90 = np.quantile(scores, [0.1, 0.5, 0.9])
+            summary[name] = {
+                "count": int(len(scores)),
+                "mean": float(scores.mean()),
+                "p10": float(p10),
+                "median": float(median),
+                "p90": float(p90),
+                "perfect": float((scores == 1.0).mean()),
+                "histogram": np.histogram(scores, bins=edges)[0].tolist(),
+            }
+        return summary
+
+    def _keys(self) -> np.ndarray:
+        """``run_id/task`` key of every row, used to pair rows across result sets."""
+        tasks = np.asarray(self.task_names, dtype=str)[self.task_codes] if len(self) else np.asarray([], dtype=str)
+        return np.char.add(np.char.add(self.run_ids.astype(str), "/"), tasks)
+
+    def diff(self, candidate: "ResultMatrix") -> Dict[str, Dict[str, float]]:
+        """Per-check comparison of this (baseline) result set with ``candidate``.
+
+        Pass rates are compared over all rows of each set. Rows present in both
+        (same run id and task) are paired to count regressions (passed -> failed)
+        and fixes (failed -> passed).
+        """
+        baseline_rates = self.pass_rates()["all"]
+        candidate_rates = candidate.pass_rates()["all"]
+        _, mine, theirs = np.intersect1d(self._keys(), candidate._keys(), assume_unique=False, return_indices=True)
+
+        report = {}
+        for check_id in sorted(set(self.check_ids) | set(candidate.check_ids)):
+            entry: Dict[str, float] = {
+                "baseline": baseline_rates.get(check_id, float("nan")),
+                "candidate": candidate_rates.get(check_id, float("nan")),
+            }
+            entry["delta"] = entry["candidate"] - entry["baseline"]
+            if check_id in self.check_ids and check_id in candidate.check_ids:
+                before = self.outcomes[mine, self.check_ids.index(check_id)]
+                after = candidate.outcomes[theirs, candidate.check_ids.index(check_id)]
+                entry["paired"] = int(((before != NOT_RUN) & (after != NOT_RUN)).sum())
+                entry["regressions"] = int(((before == PASSED) & (after == FAILED)).sum())
+                entry["fixes"] = int(((before == FAILED) & (after == PASSED)).sum())
+            report[check_id] = entry
+        return report
+
+
+def _task_checks(task) -> Iterable[str]:
+    yield from task.passed
+    for check_id, _ in task.failed:
+        yield check_id
+
+
+def _notes_path(path: Path) -> Path:
+    return path.with_name(path.stem + NOTES_SUFFIX)
+
+
+def _format_rates(rates: Dict[str, Dict[str, float]]) -> str:
+    lines = []
+    for group, checks in rates.items():
+        lines.append(group)
+        lines.extend(f"  {check_id:<28} {rate:6.1%}" for check_id, rate in checks.items())
+    return "\n".join(lines)
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregate and compare evaluation result matrices.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("summary", help="Pass rates and score distributions of one result set.")
+    summary.add_argument("matrix")
+    summary.add_argument("--by", choices=GROUPINGS, default="check")
+    compare = commands.add_parser("diff", help="Per-check pass-rate deltas, regressions and fixes.")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    if args.command == "summary":
+        matrix = ResultMatrix.load(Path(args.matrix))
+        rates = matrix.pass_rates(args.by)
+        distribution = matrix.score_distribution("model" if args.by == "model" else "task")
+        if args.json:
+            print(json.dumps({"rows": len(matrix), "pass_rates": rates, "scores": distribution}, indent=2))
+            return 0
+        print(f"{len(matrix)} evaluated outputs, {len(matrix.check_ids)} checks")
+        print(_format_rates(rates))
+        for name, stats in distribution.items():
+            print(f"{name}: n={stats['count']} mean={stats['mean']:.2f} median={stats['median']:.2f} perfect={stats['perfect']:.1%}")
+        return 0
+
+    report = ResultMatrix.load(Path(args.baseline)).diff(ResultMatrix.load(Path(args.candidate)))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for check_id, entry in report.items():
+        paired = f"  regressions {entry['regressions']}  fixes {entry['fixes']}" if "paired" in entry else ""
+        print(f"{check_id:<28} {entry['baseline']:6.1%} -> {entry['candidate']:6.1%} ({entry['delta']:+.1%}){paired}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -4,7 +4,7 @@ import argparse
 import json
 from dataclasses import asdict
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
 
 from internal_audit_validation_system.evaluation.criteria import (
     EvaluateResult,
@@ -14,6 +14,7 @@ from internal_audit_validation_system.evaluation.criteria import (
     review_analysis_checks,
     run_checks,
 )
+from internal_audit_validation_system.policy_table import PolicyTable
 
 
 TASK_TO_CHECKS = {
@@ -26,12 +27,20 @@ TASK_TO_CHECKS = {
 def evaluate_outputs(
     audit_observation: str,
     task_outputs: Dict[str, str],
+    fast: bool = False,
+    tables: Optional[Dict[str, PolicyTable]] = None,
 ) -> EvaluateResult:
-    """Run structural checks across all task outputs."""
+    """Run structural checks across all task outputs.
+
+    With ``fast=True`` only cheap (CPU) checks run; network-bound checks are skipped.
+    ``tables`` maps task names to their sidecar policy tables; tasks without one
+    have their markdown parsed instead.
+    """
+    tables = tables or {}
     results: List[TaskEvaluation] = []
     for task_name, checks in TASK_TO_CHECKS.items():
         content = task_outputs.get(task_name, "")
-        evaluation = run_checks(task_name, content, checks)
+        evaluation = run_checks(task_name, content, checks, fast=fast, policy_table=tables.get(task_name))
         results.append(evaluation)
     return EvaluateResult(audit_observation=audit_observation, task_results=results)
 
@@ -46,6 +55,8 @@ def _format_console_report(result: EvaluateResult) -> str:
             for check_id, notes in task.failed:
                 note_text = f" - {check_id}: {notes or 'no details'}"
                 lines.append(note_text)
+        if task.skipped:
+            lines.append(f" - skipped (fast mode): {', '.join(task.skipped)}")
     return "\n".join(lines)
 
 
@@ -65,23 +76,45 @@ def main(argv: Iterable[str] | None = None) -> int:
     parser.add_argument(
         "--input-json",
         required=True,
-        help="Path to a JSON file with task outputs.",
+        help="Path to a JSON file with task outputs (and optionally their policy table sidecars under 'tables').",
     )
     parser.add_argument(
         "--write-report",
         help="Optional path to write the JSON evaluation report.",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Run only cheap (CPU) checks and skip network-bound ones such as url_reachability.",
+    )
+    parser.add_argument(
+        "--write-matrix",
+        help="Optional path (.npz) to write the columnar runs x checks result matrix; notes go to <stem>.notes.json.",
+    )
+    parser.add_argument(
+        "--model",
+        default="",
+        help="Model label recorded in the result matrix for entries without a 'model' key.",
+    )
     args = parser.parse_args(list(argv) if argv is not None else None)
 
     entries = _load_json_payload(Path(args.input_json))
     results: List[EvaluateResult] = []
-    for entry in entries:
+    models: List[str] = []
+    run_ids: List[str] = []
+    for index, entry in enumerate(entries):
         try:
             audit_observation = str(entry["audit_observation"])
             outputs = entry.get("outputs") or {}
             if not isinstance(outputs, dict):
                 raise TypeError("'outputs' must be a mapping of task name to markdown output.")
-            results.append(evaluate_outputs(audit_observation, outputs))
+            tables = {
+                task_name: PolicyTable.from_dict(table)
+                for task_name, table in (entry.get("tables") or {}).items()
+            }
+            results.append(evaluate_outputs(audit_observation, outputs, fast=args.fast, tables=tables))
+            models.append(str(entry.get("model") or args.model))
+            run_ids.append(str(entry.get("run_id") or index))
         except KeyError as exc:
             raise KeyError(f"Missing required key in JSON payload: {exc}")
 
@@ -99,6 +132,12 @@ def main(argv: Iterable[str] | None = None) -> int:
         ]
         Path(args.write_report).write_text(json.dumps(serialisable, indent=2))
 
+    if args.write_matrix:
+        # NumPy is only needed for the matrix, so plain evaluation keeps its fast start-up
+        from internal_audit_validation_system.evaluation.matrix import ResultMatrix
+
+        ResultMatrix.from_results(results, models=models, run_ids=run_ids).save(Path(args.write_matrix))
+
     return 0
 
 
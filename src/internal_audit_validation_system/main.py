@@ -1,13 +1,29 @@
 #!/usr/bin/env python
 import json
+import sqlite3
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-from internal_audit_validation_system.crew import InternalAuditValidationSystemCrew
-from internal_audit_validation_system.evaluation.criteria import EvaluateResult
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from internal_audit_validation_system.batch import load_observations, run_batch
+from internal_audit_validation_system.deadline import run_deadline_seconds, start_deadline
+from internal_audit_validation_system.evaluation.criteria import EvaluateResult, TaskEvaluation
+from internal_audit_validation_system.evaluation.inline import (
+    PARTIAL_REPORT_FILENAME,
+    EvaluationAborted,
+    InlineEvaluator,
+    load_policies,
+)
 from internal_audit_validation_system.evaluation.runner import evaluate_outputs
+from internal_audit_validation_system.evaluation.runner import main as runner_main
+from internal_audit_validation_system.policy_table import load_run_tables
+from internal_audit_validation_system.registry import collect_run, default_registry, token_usage_of
+from internal_audit_validation_system.warm_start import WarmStart, find_warm_start
+
+if TYPE_CHECKING:
+    from internal_audit_validation_system.crew import InternalAuditValidationSystemCrew
 
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
@@ -18,20 +34,30 @@ EVALUATION_DIR = Path("evaluation")
 EVALUATION_PAYLOAD_PATH = EVALUATION_DIR / "latest_payload.json"
 EVALUATION_REPORT_PATH = EVALUATION_DIR / "latest_report.json"
 OUTPUT_DIR = Path("output")
+RUN_METRICS_FILENAME = "run_metrics.json"
+
+
+def _crew_class() -> "type[InternalAuditValidationSystemCrew]":
+    """Import the crew (and the crewAI stack behind it) only for commands that run it."""
+    from internal_audit_validation_system.crew import InternalAuditValidationSystemCrew
+
+    return InternalAuditValidationSystemCrew
 
 
 def _setup_output_directory_with_timestamp() -> str:
     """Create timestamped output subdirectory and return timestamp string."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
     # Create main output directory if it doesn't exist
     OUTPUT_DIR.mkdir(exist_ok=True)
 
-    # Create timestamped subdirectory
-    timestamped_dir = OUTPUT_DIR / timestamp
-    timestamped_dir.mkdir(exist_ok=True)
-
-    return timestamp
+    # Create timestamped subdirectory; runs of a batch that start within the same second wait for the next one
+    while True:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        try:
+            (OUTPUT_DIR / timestamp).mkdir()
+        except FileExistsError:
+            time.sleep(1)
+            continue
+        return timestamp
 
 
 def _extract_task_markdown(raw_output: Any) -> Dict[str, str]:
@@ -73,8 +99,11 @@ def _extract_task_markdown(raw_output: Any) -> Dict[str, str]:
     return task_outputs
 
 
-def _run_evaluation(crew_output: Any, inputs: Dict[str, Any]) -> Optional[EvaluateResult]:
-    """Persist task outputs and execute the evaluation harness."""
+def _run_evaluation(crew_output: Any, inputs: Dict[str, Any], timestamp: Optional[str] = None) -> Optional[EvaluateResult]:
+    """Persist task outputs and execute the evaluation harness.
+
+    Policy tables are read from the JSON sidecars in ``output/{timestamp}/``.
+    """
     observation = inputs.get("audit_observation", "")
     task_outputs = _extract_task_markdown(crew_output)
     if not task_outputs:
@@ -83,15 +112,17 @@ def _run_evaluation(crew_output: Any, inputs: Dict[str, Any]) -> Optional[Evalua
 
     EVALUATION_DIR.mkdir(exist_ok=True)
 
+    tables = load_run_tables(OUTPUT_DIR / timestamp) if timestamp else {}
     payload = [
         {
             "audit_observation": observation,
             "outputs": task_outputs,
+            "tables": {task_name: table.as_dict() for task_name, table in tables.items()},
         }
     ]
     EVALUATION_PAYLOAD_PATH.write_text(json.dumps(payload, indent=2))
 
-    result = evaluate_outputs(observation, task_outputs)
+    result = evaluate_outputs(observation, task_outputs, tables=tables)
     summary = {
         "audit_observation": result.audit_observation,
         "generated_at": datetime.utcnow().isoformat() + "Z",
@@ -111,24 +142,147 @@ def _run_evaluation(crew_output: Any, inputs: Dict[str, Any]) -> Optional[Evalua
     return result
 
 
-def run():
-    """
-    Run the crew.
+def _write_run_metrics(
+    timestamp: str, crew_output: Any = None, warm_start: Optional[WarmStart] = None
+) -> Dict[str, Any]:
+    """Persist tool dedup, search cache, early-stop, warm-start and token counters for the run."""
+    from internal_audit_validation_system.early_stop import early_stop_stats
+    from internal_audit_validation_system.tools.memo import current_run_memo
+    from internal_audit_validation_system.tools.search import search_stats
+
+    metrics = {
+        "tool_dedup": current_run_memo().as_dict(),
+        "search": search_stats().as_dict(),
+        "early_stop": early_stop_stats(),
+        "warm_start": warm_start.as_dict() if warm_start is not None else None,
+        "token_usage": token_usage_of(crew_output),
+    }
+    (OUTPUT_DIR / timestamp / RUN_METRICS_FILENAME).write_text(json.dumps(metrics, indent=2))
+
+    dedup = metrics["tool_dedup"]
+    print(
+        f"Tool calls: {dedup['calls']} ({dedup['memo_hits']} memoized, {dedup['coalesced']} coalesced); "
+        f"search API calls: {metrics['search']['backend_calls']} ({metrics['search']['cache_hits']} cache hits)"
+    )
+    for task_name, record in metrics["early_stop"].items():
+        if record["stopped_early"]:
+            print(
+                f"Early stop: {task_name} after {record['iterations']}/{record['max_iter']} iterations "
+                f"(up to {record['iterations_saved']} iterations, ~{record['tokens_saved_estimate']} tokens saved)"
+            )
+    return metrics
+
+
+def _record_run(
+    timestamp: str,
+    inputs: Dict[str, Any],
+    status: str,
+    evaluations: List[TaskEvaluation],
+    crew_output: Any = None,
+) -> None:
+    """Add the finished (or aborted) run to the run registry; never fails the run."""
+    try:
+        record = collect_run(
+            OUTPUT_DIR / timestamp,
+            observation=inputs.get("audit_observation", ""),
+            status=status,
+            evaluations=evaluations,
+            token_usage=token_usage_of(crew_output),
+            finished_at=time.time(),
+        )
+        registry = default_registry()
+        registry.record(record)
+    except (OSError, sqlite3.Error) as exc:
+        print(f"Run registry not updated: {exc}")
+        return
+    print(f"Run {timestamp} recorded in {registry.path}")
+
+
+def _run_crew(
+    inputs: Dict[str, Any], warm_start: Optional[WarmStart] = None, pipeline: Optional[str] = None
+) -> Tuple[str, str]:
+    """Run the crew once and persist its outputs, metrics, evaluation and registry record.
+
+    Returns the run's timestamp and its status: completed, aborted or timed_out.
     """
+    from internal_audit_validation_system.tools.memo import start_run
+
     # Setup output directory and get timestamp
     timestamp = _setup_output_directory_with_timestamp()
+    start_run()
+    # Bounds the whole run; tasks, tool calls and LLM requests get the remaining budget
+    start_deadline(run_deadline_seconds())
+
+    # Score each task as soon as it completes; the partial report is rewritten as the run progresses
+    inline_evaluator = InlineEvaluator(
+        audit_observation=inputs["audit_observation"],
+        policies=load_policies(),
+        report_path=OUTPUT_DIR / timestamp / PARTIAL_REPORT_FILENAME,
+    )
+
+    if warm_start is not None:
+        print(
+            f"Warm start ({warm_start.mode}): similarity {warm_start.score:.2f} to run {warm_start.run_id} "
+            f"\"{warm_start.observation}\""
+        )
 
     # Create crew instance with timestamp - this will automatically update all task output paths
-    crew_instance = InternalAuditValidationSystemCrew(timestamp=timestamp)
+    crew_instance = _crew_class()(
+        timestamp=timestamp, inline_evaluator=inline_evaluator, warm_start=warm_start, pipeline=pipeline
+    )
 
     # Get the crew object
     crew_obj = crew_instance.crew()
 
+    try:
+        crew_output = crew_obj.kickoff(inputs=inputs)
+    except EvaluationAborted as exc:
+        print(f"Run aborted by inline evaluation: {exc}")
+        print(f"Partial evaluation report: {inline_evaluator.report_path}")
+        _write_run_metrics(timestamp, warm_start=warm_start)
+        _record_run(timestamp, inputs, "aborted", list(inline_evaluator.results.values()))
+        return timestamp, "aborted"
+    except TimeoutError as exc:
+        # DeadlineExceeded, or crewAI's own timeout for a task started with the remaining budget
+        print(f"Run deadline exceeded: {exc}")
+        inline_evaluator.status = "timed_out"
+        inline_evaluator.write_partial_report()
+        print(f"Partial evaluation report: {inline_evaluator.report_path}")
+        _write_run_metrics(timestamp, warm_start=warm_start)
+        _record_run(timestamp, inputs, "timed_out", list(inline_evaluator.results.values()))
+        return timestamp, "timed_out"
+
+    _write_run_metrics(timestamp, crew_output, warm_start)
+
+    inline_evaluator.status = "completed"
+    inline_evaluator.write_partial_report()
+    result = _run_evaluation(crew_output, inputs, timestamp)
+    evaluations = result.task_results if result else list(inline_evaluator.results.values())
+    _record_run(timestamp, inputs, "completed", evaluations, crew_output)
+    return timestamp, "completed"
+
+
+def run():
+    """
+    Run the crew.
+    """
     inputs = {
         "audit_observation": "Lack of risk assessment procedures for selling investment products."
     }
-    crew_output = crew_obj.kickoff(inputs=inputs)
-    _run_evaluation(crew_output, inputs)
+    # Start from the final policy table of a similar past observation, if the registry has one
+    _run_crew(inputs, find_warm_start(inputs["audit_observation"]))
+
+
+def batch():
+    """
+    Run a batch of observations (one per line of a file) with one shared policy retrieval per topic.
+    """
+    args = sys.argv[2:] if sys.argv[1:2] == ["batch"] else sys.argv[1:]
+    if not args:
+        print("Usage: batch <observations file>")
+        return 1
+    run_batch(load_observations(Path(args[0])), _run_crew, OUTPUT_DIR, find_warm_start)
+    return 0
 
 
 def train():
@@ -139,7 +293,7 @@ def train():
         "audit_observation": "sample_value"
     }
     try:
-        InternalAuditValidationSystemCrew().crew().train(
+        _crew_class()().crew().train(
             n_iterations=int(sys.argv[1]),
             filename=sys.argv[2],
             inputs=inputs,
@@ -154,7 +308,7 @@ def replay():
     Replay the crew execution from a specific task.
     """
     try:
-        InternalAuditValidationSystemCrew().crew().replay(task_id=sys.argv[1])
+        _crew_class()().crew().replay(task_id=sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -168,7 +322,7 @@ def test():
         "audit_observation": "sample_value"
     }
     try:
-        InternalAuditValidationSystemCrew().crew().test(
+        _crew_class()().crew().test(
             n_iterations=int(sys.argv[1]),
             openai_model_name=sys.argv[2],
             inputs=inputs,
@@ -178,6 +332,15 @@ def test():
         raise Exception(f"An error occurred while testing the crew: {e}")
 
 
+def evaluate():
+    """
+    Re-run the evaluation harness over the last persisted payload without loading the crew.
+    """
+    args = sys.argv[2:] if sys.argv[1:2] == ["evaluate"] else sys.argv[1:]
+    payload_path = args[0] if args else str(EVALUATION_PAYLOAD_PATH)
+    return runner_main(["--input-json", payload_path, "--write-report", str(EVALUATION_REPORT_PATH)])
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: main.py <command> [<args>]")
@@ -192,6 +355,10 @@ if __name__ == "__main__":
         replay()
     elif command == "test":
         test()
+    elif command == "evaluate":
+        evaluate()
+    elif command == "batch":
+        sys.exit(batch())
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
@@ -0,0 +1,310 @@
+"""Typed policy tables and their JSON sidecars.
+
+Every task that produces a policy table (the HKMA/SFC retrievals, the
+consolidated and revised tables and the compliance analysis that carries the
+table forward) also writes ``<output>.table.json`` next to its markdown in
+``output/{timestamp}/``. The sidecar holds validated, typed rows so evaluation,
+PDF rendering and aggregation read the table directly instead of re-parsing
+LLM markdown. ``parse_markdown_table`` is the single markdown parser used to
+build sidecars and as the fallback when none exists.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+SCHEMA_VERSION = 1
+SIDECAR_SUFFIX = ".table.json"
+
+# Output file base name of each crew task (``output/{timestamp}/{name}.md``)
+TASK_OUTPUT_BASENAMES = {
+    "retrieve_hkma_policies": "hkma_policy_retrieval",
+    "retrieve_sfc_policies": "sfc_policy_retrieval",
+    "retrieve_relevant_policies": "policy_retrieval_aggregated",
+    "reflect_policy_retrieval": "retrieval_review",
+    "revise_policy_retrieval": "policy_retrieval_final",
+    "analyze_compliance_status": "compliance_analysis",
+    "prepare_peer_review_package": "peer_review_package",
+    "reflection_of_compliance_status": "compliance_reflection",
+    "review_compliance_analysis": "review_report",
+}
+
+# Tasks whose output contains a policy table and therefore gets a sidecar
+POLICY_TABLE_TASKS = (
+    "retrieve_hkma_policies",
+    "retrieve_sfc_policies",
+    "retrieve_relevant_policies",
+    "revise_policy_retrieval",
+    "analyze_compliance_status",
+)
+
+# (row field, canonical header, header prefixes accepted as that column)
+COLUMNS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("source_name", "Source Name", ("source",)),
+    ("section_clause", "Section / Clause", ("section", "clause", "paragraph")),
+    ("key_excerpt", "Key Excerpt", ("key excerpt", "excerpt", "quote")),
+    ("relevance", "Relevance to Observation", ("relevance",)),
+    ("document_url", "Document Path / URL", ("document", "path", "url")),
+    ("effective_date", "Effective Date", ("effective", "date")),
+    ("confidence", "Confidence", ("confidence",)),
+    ("link_or_reference", "Link or Reference", ("link", "reference")),
+)
+HEADER_BY_FIELD = {name: header for name, header, _ in COLUMNS}
+ALL_HEADERS = tuple(header for _, header, _ in COLUMNS)
+REQUIRED_HEADERS = ("Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Link or Reference")
+
+_SEPARATOR = re.compile(r"^\|?[\s\-:|]+\|?$")
+_URL = re.compile(r"https?://[^\s)\]|>]+", re.IGNORECASE)
+
+
+def _normalise_header(header: str) -> str:
+    header = re.sub(r"\(.*?\)", "", header.strip().strip("*_").lower())
+    return re.sub(r"\s*/\s*", " / ", re.sub(r"\s+", " ", header)).strip()
+
+
+def normalise_url(url: Optional[str]) -> str:
+    """Comparable form of a URL: no scheme, ``www.``, fragment or trailing slash; sorted query."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return host + parts.path.rstrip("/") + (f"?{query}" if query else "")
+
+
+def _fold_header(header: str) -> str:
+    return " ".join(header.lower().split())
+
+
+def _map_headers(headers: Sequence[str]) -> Dict[int, str]:
+    """Column index -> row field, matching canonical headers first, then prefixes."""
+    mapping: Dict[int, str] = {}
+    normalised = [_normalise_header(header) for header in headers]
+    for name, canonical, _ in COLUMNS:
+        for index, header in enumerate(normalised):
+            if index not in mapping and header == canonical.lower():
+                mapping[index] = name
+                break
+    for name, _, prefixes in COLUMNS:
+        if name in mapping.values():
+            continue
+        for index, header in enumerate(normalised):
+            if index not in mapping and header.startswith(prefixes):
+                mapping[index] = name
+                break
+    return mapping
+
+
+def _split_row(line: str) -> List[str]:
+    """Cells of a markdown table row; escaped pipes (``\\|``) stay inside cells."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", line)]
+
+
+def _is_table_line(line: str) -> bool:
+    return line.strip().startswith("|")
+
+
+@dataclass(frozen=True)
+class PolicyRow:
+    """One policy table entry."""
+
+    source_name: str = ""
+    section_clause: str = ""
+    key_excerpt: str = ""
+    relevance: str = ""
+    document_url: str = ""
+    effective_date: str = ""
+    confidence: str = ""
+    link_or_reference: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PolicyRow":
+        known = {item.name for item in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown policy row fields: {', '.join(sorted(unknown))}")
+        for name, value in data.items():
+            if not isinstance(value, str):
+                raise ValueError(f"Policy row field '{name}' must be a string, got {type(value).__name__}")
+        return cls(**data)
+
+    @property
+    def url(self) -> Optional[str]:
+        """First URL in the link column, falling back to the document column."""
+        for value in (self.link_or_reference, self.document_url):
+            match = _URL.search(value)
+            if match:
+                return match.group(0).rstrip(".,;")
+        return None
+
+
+@dataclass
+class PolicyTable:
+    """A parsed policy table with the canonical headers of the columns it had."""
+
+    task_name: str = ""
+    headers: List[str] = field(default_factory=list)
+    rows: List[PolicyRow] = field(default_factory=list)
+    source_sha256: Optional[str] = None
+    # Header cells as written in the markdown; empty for a table built in code
+    written_headers: List[str] = field(default_factory=list)
+
+    def has_columns(self, headers: Sequence[str] = REQUIRED_HEADERS, exact: bool = False) -> bool:
+        """Whether the table has all of ``headers``.
+
+        By default this asks about the mapped columns, so "Quote" counts as Key
+        Excerpt. ``exact`` asks about the header cells as written (ignoring case
+        and whitespace), which is what the structural checks require.
+        """
+        if not exact:
+            return all(header in self.headers for header in headers)
+        written = {_fold_header(header) for header in self.written_headers or self.headers}
+        return all(_fold_header(header) in written for header in headers)
+
+    def cells(self) -> List[List[str]]:
+        """Header row followed by one list of cell values per row, in column order.
+
+        A table built in code without headers renders all canonical columns.
+        """
+        headers = list(self.headers or ALL_HEADERS)
+        names = [name for name, header, _ in COLUMNS if header in headers]
+        ordered = sorted(names, key=lambda name: headers.index(HEADER_BY_FIELD[name]))
+        return [[HEADER_BY_FIELD[name] for name in ordered]] + [
+            [getattr(row, name) for name in ordered] for row in self.rows
+        ]
+
+    def to_markdown(self) -> str:
+        """Render the table as markdown, one line per row."""
+        cells = self.cells()
+        escape = lambda value: value.replace("\n", " ").replace("|", "\\|")
+        lines = ["| " + " | ".join(cells[0]) + " |", "|" + "---|" * len(cells[0])]
+        lines.extend("| " + " | ".join(escape(value) for value in row) + " |" for row in cells[1:])
+        return "\n".join(lines)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "task_name": self.task_name,
+            "source_sha256": self.source_sha256,
+            "headers": list(self.headers),
+            "written_headers": list(self.written_headers),
+            "rows": [asdict(row) for row in self.rows],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PolicyTable":
+        if data.get("schema_version") != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported policy table schema version: {data.get('schema_version')!r}")
+        headers = data.get("headers") or []
+        unknown = [header for header in headers if header not in HEADER_BY_FIELD.values()]
+        if unknown:
+            raise ValueError(f"Unknown policy table headers: {', '.join(unknown)}")
+        return cls(
+            task_name=str(data.get("task_name") or ""),
+            headers=list(headers),
+            rows=[PolicyRow.from_dict(row) for row in data.get("rows") or []],
+            source_sha256=data.get("source_sha256"),
+            written_headers=[str(header) for header in data.get("written_headers") or []],
+        )
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_markdown_table(markdown: str, task_name: str = "") -> Optional[PolicyTable]:
+    """Parse the first markdown table with a Source Name column, or return None."""
+    lines = markdown.splitlines()
+    for start, line in enumerate(lines):
+        if not _is_table_line(line) or "source" not in line.lower():
+            continue
+        written = _split_row(line)
+        mapping = _map_headers(written)
+        if "source_name" not in mapping.values():
+            continue
+
+        rows: List[PolicyRow] = []
+        for index in range(start + 1, len(lines)):
+            current = lines[index].strip()
+            if not current:
+                # Blank lines inside a table are tolerated only if the table continues
+                following = next((later for later in lines[index + 1:] if later.strip()), "")
+                if _is_table_line(following) and not _SEPARATOR.match(following.strip()):
+                    continue
+                break
+            if not _is_table_line(current):
+                break
+            if _SEPARATOR.match(current):
+                continue
+            cells = _split_row(current)
+            values = {name: cells[column] if column < len(cells) else "" for column, name in mapping.items()}
+            if any(values.values()):
+                rows.append(PolicyRow(**values))
+
+        headers = [HEADER_BY_FIELD[name] for _, name in sorted(mapping.items())]
+        return PolicyTable(
+            task_name=task_name,
+            headers=headers,
+            rows=rows,
+            source_sha256=_sha256(markdown),
+            written_headers=written,
+        )
+    return None
+
+
+def sidecar_path(markdown_path: Union[str, Path]) -> Path:
+    path = Path(markdown_path)
+    return path.with_name(path.stem + SIDECAR_SUFFIX)
+
+
+def write_sidecar(markdown_path: Union[str, Path], markdown: str, task_name: str = "") -> Optional[Path]:
+    """Write the sidecar for a task's markdown output; removes a stale one if the output has no table."""
+    path = sidecar_path(markdown_path)
+    table = parse_markdown_table(markdown, task_name)
+    if table is None:
+        path.unlink(missing_ok=True)
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(table.as_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def load_sidecar(markdown_path: Union[str, Path]) -> Optional[PolicyTable]:
+    path = sidecar_path(markdown_path)
+    if not path.exists():
+        return None
+    return PolicyTable.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def load_policy_table(markdown_path: Union[str, Path], task_name: str = "") -> Optional[PolicyTable]:
+    """The table of a markdown output: its sidecar if it matches the file, else the parsed markdown."""
+    path = Path(markdown_path)
+    markdown = path.read_text(encoding="utf-8") if path.exists() else None
+    sidecar = load_sidecar(path)
+    # A sidecar built from different text (the file was edited afterwards) is stale
+    if sidecar is not None and (markdown is None or sidecar.source_sha256 in (None, _sha256(markdown))):
+        return sidecar
+    return parse_markdown_table(markdown, task_name) if markdown is not None else None
+
+
+def load_run_tables(run_dir: Union[str, Path], task_names: Sequence[str] = POLICY_TABLE_TASKS) -> Dict[str, PolicyTable]:
+    """Policy tables of a run directory (``output/{timestamp}``) keyed by task name."""
+    tables = {}
+    for task_name in task_names:
+        table = load_policy_table(Path(run_dir) / f"{TASK_OUTPUT_BASENAMES[task_name]}.md", task_name)
+        if table is not None:
+            tables[task_name] = table
+    return tables
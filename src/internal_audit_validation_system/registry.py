@@ -0,0 +1,430 @@
+"""SQLite registry of crew runs.
+
+Every run leaves ``output/{timestamp}/`` behind, and ``evaluation/latest_report.json``
+only describes the most recent one. The registry records each run as it
+completes: the observation, status, start/finish times and token usage, every
+task's markdown output (with its completion time), and the per-check evaluation
+results. Indexes on observation, start time and check outcome make questions
+such as "all runs for this observation" or "runs failing url_reachability in
+the last 30 days" single queries instead of directory walks.
+
+``runs index`` backfills the registry from existing run directories.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from internal_audit_validation_system.evaluation.criteria import TaskEvaluation
+from internal_audit_validation_system.policy_table import TASK_OUTPUT_BASENAMES
+
+DEFAULT_REGISTRY_PATH = Path("output") / "runs.sqlite3"
+RUN_ID_FORMAT = "%Y%m%d_%H%M%S"
+TOKEN_FIELDS = ("prompt_tokens", "cached_prompt_tokens", "completion_tokens", "total_tokens", "successful_requests")
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS runs ("
+    "run_id TEXT PRIMARY KEY, observation TEXT NOT NULL, observation_key TEXT NOT NULL, status TEXT NOT NULL, "
+    "successful INTEGER, score REAL, started_at REAL NOT NULL, finished_at REAL, output_dir TEXT, "
+    + ", ".join(f"{name} INTEGER" for name in TOKEN_FIELDS)
+    + ", metrics TEXT)",
+    "CREATE INDEX IF NOT EXISTS runs_by_observation ON runs(observation_key, started_at)",
+    "CREATE INDEX IF NOT EXISTS runs_by_start ON runs(started_at)",
+    "CREATE TABLE IF NOT EXISTS task_outputs ("
+    "run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE, task_name TEXT NOT NULL, path TEXT, "
+    "sha256 TEXT NOT NULL, markdown TEXT NOT NULL, completed_at REAL, PRIMARY KEY (run_id, task_name))",
+    "CREATE TABLE IF NOT EXISTS checks ("
+    "run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE, task_name TEXT NOT NULL, check_id TEXT NOT NULL, "
+    "status TEXT NOT NULL, notes TEXT, duration REAL, PRIMARY KEY (run_id, task_name, check_id))",
+    "CREATE INDEX IF NOT EXISTS checks_by_outcome ON checks(check_id, status, run_id)",
+)
+
+
+def observation_key(observation: str) -> str:
+    """Case- and whitespace-insensitive form of an observation used for lookups."""
+    return re.sub(r"\s+", " ", observation).strip().lower()
+
+
+def run_started_at(run_id: str) -> Optional[float]:
+    """Start time encoded in a ``YYYYMMDD_HHMMSS`` run id, if it is one."""
+    try:
+        return datetime.strptime(run_id, RUN_ID_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass
+class TaskOutputRecord:
+    """One task's markdown output within a run."""
+
+    task_name: str
+    markdown: str
+    path: Optional[str] = None
+    completed_at: Optional[float] = None
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.markdown.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class RunRecord:
+    """Everything the registry stores about one run."""
+
+    run_id: str
+    observation: str
+    status: str
+    started_at: float
+    finished_at: Optional[float] = None
+    output_dir: Optional[str] = None
+    outputs: List[TaskOutputRecord] = field(default_factory=list)
+    evaluations: List[TaskEvaluation] = field(default_factory=list)
+    token_usage: Dict[str, int] = field(default_factory=dict)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def score(self) -> Optional[float]:
+        if not self.evaluations:
+            return None
+        return sum(evaluation.score for evaluation in self.evaluations) / len(self.evaluations)
+
+    @property
+    def successful(self) -> Optional[bool]:
+        if not self.evaluations:
+            return None
+        return all(evaluation.score == 1.0 for evaluation in self.evaluations)
+
+
+def token_usage_of(crew_output: Any) -> Dict[str, int]:
+    """Token counters from a crewAI ``CrewOutput`` (or anything with ``token_usage``)."""
+    usage = getattr(crew_output, "token_usage", None)
+    if usage is None:
+        return {}
+    values = usage.model_dump() if hasattr(usage, "model_dump") else dict(usage)
+    return {name: int(values[name]) for name in TOKEN_FIELDS if values.get(name) is not None}
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def collect_run(
+    run_dir: Path,
+    observation: Optional[str] = None,
+    status: Optional[str] = None,
+    evaluations: Optional[Sequence[TaskEvaluation]] = None,
+    token_usage: Optional[Dict[str, int]] = None,
+    finished_at: Optional[float] = None,
+) -> RunRecord:
+    """Build the record of a run from its ``output/{timestamp}`` directory.
+
+    Arguments that are not given are recovered from the directory: the task
+    markdown files, ``run_metrics.json`` and the inline ``evaluation_partial.json``.
+    """
+    run_dir = Path(run_dir)
+    partial = _read_json(run_dir / "evaluation_partial.json") or {}
+    metrics = _read_json(run_dir / "run_metrics.json") or {}
+
+    outputs = []
+    for task_name, basename in TASK_OUTPUT_BASENAMES.items():
+        path = run_dir / f"{basename}.md"
+        if path.exists():
+            outputs.append(
+                TaskOutputRecord(task_name, path.read_text(encoding="utf-8"), str(path), path.stat().st_mtime)
+            )
+
+    if evaluations is None:
+        evaluations = [_evaluation_from_dict(entry) for entry in partial.get("task_results") or []]
+    completed = [output.completed_at for output in outputs if output.completed_at]
+    started_at = run_started_at(run_dir.name) or min(completed, default=time.time())
+    return RunRecord(
+        run_id=run_dir.name,
+        observation=observation if observation is not None else str(partial.get("audit_observation") or ""),
+        status=status or str(partial.get("status") or ("completed" if outputs else "unknown")),
+        started_at=started_at,
+        finished_at=finished_at or max(completed, default=None),
+        output_dir=str(run_dir),
+        outputs=outputs,
+        evaluations=list(evaluations),
+        token_usage=dict(token_usage or metrics.get("token_usage") or {}),
+        metrics=metrics,
+    )
+
+
+def _evaluation_from_dict(data: Dict[str, Any]) -> TaskEvaluation:
+    return TaskEvaluation(
+        task_name=str(data.get("task_name") or ""),
+        passed=list(data.get("passed") or []),
+        failed=[(item.get("id"), item.get("notes")) for item in data.get("failed") or []],
+        score=float(data.get("score") or 0.0),
+        skipped=list(data.get("skipped") or []),
+        durations=dict(data.get("durations") or {}),
+    )
+
+
+class RunRegistry:
+    """SQLite index of runs; a connection is opened per operation."""
+
+    def __init__(self, path: Path = DEFAULT_REGISTRY_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def record(self, run: RunRecord) -> None:
+        """Insert or replace a run with its outputs and check results."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM runs WHERE run_id = ?", (run.run_id,))
+            successful = None if run.successful is None else int(run.successful)
+            conn.execute(
+                f"INSERT INTO runs (run_id, observation, observation_key, status, successful, score, started_at, "
+                f"finished_at, output_dir, {', '.join(TOKEN_FIELDS)}, metrics) "
+                f"VALUES ({', '.join('?' * (10 + len(TOKEN_FIELDS)))})",
+                (
+                    run.run_id, run.observation, observation_key(run.observation), run.status, successful,
+                    run.score, run.started_at, run.finished_at, run.output_dir,
+                    *(run.token_usage.get(name) for name in TOKEN_FIELDS),
+                    json.dumps(run.metrics) if run.metrics else None,
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO task_outputs (run_id, task_name, path, sha256, markdown, completed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (run.run_id, output.task_name, output.path, output.sha256, output.markdown, output.completed_at)
+                    for output in run.outputs
+                ],
+            )
+            for evaluation in run.evaluations:
+                outcomes = [(check_id, PASSED, None) for check_id in evaluation.passed]
+                outcomes += [(check_id, FAILED, notes) for check_id, notes in evaluation.failed]
+                outcomes += [(check_id, SKIPPED, None) for check_id in evaluation.skipped]
+                conn.executemany(
+                    "INSERT OR REPLACE INTO checks (run_id, task_name, check_id, status, notes, duration) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (run.run_id, evaluation.task_name, check_id, status, notes, evaluation.durations.get(check_id))
+                        for check_id, status, notes in outcomes
+                    ],
+                )
+
+    def runs(
+        self,
+        observation: Optional[str] = None,
+        contains: bool = False,
+        since: Optional[float] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Runs, newest first, optionally filtered by observation, start time and status."""
+        clauses, params = [], []
+        if observation is not None:
+            if contains:
+                clauses.append("observation_key LIKE ?")
+                params.append(f"%{observation_key(observation)}%")
+            else:
+                clauses.append("observation_key = ?")
+                params.append(observation_key(observation))
+        if since is not None:
+            clauses.append("started_at >= ?")
+            params.append(since)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        query = "SELECT * FROM runs" + (f" WHERE {' AND '.join(clauses)}" if clauses else "") + " ORDER BY started_at DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def failing(self, check_id: str, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Runs in which ``check_id`` failed, newest first, with the task and notes."""
+        query = (
+            "SELECT runs.run_id, runs.observation, runs.started_at, checks.task_name, checks.notes "
+            "FROM checks JOIN runs ON runs.run_id = checks.run_id "
+            "WHERE checks.check_id = ? AND checks.status = ?"
+        )
+        params: List[Any] = [check_id, FAILED]
+        if since is not None:
+            query += " AND runs.started_at >= ?"
+            params.append(since)
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(query + " ORDER BY runs.started_at DESC", params)]
+
+    def run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """One run with its task outputs (without markdown) and check results."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            outputs = conn.execute(
+                "SELECT task_name, path, sha256, length(markdown) AS chars, completed_at FROM task_outputs "
+                "WHERE run_id = ? ORDER BY completed_at",
+                (run_id,),
+            ).fetchall()
+            checks = conn.execute(
+                "SELECT task_name, check_id, status, notes, duration FROM checks WHERE run_id = ? ORDER BY task_name, check_id",
+                (run_id,),
+            ).fetchall()
+        return dict(row, outputs=[dict(item) for item in outputs], checks=[dict(item) for item in checks])
+
+    def latest_outputs(self, task_name: str, status: Optional[str] = "completed") -> List[Dict[str, Any]]:
+        """The newest markdown output of ``task_name`` for each observation, newest first."""
+        query = (
+            "SELECT runs.run_id, runs.observation, runs.observation_key, runs.started_at, task_outputs.markdown "
+            "FROM task_outputs JOIN runs ON runs.run_id = task_outputs.run_id WHERE task_outputs.task_name = ?"
+        )
+        params: List[Any] = [task_name]
+        if status is not None:
+            query += " AND runs.status = ?"
+            params.append(status)
+        with closing(self._connect()) as conn:
+            rows = [dict(row) for row in conn.execute(query + " ORDER BY runs.started_at DESC", params)]
+        latest: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            latest.setdefault(row["observation_key"], row)
+        return list(latest.values())
+
+    def output(self, run_id: str, task_name: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT markdown FROM task_outputs WHERE run_id = ? AND task_name = ?", (run_id, task_name)
+            ).fetchone()
+        return row[0] if row else None
+
+
+def default_registry() -> RunRegistry:
+    """The registry at ``AUDIT_RUN_REGISTRY`` (default ``output/runs.sqlite3``)."""
+    return RunRegistry(Path(os.environ.get("AUDIT_RUN_REGISTRY", str(DEFAULT_REGISTRY_PATH))))
+
+
+def index_output_directory(registry: RunRegistry, output_dir: Path) -> List[str]:
+    """Record every ``output/{timestamp}`` run directory; returns the run ids indexed."""
+    indexed = []
+    for run_dir in sorted(Path(output_dir).iterdir()):
+        if run_dir.is_dir() and run_started_at(run_dir.name) is not None:
+            registry.record(collect_run(run_dir))
+            indexed.append(run_dir.name)
+    return indexed
+
+
+def _since(days: Optional[float]) -> Optional[float]:
+    return time.time() - days * 86400 if days is not None else None
+
+
+def _when(timestamp: Optional[float]) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M") if timestamp else "-"
+
+
+def _format_run(run: Dict[str, Any]) -> str:
+    score = f"{run['score']:.0%}" if run.get("score") is not None else "-"
+    duration = (
+        f"{run['finished_at'] - run['started_at']:.0f}s" if run.get("finished_at") and run.get("started_at") else "-"
+    )
+    tokens = run.get("total_tokens") if run.get("total_tokens") is not None else "-"
+    return f"{run['run_id']}  {_when(run['started_at'])}  {run['status']:<9} score {score:>4}  {duration:>6}  tokens {tokens}  {run['observation']}"
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the registry of crew runs.")
+    parser.add_argument("--registry", help="Registry database (default: $AUDIT_RUN_REGISTRY or output/runs.sqlite3).")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="List runs, newest first.")
+    listing.add_argument("--observation", help="Only runs for this observation (case/whitespace-insensitive).")
+    listing.add_argument("--contains", action="store_true", help="Match --observation as a substring.")
+    listing.add_argument("--days", type=float, help="Only runs started in the last N days.")
+    listing.add_argument("--status", help="Only runs with this status (completed, aborted, ...).")
+    listing.add_argument("--limit", type=int, default=50)
+
+    failing = commands.add_parser("failing", help="Runs in which a check failed.")
+    failing.add_argument("check_id", help="Check id, e.g. url_reachability.")
+    failing.add_argument("--days", type=float, help="Only runs started in the last N days.")
+
+    show = commands.add_parser("show", help="Show one run's outputs and check results.")
+    show.add_argument("run_id")
+    show.add_argument("--task", help="Print this task's markdown output instead.")
+
+    index = commands.add_parser("index", help="Backfill the registry from existing run directories.")
+    index.add_argument("output_dir", nargs="?", default="output")
+
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    registry = RunRegistry(Path(args.registry)) if args.registry else default_registry()
+
+    if args.command == "index":
+        indexed = index_output_directory(registry, Path(args.output_dir))
+        print(f"Indexed {len(indexed)} run(s) into {registry.path}")
+        return 0
+
+    if args.command == "show":
+        if args.task:
+            markdown = registry.output(args.run_id, args.task)
+            if markdown is None:
+                print(f"No output for task '{args.task}' in run {args.run_id}")
+                return 1
+            print(markdown)
+            return 0
+        run = registry.run(args.run_id)
+        if run is None:
+            print(f"Unknown run: {args.run_id}")
+            return 1
+        if args.json:
+            print(json.dumps(run, indent=2))
+            return 0
+        print(_format_run(run))
+        for output in run["outputs"]:
+            print(f"  {output['task_name']:<34} {output['chars']:>7} chars  completed {_when(output['completed_at'])}")
+        for check in run["checks"]:
+            notes = f"  {check['notes'].splitlines()[0]}" if check["notes"] else ""
+            print(f"  {check['task_name']}.{check['check_id']}: {check['status']}{notes}")
+        return 0
+
+    if args.command == "failing":
+        rows = registry.failing(args.check_id, since=_since(args.days))
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return 0
+        for row in rows:
+            notes = (row["notes"] or "").splitlines()[0] if row["notes"] else ""
+            print(f"{row['run_id']}  {_when(row['started_at'])}  {row['task_name']}  {row['observation']}  {notes}")
+        print(f"{len(rows)} run(s) failing {args.check_id}")
+        return 0
+
+    runs = registry.runs(
+        observation=args.observation, contains=args.contains, since=_since(args.days), status=args.status, limit=args.limit
+    )
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return 0
+    for run in runs:
+        print(_format_run(run))
+    print(f"{len(runs)} run(s)")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+"""Row-level delta revision of the consolidated policy table.
+
+Re-emitting the whole table to fix two rows makes revision time scale with the
+table, and output tokens are the slowest part of an LLM call. In delta mode
+(``AUDIT_REVISION_MODE=delta``, the default) the consolidated table is rendered
+with a ``Key`` column (``R1``, ``R2``...). ``reflect_policy_retrieval`` reports
+its findings per row key in a JSON block, and ``revise_policy_retrieval``
+answers with patches only::
+
+    {"patches": [
+      {"op": "modify", "key": "R2", "fields": {"Effective Date": "2023-04-01"}, "reason": "..."},
+      {"op": "delete", "key": "R5", "reason": "duplicate of R1"},
+      {"op": "add", "fields": {"Source Name": "...", "Section / Clause": "...", ...}, "reason": "..."}
+    ]}
+
+``apply_patches`` applies them to the stored table in code and
+``render_revision`` writes the final table, a change log and the reviser's
+summary. ``AUDIT_REVISION_MODE=full`` restores whole-table regeneration.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Any, Dict, List, Optional, Sequence
+
+from internal_audit_validation_system.policy_table import COLUMNS, HEADER_BY_FIELD, PolicyRow, PolicyTable
+
+DELTA = "delta"
+FULL = "full"
+
+KEY_HEADER = "Key"
+# Attempts the reflection and revision guardrails give the LLM to fix malformed findings or patches
+PATCH_MAX_RETRIES = 2
+PATCH_OPS = ("add", "modify", "delete")
+# Fields an added row must have
+REQUIRED_FIELDS = ("source_name", "section_clause", "key_excerpt")
+
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+_ROW_FIELDS = tuple(item.name for item in fields(PolicyRow))
+_FIELD_NAMES = {name: name for name in _ROW_FIELDS}
+_FIELD_NAMES.update({header.lower(): name for name, header in HEADER_BY_FIELD.items()})
+
+
+class PatchError(ValueError):
+    """Raised when findings or patches cannot be parsed or do not fit the table."""
+
+
+def revision_mode() -> str:
+    """``AUDIT_REVISION_MODE``: ``delta`` (default) or ``full``."""
+    mode = os.environ.get("AUDIT_REVISION_MODE", DELTA).strip().lower()
+    return FULL if mode == FULL else DELTA
+
+
+def row_key(index: int) -> str:
+    """Key of the row at 0-based ``index``."""
+    return f"R{index + 1}"
+
+
+def keyed_markdown(table: PolicyTable) -> str:
+    """The table as markdown with a leading ``Key`` column; the parser ignores that column."""
+    lines = table.to_markdown().splitlines()
+    keyed = [f"| {KEY_HEADER} " + lines[0], "|---" + lines[1]]
+    keyed.extend(f"| {row_key(index)} " + line for index, line in enumerate(lines[2:]))
+    return "\n".join(keyed)
+
+
+def json_block(text: str, required: str) -> Dict[str, Any]:
+    """The last fenced JSON object in ``text`` that has the key ``required``.
+
+    An answer that is nothing but a bare JSON object is accepted too.
+    """
+    candidates = _JSON_BLOCK.findall(text)
+    if not candidates and text.strip().startswith("{"):
+        candidates = [text.strip()]
+    for candidate in reversed(candidates):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError as exc:
+            raise PatchError(f"The JSON block is not valid JSON: {exc}") from exc
+        if isinstance(data, dict) and required in data:
+            return data
+    raise PatchError(f'No fenced ```json block with a "{required}" list was found.')
+
+
+def _field_name(name: str) -> str:
+    resolved = _FIELD_NAMES.get(str(name).strip().lower())
+    if resolved is None:
+        raise PatchError(f"Unknown column '{name}'; use one of: {', '.join(header for _, header, _ in COLUMNS)}.")
+    return resolved
+
+
+def _check_key(key: Any, table: PolicyTable, where: str) -> str:
+    key = str(key or "").strip().upper()
+    if not re.fullmatch(r"R\d+", key) or not 1 <= int(key[1:]) <= len(table.rows):
+        raise PatchError(f"{where}: '{key}' is not a row key of the table (R1-R{len(table.rows)}).")
+    return key
+
+
+@dataclass(frozen=True)
+class RowFinding:
+    """One issue reflection found, tied to a row key (``None`` for table-level gaps)."""
+
+    key: Optional[str]
+    issue: str
+    fix: str = ""
+    column: Optional[str] = None
+
+
+@dataclass
+class ReflectionFindings:
+    verdict: str
+    findings: List[RowFinding] = field(default_factory=list)
+    gaps: List[str] = field(default_factory=list)
+
+    @property
+    def flagged_keys(self) -> List[str]:
+        return sorted({finding.key for finding in self.findings if finding.key}, key=lambda key: int(key[1:]))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "verdict": self.verdict,
+            "findings": [asdict(finding) for finding in self.findings],
+            "gaps": list(self.gaps),
+        }
+
+
+def finding_from_dict(item: Any, table: PolicyTable, where: str) -> RowFinding:
+    """One finding object of a findings JSON block, with its key checked against ``table``."""
+    if not isinstance(item, dict) or not item.get("issue"):
+        raise PatchError(f'{where} must be an object with at least an "issue".')
+    key, column = item.get("key"), item.get("column")
+    return RowFinding(
+        key=_check_key(key, table, where) if key else None,
+        issue=str(item["issue"]),
+        fix=str(item.get("fix") or ""),
+        column=HEADER_BY_FIELD[_field_name(column)] if column else None,
+    )
+
+
+def parse_findings(text: str, table: PolicyTable) -> ReflectionFindings:
+    """Reflection findings from the JSON block of ``text``, validated against ``table``'s row keys."""
+    data = json_block(text, "findings")
+    verdict = str(data.get("verdict") or "").strip().upper()
+    if verdict not in ("PASS", "NEEDS REVISION"):
+        raise PatchError('"verdict" must be "PASS" or "NEEDS REVISION".')
+    findings = [
+        finding_from_dict(item, table, f"Finding {number}")
+        for number, item in enumerate(data.get("findings") or [], start=1)
+    ]
+    return ReflectionFindings(verdict=verdict, findings=findings, gaps=[str(gap) for gap in data.get("gaps") or []])
+
+
+@dataclass(frozen=True)
+class RowPatch:
+    op: str
+    key: Optional[str] = None
+    # Row field -> new value (the "fields" object of the JSON patch)
+    values: Dict[str, str] = field(default_factory=dict)
+    reason: str = ""
+
+
+def parse_patches(text: str) -> List[RowPatch]:
+    """Patches from the JSON block of the reviser's answer (not yet checked against a table)."""
+    data = json_block(text, "patches")
+    patches = []
+    for number, item in enumerate(data.get("patches") or [], start=1):
+        if not isinstance(item, dict) or item.get("op") not in PATCH_OPS:
+            raise PatchError(f'Patch {number} needs an "op" of {", ".join(PATCH_OPS)}.')
+        values = item.get("fields") or {}
+        if not isinstance(values, dict):
+            raise PatchError(f'Patch {number}: "fields" must be an object of column -> value.')
+        patches.append(
+            RowPatch(
+                op=item["op"],
+                key=item.get("key"),
+                values={_field_name(name): str(value) for name, value in values.items()},
+                reason=str(item.get("reason") or ""),
+            )
+        )
+    return patches
+
+
+@dataclass
+class PatchResult:
+    table: PolicyTable
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    added: int = 0
+
+    @property
+    def change_log(self) -> str:
+        if not (self.modified or self.deleted or self.added):
+            return "**Revision:** no changes to the consolidated table."
+        parts = []
+        if self.modified:
+            parts.append(f"{len(self.modified)} modified ({', '.join(self.modified)})")
+        if self.deleted:
+            parts.append(f"{len(self.deleted)} deleted ({', '.join(self.deleted)})")
+        if self.added:
+            parts.append(f"{self.added} added")
+        return "**Revision:** " + ", ".join(parts) + " relative to the consolidated table."
+
+
+def apply_patches(table: PolicyTable, patches: Sequence[RowPatch], task_name: str = "") -> PatchResult:
+    """Apply ``patches`` to ``table``; every problem is reported together in one ``PatchError``.
+
+    Modified rows keep their position, deleted rows are dropped and added rows
+    are appended, so rows nobody touched are carried over byte for byte.
+    """
+    rows: List[Optional[PolicyRow]] = list(table.rows)
+    result = PatchResult(table=table)
+    added: List[PolicyRow] = []
+    problems: List[str] = []
+    touched: Dict[str, str] = {}
+    for number, patch in enumerate(patches, start=1):
+        try:
+            if patch.op == "add":
+                missing = [HEADER_BY_FIELD[name] for name in REQUIRED_FIELDS if not patch.values.get(name, "").strip()]
+                if missing:
+                    raise PatchError(f"Patch {number}: an added row needs {', '.join(missing)}.")
+                added.append(PolicyRow(**patch.values))
+                continue
+            key = _check_key(patch.key, table, f"Patch {number}")
+            if key in touched:
+                raise PatchError(f"Patch {number}: {key} was already {touched[key]} by an earlier patch.")
+            index = int(key[1:]) - 1
+            if patch.op == "delete":
+                rows[index] = None
+                result.deleted.append(key)
+                touched[key] = "deleted"
+            else:
+                if not patch.values:
+                    raise PatchError(f"Patch {number}: modify {key} lists no changed columns.")
+                rows[index] = replace(rows[index], **patch.values)
+                result.modified.append(key)
+                touched[key] = "modified"
+        except PatchError as exc:
+            problems.append(str(exc))
+    if problems:
+        raise PatchError("\n".join(problems))
+
+    headers = list(table.headers)
+    # An added row may fill columns the consolidated table did not have
+    extra = {HEADER_BY_FIELD[name] for row in added for name in _ROW_FIELDS if getattr(row, name)} - set(headers)
+    if extra:
+        headers = [header for _, header, _ in COLUMNS if header in headers or header in extra]
+    result.table = PolicyTable(
+        task_name=task_name or table.task_name,
+        headers=headers,
+        rows=[row for row in rows if row is not None] + added,
+    )
+    result.added = len(added)
+    return result
+
+
+def _summary_section(answer: str) -> str:
+    """The reviser's prose without its JSON block or any table it may have echoed."""
+    text = _JSON_BLOCK.sub("", answer)
+    lines = [line for line in text.strip().splitlines() if not line.strip().startswith("|")]
+    return "\n".join(lines).strip()
+
+
+def render_revision(result: PatchResult, answer: str) -> str:
+    """Markdown for the final task output: revised table, change log, then the reviser's summary."""
+    parts: List[str] = []
+    if not result.table.rows:
+        parts.append("No relevant policy located.")
+    parts.extend([result.table.to_markdown(), result.change_log])
+    summary = _summary_section(answer)
+    if summary:
+        parts.append(summary)
+    return "\n\n".join(parts) + "\n"
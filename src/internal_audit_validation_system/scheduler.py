@@ -0,0 +1,121 @@
+"""Dependency-graph scheduling of the crew's tasks.
+
+A sequential crew runs its tasks one after another, so a run takes the sum of
+all stages even where stages do not depend on each other. ``TaskGraph`` builds
+the dependency graph from each task's ``context`` in ``tasks.yaml``:
+
+    retrieve_hkma_policies ─┐
+                            ├─ retrieve_relevant_policies ─ reflect_policy_retrieval ─ revise_policy_retrieval
+    retrieve_sfc_policies ──┘
+
+    revise_policy_retrieval ─ analyze_compliance_status ─┬─ prepare_peer_review_package ─ reflection_of_compliance_status
+                                                         └─ review_compliance_analysis
+
+``TaskGraph.run`` starts every task as soon as the tasks it needs have finished.
+A run therefore takes the length of the critical path. Two tasks of the same
+agent never run at the same time, because a crewAI agent holds the state of
+the task it is executing. A task without a ``context`` list needs no other
+task and gets no context.
+
+``AUDIT_PIPELINE`` selects the tasks ``crew()`` schedules: ``full`` (default,
+all nine tasks) or ``retrieval`` (the five policy retrieval tasks).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+FULL_PIPELINE = "full"
+RETRIEVAL_PIPELINE = "retrieval"
+
+
+def pipeline() -> str:
+    """``AUDIT_PIPELINE``: ``full`` (default) or ``retrieval``."""
+    selected = os.environ.get("AUDIT_PIPELINE", FULL_PIPELINE).strip().lower()
+    return RETRIEVAL_PIPELINE if selected == RETRIEVAL_PIPELINE else FULL_PIPELINE
+
+
+@dataclass(frozen=True)
+class TaskGraph:
+    """Tasks (in crew order) and the tasks each one needs."""
+
+    names: Tuple[str, ...]
+    needs: Mapping[str, Tuple[str, ...]]
+
+    @classmethod
+    def build(cls, names: Sequence[str], needs: Mapping[str, Sequence[str]]) -> "TaskGraph":
+        """Validate the graph: unique names, known dependencies and no cycles."""
+        duplicates = sorted({name for name in names if list(names).count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate task names: {', '.join(duplicates)}")
+        graph = cls(tuple(names), {name: tuple(needs.get(name, ())) for name in names})
+        for name in graph.names:
+            unknown = [dependency for dependency in graph.needs[name] if dependency not in graph.needs]
+            if unknown:
+                raise ValueError(f"Task '{name}' needs {', '.join(unknown)}, which the crew does not run.")
+        graph.stages()
+        return graph
+
+    def stages(self) -> List[List[str]]:
+        """Tasks grouped by the earliest stage they can start in; raises ``ValueError`` on a cycle."""
+        stage: Dict[str, int] = {}
+        remaining = list(self.names)
+        while remaining:
+            ready = [name for name in remaining if all(dependency in stage for dependency in self.needs[name])]
+            if not ready:
+                raise ValueError(f"Task context forms a cycle between: {', '.join(remaining)}")
+            for name in ready:
+                stage[name] = 1 + max((stage[dependency] for dependency in self.needs[name]), default=-1)
+                remaining.remove(name)
+        stages: List[List[str]] = [[] for _ in range(max(stage.values(), default=-1) + 1)]
+        for name in self.names:
+            stages[stage[name]].append(name)
+        return stages
+
+    def run(
+        self,
+        execute: Callable[[str], Any],
+        resource: Callable[[str], Hashable] = lambda name: name,
+        done: Optional[Mapping[str, Any]] = None,
+        on_done: Optional[Callable[[str, Any], None]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Run ``execute(name)`` for every task once its dependencies finished; return results by name.
+
+        Tasks sharing a ``resource`` (their agent) run one at a time. ``done``
+        holds results of tasks that are not run again (e.g. when replaying).
+        ``on_done`` is called in the calling thread as each task finishes. The
+        first failure cancels the tasks not yet started and is re-raised.
+        """
+        results: Dict[str, Any] = dict(done or {})
+        pending = [name for name in self.names if name not in results]
+        running: Dict[Future, str] = {}
+        busy: Dict[Hashable, str] = {}
+        pool = ThreadPoolExecutor(max_workers=max_workers or max(1, len(pending)), thread_name_prefix="task")
+        try:
+            while pending or running:
+                for name in list(pending):
+                    if resource(name) in busy or any(dependency not in results for dependency in self.needs[name]):
+                        continue
+                    pending.remove(name)
+                    busy[resource(name)] = name
+                    running[pool.submit(contextvars.copy_context().run, execute, name)] = name
+                if not running:
+                    raise RuntimeError(f"No task can start: {', '.join(pending)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                # Crew order, so callbacks see a deterministic sequence when tasks finish together
+                for future in sorted(finished, key=lambda item: self.names.index(running[item])):
+                    name = running.pop(future)
+                    del busy[resource(name)]
+                    results[name] = future.result()
+                    if on_done is not None:
+                        on_done(name, results[name])
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+        return results
@@ -0,0 +1,61 @@
+"""Native coroutine execution for the custom tools.
+
+crewAI's ``CrewStructuredTool.ainvoke`` runs a synchronous ``_run`` on the
+default thread pool, so every in-flight network call of an async crew or batch
+holds a thread for up to the request timeout. Tools deriving from
+``AsyncBaseTool`` implement ``_arun`` with non-blocking I/O (``tools.http.afetch``)
+and offload only the CPU-bound parsing to executors; ``arun`` and the
+structured tool's ``ainvoke`` await it directly. The synchronous ``run`` path is
+unchanged.
+"""
+
+import asyncio
+from typing import Any
+
+from crewai.tools import BaseTool
+from crewai.tools.structured_tool import CrewStructuredTool, ToolUsageLimitExceededError
+
+
+class AsyncStructuredTool(CrewStructuredTool):
+    """Structured tool whose ``ainvoke`` awaits the original tool's ``_arun``."""
+
+    async def ainvoke(self, input: str | dict, config: dict | None = None, **kwargs: Any) -> Any:
+        parsed_args = self._parse_args(input)
+        if self.has_reached_max_usage_count():
+            raise ToolUsageLimitExceededError(
+                f"Tool '{self.name}' has reached its maximum usage limit of {self.max_usage_count}. "
+                f"You should not use the {self.name} tool again."
+            )
+        self._increment_usage_count()
+        return await self._original_tool._arun(**parsed_args, **kwargs)
+
+
+class AsyncBaseTool(BaseTool):
+    """``BaseTool`` with an awaitable execution path.
+
+    Subclasses override ``_arun``; the default runs ``_run`` on the default
+    executor, which is what crewAI would do anyway.
+    """
+
+    async def _arun(self, *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.to_thread(self._run, *args, **kwargs)
+
+    async def arun(self, *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of ``run``."""
+        result = await self._arun(*args, **kwargs)
+        self.current_usage_count += 1
+        return result
+
+    def to_structured_tool(self) -> CrewStructuredTool:
+        self._set_args_schema()
+        structured_tool = AsyncStructuredTool(
+            name=self.name,
+            description=self.description,
+            args_schema=self.args_schema,
+            func=self._run,
+            result_as_answer=self.result_as_answer,
+            max_usage_count=self.max_usage_count,
+            current_usage_count=self.current_usage_count,
+        )
+        structured_tool._original_tool = self
+        return structured_tool
@@ -0,0 +1,181 @@
+"""Per-host circuit breaker for regulator sites that go down for hours.
+
+Without it every agent iteration waits out the full request timeout against a
+dead host. ``CircuitBreaker`` counts connection errors, timeouts and 5xx
+responses per host; after ``AUDIT_BREAKER_FAILURES`` (default 3) within the
+failure window the host's circuit opens and requests to it fail immediately
+with ``HostUnavailable`` for ``AUDIT_BREAKER_COOLDOWN_SECONDS`` (default 300).
+After the cooldown one caller is let through as a half-open probe: success
+closes the circuit, failure reopens it for another cooldown.
+
+State lives in SQLite (``AUDIT_CIRCUIT_BREAKER``, default
+``.cache/circuit_breaker.sqlite3``) with a connection per operation, so threads
+and concurrent runs on the same machine share what they learn about a host.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_BREAKER_PATH = Path(".cache") / "circuit_breaker.sqlite3"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class HostUnavailable(ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_at: float, failures: int, last_error: Optional[str]):
+        self.host = host
+        self.retry_at = retry_at
+        retry = datetime.fromtimestamp(retry_at, timezone.utc).strftime("%H:%M:%S UTC")
+        cause = f"; last error: {last_error}" if last_error else ""
+        super().__init__(
+            f"{host} is unavailable after {failures} failed request(s){cause}. Requests to it are skipped "
+            f"until {retry}; use another source or a previously retrieved document."
+        )
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    failure_threshold: int = 3
+    # Failures further apart than this do not add up
+    failure_window_seconds: float = 300.0
+    cooldown_seconds: float = 300.0
+    # A probe that never reports back frees the half-open slot after this long
+    probe_timeout_seconds: float = 120.0
+
+    @classmethod
+    def from_env(cls) -> "BreakerPolicy":
+        failures = os.environ.get("AUDIT_BREAKER_FAILURES")
+        cooldown = os.environ.get("AUDIT_BREAKER_COOLDOWN_SECONDS")
+        return cls(
+            failure_threshold=int(failures) if failures else cls.failure_threshold,
+            cooldown_seconds=float(cooldown) if cooldown else cls.cooldown_seconds,
+        )
+
+
+@dataclass(frozen=True)
+class HostState:
+    host: str
+    state: str
+    failures: int
+    opened_at: Optional[float]
+    last_error: Optional[str]
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or url).lower()
+
+
+class CircuitBreaker:
+    """Shared per-host breaker; call ``before`` ahead of a request and report its outcome."""
+
+    def __init__(self, path: Path = DEFAULT_BREAKER_PATH, policy: Optional[BreakerPolicy] = None):
+        self.path = Path(path)
+        self.policy = policy or BreakerPolicy()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS circuits ("
+                "host TEXT PRIMARY KEY, state TEXT NOT NULL, failures INTEGER NOT NULL, "
+                "window_started REAL NOT NULL, opened_at REAL, probe_started REAL, last_error TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def before(self, url: str) -> None:
+        """Raise ``HostUnavailable`` if the host's circuit is open; may admit this call as the probe."""
+        host, now = host_of(url), time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT state, failures, opened_at, probe_started, last_error FROM circuits WHERE host = ?", (host,)
+            ).fetchone()
+            if row is None or row[0] == CLOSED:
+                conn.rollback()
+                return
+            state, failures, opened_at, probe_started, last_error = row
+            retry_at = opened_at + self.policy.cooldown_seconds
+            probing = state == HALF_OPEN and probe_started + self.policy.probe_timeout_seconds > now
+            if now < retry_at or probing:
+                conn.rollback()
+                raise HostUnavailable(host, max(retry_at, now), failures, last_error)
+            conn.execute("UPDATE circuits SET state = ?, probe_started = ? WHERE host = ?", (HALF_OPEN, now, host))
+            conn.commit()
+
+    def record_success(self, url: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM circuits WHERE host = ?", (host_of(url),))
+
+    def record_failure(self, url: str, error: Optional[str] = None) -> None:
+        host, now = host_of(url), time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT state, failures, window_started FROM circuits WHERE host = ?", (host,)).fetchone()
+            state, failures, window_started = row or (CLOSED, 0, now)
+            if state == CLOSED and now - window_started > self.policy.failure_window_seconds:
+                failures, window_started = 0, now
+            failures += 1
+            # A failed probe reopens the circuit straight away
+            if state == HALF_OPEN or failures >= self.policy.failure_threshold:
+                state, opened_at = OPEN, now
+            else:
+                opened_at = None
+            conn.execute(
+                "INSERT OR REPLACE INTO circuits (host, state, failures, window_started, opened_at, probe_started, "
+                "last_error) VALUES (?, ?, ?, ?, ?, NULL, ?)",
+                (host, state, failures, window_started, opened_at, (error or "")[:300] or None),
+            )
+            conn.commit()
+
+    def record_status(self, url: str, status_code: int) -> None:
+        """Report an HTTP response: 5xx counts against the host, anything else shows it is up."""
+        if status_code >= 500:
+            self.record_failure(url, f"HTTP {status_code}")
+        else:
+            self.record_success(url)
+
+    def state(self, url: str) -> HostState:
+        host = host_of(url)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT state, failures, opened_at, last_error FROM circuits WHERE host = ?", (host,)
+            ).fetchone()
+        if row is None:
+            return HostState(host, CLOSED, 0, None, None)
+        return HostState(host, *row)
+
+    def open_hosts(self) -> List[HostState]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT host, state, failures, opened_at, last_error FROM circuits WHERE state != ? ORDER BY host",
+                (CLOSED,),
+            ).fetchall()
+        return [HostState(*row) for row in rows]
+
+
+_BREAKERS: Dict[Path, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def default_breaker() -> CircuitBreaker:
+    """The breaker under ``AUDIT_CIRCUIT_BREAKER``, shared per process."""
+    path = Path(os.environ.get("AUDIT_CIRCUIT_BREAKER", str(DEFAULT_BREAKER_PATH))).resolve()
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(path)
+        if breaker is None:
+            breaker = _BREAKERS[path] = CircuitBreaker(path, BreakerPolicy.from_env())
+        return breaker
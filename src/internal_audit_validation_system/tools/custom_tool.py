@@ -1,32 +1,42 @@
 from crewai.tools import BaseTool
 from typing import Type, Optional
 from pydantic import BaseModel, Field, field_validator
-import requests
-from bs4 import BeautifulSoup
-import warnings
-from urllib3.exceptions import InsecureRequestWarning
-import io
+import asyncio
+import hashlib
 import os
+from collections import OrderedDict
 from pathlib import Path
-from PyPDF2 import PdfReader
 import re
 import html
-try:
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import cm
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_LEFT
-    _REPORTLAB_IMPORT_ERROR = None
-except ImportError as e:
-    A4 = landscape = getSampleStyleSheet = ParagraphStyle = cm = None
-    SimpleDocTemplate = Table = TableStyle = Paragraph = Spacer = None
-    colors = TA_LEFT = None
-    _REPORTLAB_IMPORT_ERROR = e
-
-# Suppress SSL warnings
-warnings.filterwarnings('ignore', category=InsecureRequestWarning)
+import threading
+
+from internal_audit_validation_system.documents.sections import SectionIndex
+from internal_audit_validation_system.policy_table import load_policy_table
+from internal_audit_validation_system.tools.async_tool import AsyncBaseTool
+from internal_audit_validation_system.tools.breaker import HostUnavailable
+from internal_audit_validation_system.tools.http import BINARY, HTML, PDF, _download_errors, afetch, fetch
+from internal_audit_validation_system.tools.memo import memoized_tool
+from internal_audit_validation_system.tools.pdf_extract import extract_pages
+
+# requests, httpx, bs4, PyPDF2 and reportlab are imported on first use inside the tools
+# below so that importing this module (and the crew) does not pay for them.
+#
+# Network-bound tools implement ``_arun`` on top of the non-blocking ``afetch`` and
+# run their CPU-bound parsing on executors; tools that only touch local files use
+# ``AsyncBaseTool``'s default of running ``_run`` on the default executor.
+
+# Data rows per rendered sub-table in MarkdownToPDFTool (roughly one landscape page)
+DEFAULT_ROWS_PER_TABLE = 20
+
+
+def _file_version(tool, arguments) -> dict:
+    """Key material that changes when a local file is edited during the run."""
+    path = arguments.get("file_path") or arguments.get("markdown_file_path") or getattr(tool, "file_path", None)
+    try:
+        stat = os.stat(os.path.abspath(path))
+    except (OSError, TypeError):
+        return {}
+    return {"_mtime_ns": stat.st_mtime_ns, "_size": stat.st_size}
 
 
 class MyCustomToolInput(BaseModel):
@@ -73,7 +83,27 @@ class SecureWebScraperInput(BaseModel):
     """Input schema for SecureWebScraper."""
     website_url: str = Field(..., description="The URL of the website to scrape")
 
-class SecureWebScraperTool(BaseTool):
+def _page_text(page_html: str) -> str:
+    """Visible text of an HTML page, one phrase per line, limited to 10000 characters."""
+    from bs4 import BeautifulSoup
+
+    # Parse the HTML content
+    soup = BeautifulSoup(page_html, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    # Get text and clean it up
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = '\n'.join(chunk for chunk in chunks if chunk)
+
+    return text[:10000]  # Limit to first 10000 characters
+
+
+class SecureWebScraperTool(AsyncBaseTool):
     name: str = "Secure Web Scraper (SSL-tolerant)"
     description: str = (
         "A web scraping tool configured to handle regulatory and official websites that may have SSL "
@@ -82,29 +112,26 @@ class SecureWebScraperTool(BaseTool):
     )
     args_schema: Type[BaseModel] = SecureWebScraperInput
 
+    @memoized_tool()
     def _run(self, website_url: str) -> str:
         try:
-            # Disable SSL verification for problematic government sites
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            response = requests.get(website_url, verify=False, headers=headers, timeout=30)
-            response.raise_for_status()
+            # Shared, SSL-tolerant fetch (coalesced with concurrent requests for the same URL)
+            response = fetch(website_url, timeout=30)
+            if response.kind == PDF:
+                return _pdf_text(website_url, response)
+            return _page_text(response.text)
 
-            # Parse the HTML content
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            # Get text and clean it up
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
+        except Exception as e:
+            return f"Error scraping website: {str(e)}"
 
-            return text[:10000]  # Limit to first 10000 characters
+    @memoized_tool()
+    async def _arun(self, website_url: str) -> str:
+        try:
+            response = await afetch(website_url, timeout=30)
+            if response.kind == PDF:
+                return await asyncio.to_thread(_pdf_text, website_url, response)
+            # HTML parsing is CPU bound; keep it off the event loop
+            return await asyncio.to_thread(_page_text, response.text)
 
         except Exception as e:
             return f"Error scraping website: {str(e)}"
@@ -114,7 +141,31 @@ class PDFDownloadToolInput(BaseModel):
     """Input schema for PDFDownloadTool."""
     pdf_url: str = Field(..., description="The URL of the PDF document to download and extract text from")
 
-class PDFDownloadTool(BaseTool):
+def _pdf_text(pdf_url: str, response) -> str:
+    """Page-marked text of a downloaded PDF, or an error message."""
+    # Check if the response is actually a PDF: magic bytes first, since regulator sites mislabel downloads
+    kind = response.kind
+    if kind != PDF:
+        content_type = response.headers.get('Content-Type', '')
+        return f"Error: The URL does not appear to point to a PDF document ({kind} content). Content-Type: {content_type}"
+
+    # Extract text from all pages, split across a process pool for large documents
+    pages, num_pages = extract_pages(response.content)
+    text_content = [f"--- Page {page_number} ---\n{text}" for page_number, text in pages if text]
+
+    if not text_content:
+        return "Error: No text could be extracted from the PDF. The PDF might be image-based or encrypted."
+
+    full_text = "\n\n".join(text_content)
+
+    # Limit output to prevent token overflow (approximately 50000 characters)
+    if len(full_text) > 50000:
+        full_text = full_text[:50000] + f"\n\n[Content truncated. Total pages: {num_pages}]"
+
+    return full_text
+
+
+class PDFDownloadTool(AsyncBaseTool):
     name: str = "Download and Extract PDF Content"
     description: str = (
         "Downloads a PDF document from a URL and extracts its text content. "
@@ -124,52 +175,192 @@ class PDFDownloadTool(BaseTool):
     )
     args_schema: Type[BaseModel] = PDFDownloadToolInput
 
+    @memoized_tool()
     def _run(self, pdf_url: str) -> str:
         try:
             # Download the PDF with SSL verification disabled for problematic sites
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            response = requests.get(pdf_url, verify=False, headers=headers, timeout=60)
-            response.raise_for_status()
+            response = fetch(pdf_url, timeout=60)
+            return _pdf_text(pdf_url, response)
+
+        except _download_errors() as e:
+            return f"Error downloading PDF from {pdf_url}: {str(e)}"
+        except Exception as e:
+            return f"Error processing PDF: {str(e)}"
+
+    @memoized_tool()
+    async def _arun(self, pdf_url: str) -> str:
+        import httpx
+
+        try:
+            response = await afetch(pdf_url, timeout=60)
+            return await asyncio.to_thread(_pdf_text, pdf_url, response)
+
+        except (httpx.HTTPError, HostUnavailable) as e:
+            return f"Error downloading PDF from {pdf_url}: {str(e)}"
+        except Exception as e:
+            return f"Error processing PDF: {str(e)}"
+
+
+class FetchDocumentToolInput(BaseModel):
+    """Input schema for FetchDocumentTool."""
+    url: str = Field(..., description="The URL of the web page or document (PDF, HTML or text) to read")
 
-            # Check if the response is actually a PDF
-            content_type = response.headers.get('Content-Type', '')
-            if 'application/pdf' not in content_type and not pdf_url.lower().endswith('.pdf'):
-                return f"Error: The URL does not appear to point to a PDF document. Content-Type: {content_type}"
 
-            # Read the PDF from the downloaded content
-            pdf_file = io.BytesIO(response.content)
-            pdf_reader = PdfReader(pdf_file)
+def _document_text(url: str, response) -> str:
+    """Text of a downloaded body, extracted according to its sniffed kind."""
+    kind = response.kind
+    if kind == PDF:
+        return _pdf_text(url, response)
+    if kind == HTML:
+        return _page_text(response.text)
+    if kind == BINARY:
+        content_type = response.headers.get('Content-Type', '') or 'unknown'
+        return (
+            f"Error: {url} returned {len(response.content)} bytes of binary content (Content-Type: {content_type}); "
+            "only web pages, PDFs and text files can be read."
+        )
+    return response.text[:10000]
 
-            # Extract text from all pages
-            text_content = []
-            num_pages = len(pdf_reader.pages)
 
-            for page_num in range(num_pages):
-                page = pdf_reader.pages[page_num]
-                text = page.extract_text()
-                if text:
-                    text_content.append(f"--- Page {page_num + 1} ---\n{text}")
+class FetchDocumentTool(AsyncBaseTool):
+    name: str = "Fetch a Web Page or Document"
+    description: str = (
+        "Downloads any URL once and returns its text: web pages are stripped to their visible text, PDFs have their "
+        "pages extracted, and plain-text files are returned as is. The type is detected from the content itself, so "
+        "PDF links without a .pdf extension or with a wrong Content-Type are handled. Tolerates the SSL certificate "
+        "issues of Hong Kong regulator sites (SFC, HKMA, HKEX)."
+    )
+    args_schema: Type[BaseModel] = FetchDocumentToolInput
 
-            if not text_content:
-                return "Error: No text could be extracted from the PDF. The PDF might be image-based or encrypted."
+    @memoized_tool()
+    def _run(self, url: str) -> str:
+        try:
+            response = fetch(url, timeout=60)
+            return _document_text(url, response)
 
-            full_text = "\n\n".join(text_content)
+        except _download_errors() as e:
+            return f"Error fetching {url}: {str(e)}"
+        except Exception as e:
+            return f"Error processing {url}: {str(e)}"
 
-            # Limit output to prevent token overflow (approximately 50000 characters)
-            if len(full_text) > 50000:
-                full_text = full_text[:50000] + f"\n\n[Content truncated. Total pages: {num_pages}]"
+    @memoized_tool()
+    async def _arun(self, url: str) -> str:
+        import httpx
 
-            return full_text
+        try:
+            response = await afetch(url, timeout=60)
+            # PDF and HTML extraction are CPU bound; keep them off the event loop
+            return await asyncio.to_thread(_document_text, url, response)
 
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, HostUnavailable) as e:
+            return f"Error fetching {url}: {str(e)}"
+        except Exception as e:
+            return f"Error processing {url}: {str(e)}"
+
+
+class DocumentSectionToolInput(BaseModel):
+    """Input schema for DocumentSectionTool."""
+    pdf_url: str = Field(..., description="The URL of the regulatory PDF document")
+    section: Optional[str] = Field(
+        default=None,
+        description="Clause number or heading to return, e.g. '5.1.3', 'Paragraph 5.2', 'Chapter 3' or 'Know your client'",
+    )
+    pages: Optional[str] = Field(default=None, description="Page or page range to return instead, e.g. '12' or '12-15'")
+
+    @field_validator('section', 'pages', mode='before')
+    @classmethod
+    def validate_optional_str(cls, v):
+        """Convert string 'None' or empty string to actual None."""
+        if v in ('None', 'null', ''):
+            return None
+        return v
+
+
+# Extracted section indexes by PDF content hash; repeated clause lookups skip re-extraction
+_SECTION_INDEXES: "OrderedDict[str, SectionIndex]" = OrderedDict()
+_SECTION_INDEXES_LOCK = threading.Lock()
+_SECTION_INDEXES_SIZE = 16
+
+
+def _section_index(content: bytes) -> SectionIndex:
+    key = hashlib.sha256(content).hexdigest()
+    with _SECTION_INDEXES_LOCK:
+        if key in _SECTION_INDEXES:
+            _SECTION_INDEXES.move_to_end(key)
+            return _SECTION_INDEXES[key]
+    pages, _ = extract_pages(content)
+    index = SectionIndex(pages)
+    with _SECTION_INDEXES_LOCK:
+        _SECTION_INDEXES[key] = index
+        while len(_SECTION_INDEXES) > _SECTION_INDEXES_SIZE:
+            _SECTION_INDEXES.popitem(last=False)
+    return index
+
+
+class DocumentSectionTool(AsyncBaseTool):
+    name: str = "Read a Section of a Regulatory PDF"
+    description: str = (
+        "Returns one named section or clause (e.g. 'Paragraph 5.1.3' of the SFC Code of Conduct) or a page range "
+        "from a regulatory PDF instead of the whole document. Call it with only 'pdf_url' first to get the "
+        "table of contents with page numbers, then request the 'section' or 'pages' you need."
+    )
+    args_schema: Type[BaseModel] = DocumentSectionToolInput
+    max_chars: int = 15000
+
+    @memoized_tool()
+    def _run(self, pdf_url: str, section: Optional[str] = None, pages: Optional[str] = None) -> str:
+        try:
+            response = fetch(pdf_url, timeout=60)
+            index = _section_index(response.content)
+        except _download_errors() as e:
+            return f"Error downloading PDF from {pdf_url}: {str(e)}"
+        except Exception as e:
+            return f"Error processing PDF: {str(e)}"
+        return self._select(index, pdf_url, section, pages)
+
+    @memoized_tool()
+    async def _arun(self, pdf_url: str, section: Optional[str] = None, pages: Optional[str] = None) -> str:
+        import httpx
+
+        try:
+            response = await afetch(pdf_url, timeout=60)
+            index = await asyncio.to_thread(_section_index, response.content)
+        except (httpx.HTTPError, HostUnavailable) as e:
             return f"Error downloading PDF from {pdf_url}: {str(e)}"
         except Exception as e:
             return f"Error processing PDF: {str(e)}"
+        return self._select(index, pdf_url, section, pages)
+
+    def _select(self, index: SectionIndex, pdf_url: str, section: Optional[str], pages: Optional[str]) -> str:
+        """The requested page range, section or table of contents, truncated to ``max_chars``."""
+        if pages:
+            match = re.fullmatch(r"\s*(\d+)\s*(?:-\s*(\d+)\s*)?", pages)
+            if not match:
+                return f"Error: Invalid page range '{pages}'. Use a page number or a range such as '12-15'."
+            first = int(match.group(1))
+            text = index.page_range(first, int(match.group(2) or first))
+            if not text:
+                return f"Error: No text found on pages {pages} of {pdf_url}."
+        elif section:
+            found = index.find(section)
+            if found is None:
+                return (
+                    f"Error: Section '{section}' was not found in {pdf_url}. Available sections:\n"
+                    f"{index.table_of_contents()[:self.max_chars]}"
+                )
+            text = f"[{found.label}, pages {found.page_start}-{found.page_end}]\n{index.section_text(found)}"
+        else:
+            toc = index.table_of_contents()
+            if not toc:
+                return f"No headings were detected in {pdf_url}. Request a page range instead."
+            text = f"Table of contents of {pdf_url}:\n{toc}"
+
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars] + "\n\n[Content truncated. Request a narrower section or page range.]"
+        return text
 
 
-class RobustFileReadTool(BaseTool):
+class RobustFileReadTool(AsyncBaseTool):
     """A tool for reading LOCAL file contents with robust validation that handles string 'None' values.
 
     IMPORTANT: This tool is for reading LOCAL files from the filesystem ONLY.
@@ -212,6 +403,7 @@ class RobustFileReadTool(BaseTool):
         super().__init__(**kwargs)
         self.file_path = file_path
 
+    @memoized_tool(key_extra=_file_version)
     def _run(
         self,
         file_path: Optional[str] = None,
@@ -270,7 +462,7 @@ class MarkdownToPDFToolInput(BaseModel):
     pdf_output_path: Optional[str] = Field(None, description="Optional path for the output PDF file. If not provided, will create PDF with same name as markdown file")
 
 
-class MarkdownToPDFTool(BaseTool):
+class MarkdownToPDFTool(AsyncBaseTool):
     name: str = "Convert Markdown to PDF"
     description: str = (
         "Converts a markdown file containing policy tables to a professionally formatted PDF document. "
@@ -281,37 +473,10 @@ class MarkdownToPDFTool(BaseTool):
         "Use this tool to create final deliverable PDF reports from markdown outputs."
     )
     args_schema: Type[BaseModel] = MarkdownToPDFToolInput
-
-    def _parse_markdown_table(self, md_content: str):
-        """Extract table data from markdown content."""
-        lines = md_content.strip().split('\n')
-
-        # Find the table
-        table_start = None
-        for i, line in enumerate(lines):
-            if '|' in line and 'Source Name' in line:
-                table_start = i
-                break
-
-        if table_start is None:
-            return None, []
-
-        # Parse header
-        header_line = lines[table_start]
-        headers = [cell.strip() for cell in header_line.split('|')[1:-1]]
-
-        # Skip separator line
-        data_start = table_start + 2
-
-        # Parse data rows
-        table_data = [headers]
-        for line in lines[data_start:]:
-            if not line.strip() or not line.startswith('|'):
-                break
-            cells = [cell.strip() for cell in line.split('|')[1:-1]]
-            table_data.append(cells)
-
-        return headers, table_data
+    rows_per_table: int = Field(
+        DEFAULT_ROWS_PER_TABLE,
+        description="Data rows per rendered sub-table; each repeats the header. Values below 1 render one table.",
+    )
 
     def _process_cell_content(self, cell_text: str) -> str:
         """Process cell content: escape HTML entities and convert markdown links."""
@@ -325,9 +490,25 @@ class MarkdownToPDFTool(BaseTool):
             # Escape HTML entities for plain text
             return html.escape(cell_text)
 
+    def _format_cell(self, cell: str) -> str:
+        """Convert a data cell to Paragraph markup, truncating long plain text (but keeping full links)."""
+        processed_content = self._process_cell_content(cell)
+        if len(cell) > 100 and '[' not in cell:
+            processed_content = html.escape(cell[:200] + '...') if len(cell) > 200 else processed_content
+        return processed_content
+
+    # Not memoized: every call writes the PDF, which may have been deleted or be asked for at another path
     def _run(self, markdown_file_path: str, pdf_output_path: Optional[str] = None) -> str:
         try:
-            if _REPORTLAB_IMPORT_ERROR is not None:
+            try:
+                from reportlab.lib.pagesizes import A4, landscape
+                from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+                from reportlab.lib.units import cm
+                from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+                from reportlab.lib import colors
+                from reportlab.lib.enums import TA_LEFT
+                from internal_audit_validation_system.tools.pdf_tables import build_table_flowables
+            except ImportError:
                 return (
                     "Error: reportlab is required for PDF conversion but is not installed. "
                     "Install it with `uv add reportlab` (or `uv add --active reportlab` "
@@ -344,12 +525,9 @@ class MarkdownToPDFTool(BaseTool):
             else:
                 pdf_path = Path(pdf_output_path)
 
-            # Read markdown content
-            with open(md_path, 'r', encoding='utf-8') as f:
-                md_content = f.read()
-
-            # Parse table
-            headers, table_data = self._parse_markdown_table(md_content)
+            # Read the typed table from the JSON sidecar, parsing the markdown if there is none
+            table = load_policy_table(md_path)
+            table_data = table.cells() if table is not None else []
 
             if not table_data:
                 return "Error: No policy table found in markdown file. Expected a table with 'Source Name' column."
@@ -390,56 +568,18 @@ class MarkdownToPDFTool(BaseTool):
             elements.append(title)
             elements.append(Spacer(1, 0.5*cm))
 
-            # Process table data
-            processed_data = []
-            for row_idx, row in enumerate(table_data):
-                processed_row = []
-                for cell in row:
-                    if row_idx == 0:  # Header row
-                        processed_row.append(Paragraph(f"<b>{cell}</b>", cell_style))
-                    else:
-                        # Process the cell content (handle links and escape HTML)
-                        processed_content = self._process_cell_content(cell)
-
-                        # Wrap long text (but keep full links)
-                        if len(cell) > 100 and '[' not in cell:
-                            processed_content = html.escape(cell[:200] + '...') if len(cell) > 200 else processed_content
-
-                        processed_row.append(Paragraph(processed_content, cell_style))
-                processed_data.append(processed_row)
-
-            # Create table with column widths
+            # Render the table as page-sized sub-tables that are only materialised
+            # when laid out, so large consolidated tables keep memory bounded
             col_widths = [3*cm, 1.8*cm, 5*cm, 3.5*cm, 4.5*cm, 2*cm, 1.5*cm, 2*cm]
-            table = Table(processed_data, colWidths=col_widths, repeatRows=1)
-
-            # Add style to table
-            table.setStyle(TableStyle([
-                # Header row
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-                # Data rows
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 7),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                ('LEFTPADDING', (0, 0), (-1, -1), 5),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                # Alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-            ]))
-
-            elements.append(table)
+            elements.extend(
+                build_table_flowables(
+                    table_data,
+                    cell_style,
+                    col_widths,
+                    self._format_cell,
+                    rows_per_table=self.rows_per_table,
+                )
+            )
 
             # Build PDF
             doc.build(elements)
@@ -0,0 +1,359 @@
+"""Shared HTTP fetching for the custom tools.
+
+Every tool that downloads a URL goes through ``fetch`` so concurrent requests
+for the same URL share one download and repeated requests within a run are
+served from the run memo (see ``tools/memo.py``). Downloads are written through
+to the local document store (``documents/store.py``); stored copies fresher than
+``AUDIT_DOCUMENT_MAX_AGE_DAYS`` are served without touching the network, and
+older ones are revalidated with a conditional GET.
+
+``afetch`` is the non-blocking counterpart for async tool execution: it uses a
+shared ``httpx.AsyncClient`` per event loop, so hundreds of concurrent
+downloads wait on sockets instead of holding a thread each, and shares the
+run memo and the document store with ``fetch``.
+
+Network timeouts are capped by the run deadline (``deadline.py``): a download
+gets ``min(timeout, remaining budget)`` and is refused once the deadline has
+passed. For regulator hosts with long tail latency, ``AUDIT_HEDGE_AFTER_SECONDS``
+enables hedged requests: if the first GET has not answered after that delay a
+duplicate is sent and whichever answers first wins. ``AUDIT_HEDGE_HOSTS``
+(comma-separated) limits hedging to those hosts and their subdomains.
+
+``FetchedResponse.kind`` classifies a body as PDF, HTML, text or binary from its
+first bytes (magic numbers and markup) before falling back to ``Content-Type``,
+which regulator sites often get wrong.
+
+Requests also pass the per-host circuit breaker (``tools/breaker.py``). While a
+host's circuit is open, a fetch is served from a stale stored copy if one exists
+and otherwise fails at once with ``HostUnavailable`` rather than waiting out the timeout.
+"""
+
+import asyncio
+import os
+import threading
+import warnings
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, FrozenSet, Mapping, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from internal_audit_validation_system.deadline import call_timeout
+from internal_audit_validation_system.documents.store import StoredDocument, default_store, document_max_age
+from internal_audit_validation_system.tools.breaker import HostUnavailable, default_breaker
+from internal_audit_validation_system.tools.memo import current_run_memo
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+PDF = "pdf"
+HTML = "html"
+TEXT = "text"
+BINARY = "binary"
+
+# Bytes inspected when sniffing; PDF allows junk before the header within the first kilobyte
+SNIFF_BYTES = 1024
+_HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body", b"<title", b"<meta", b"<script", b"<div", b"<p>", b"<table")
+_TEXT_MEDIA_TYPES = ("application/json", "application/xml", "application/javascript")
+_CONTROL_BYTES = frozenset(range(0, 9)) | frozenset(range(14, 32))
+
+
+def sniff(head: bytes, content_type: str = "") -> str:
+    """Kind of a body (``PDF``, ``HTML``, ``TEXT`` or ``BINARY``) from its first bytes and media type."""
+    head = head[:SNIFF_BYTES]
+    if b"%PDF-" in head:
+        return PDF
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if start.startswith(_HTML_MARKERS) or (start.startswith(b"<?xml") and b"<html" in start):
+        return HTML
+    media = content_type.split(";")[0].strip().lower()
+    if media in ("text/html", "application/xhtml+xml"):
+        return HTML
+    if media == "application/pdf":
+        return PDF
+    if sum(byte in _CONTROL_BYTES for byte in head) > len(head) // 100:
+        return BINARY
+    if not media or media.startswith("text/") or media in _TEXT_MEDIA_TYPES or media.endswith(("+json", "+xml")):
+        return TEXT
+    return BINARY
+
+
+def _requests():
+    """Import requests on first use and silence SSL warnings for regulator sites."""
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+
+    # Suppress SSL warnings
+    warnings.filterwarnings('ignore', category=InsecureRequestWarning)
+    return requests
+
+
+def _download_errors() -> tuple:
+    """Exceptions meaning a download failed, for tools to report; never raises if requests is missing."""
+    try:
+        requests = _requests()
+    except ImportError:
+        return (HostUnavailable,)
+    return (requests.exceptions.RequestException, HostUnavailable)
+
+
+@dataclass(frozen=True)
+class FetchedResponse:
+    """The parts of an HTTP response the tools need, safe to share between callers."""
+
+    url: str
+    status_code: int
+    content: bytes
+    # Case-insensitive when built from a live response
+    headers: Mapping[str, str] = field(default_factory=dict)
+    encoding: str = "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def kind(self) -> str:
+        return sniff(self.content[:SNIFF_BYTES], self.headers.get("Content-Type", ""))
+
+
+def _charset(content_type: str) -> str:
+    for parameter in content_type.split(";")[1:]:
+        name, _, value = parameter.strip().partition("=")
+        if name.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+def _from_store(document: StoredDocument) -> FetchedResponse:
+    return FetchedResponse(
+        url=document.url,
+        status_code=200,
+        content=document.content,
+        headers={"Content-Type": document.content_type},
+        encoding=_charset(document.content_type),
+    )
+
+
+def _request_headers(stored: Optional[StoredDocument]) -> Dict[str, str]:
+    headers = {'User-Agent': USER_AGENT}
+    if stored is not None:
+        # Revalidate the stale copy so an unchanged document is not downloaded again
+        if stored.etag:
+            headers['If-None-Match'] = stored.etag
+        if stored.last_modified:
+            headers['If-Modified-Since'] = stored.last_modified
+    return headers
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to send a duplicate request for a slow GET."""
+
+    after_seconds: Optional[float] = None
+    # Empty means every host
+    hosts: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        after = os.environ.get("AUDIT_HEDGE_AFTER_SECONDS")
+        hosts = os.environ.get("AUDIT_HEDGE_HOSTS", "")
+        return cls(
+            after_seconds=float(after) if after else None,
+            hosts=frozenset(host.strip().lower() for host in hosts.split(",") if host.strip()),
+        )
+
+    def applies(self, url: str) -> bool:
+        if not self.after_seconds or self.after_seconds <= 0:
+            return False
+        if not self.hosts:
+            return True
+        host = (urlsplit(url).hostname or "").lower()
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.hosts)
+
+
+T = TypeVar("T")
+
+_HEDGE_POOL: Optional[ThreadPoolExecutor] = None
+_HEDGE_POOL_LOCK = threading.Lock()
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    global _HEDGE_POOL
+    with _HEDGE_POOL_LOCK:
+        if _HEDGE_POOL is None:
+            _HEDGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+        return _HEDGE_POOL
+
+
+def _hedged(get: Callable[[], T], after: float) -> T:
+    """Call ``get``; if it has not returned after ``after`` seconds, race a second call.
+
+    The first successful result wins. If both attempts fail the primary's
+    exception is raised. The losing request is left to finish in the background.
+    """
+    pool = _hedge_pool()
+    primary = pool.submit(get)
+    done, _ = wait([primary], timeout=after)
+    if done:
+        return primary.result()
+    attempts = [primary, pool.submit(get)]
+    pending = set(attempts)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for attempt in done:
+            if attempt.exception() is None:
+                return attempt.result()
+    return primary.result()
+
+
+async def _ahedged(make: Callable[[], Awaitable[T]], after: float) -> T:
+    """Async ``_hedged``: the losing request is cancelled."""
+    primary = asyncio.ensure_future(make())
+    done, _ = await asyncio.wait([primary], timeout=after)
+    if done:
+        return primary.result()
+    attempts = [primary, asyncio.ensure_future(make())]
+    pending = set(attempts)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+        return primary.result()
+    finally:
+        for attempt in pending:
+            attempt.cancel()
+
+
+def _download(url: str, timeout: float) -> FetchedResponse:
+    store = default_store()
+    stored = store.get(url)
+    if stored is not None and stored.age() <= document_max_age():
+        return _from_store(stored)
+
+    timeout = call_timeout(timeout, f"GET {url}")
+    breaker = default_breaker()
+    try:
+        breaker.before(url)
+    except HostUnavailable:
+        if stored is not None:
+            return _from_store(stored)
+        raise
+    requests = _requests()
+    headers = _request_headers(stored)
+
+    def get():
+        # Disable SSL verification for problematic government sites
+        return requests.get(url, verify=False, headers=headers, timeout=timeout)
+
+    hedge = HedgePolicy.from_env()
+    try:
+        response = _hedged(get, hedge.after_seconds) if hedge.applies(url) else get()
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
+        breaker.record_failure(url, str(exc))
+        raise
+    breaker.record_status(url, response.status_code)
+    if response.status_code == 304 and stored is not None:
+        store.touch(url, response.headers)
+        return _from_store(stored)
+    response.raise_for_status()
+    store.put(url, response.content, response.headers)
+    return FetchedResponse(
+        url=response.url,
+        status_code=response.status_code,
+        content=response.content,
+        headers=response.headers,
+        encoding=response.encoding or response.apparent_encoding or "utf-8",
+    )
+
+
+def fetch(url: str, timeout: float = 30) -> FetchedResponse:
+    """GET ``url`` once per run; concurrent identical requests share one download.
+
+    Raises the underlying ``requests`` exception on network errors and HTTP
+    error statuses, ``HostUnavailable`` while the host's circuit is open (and no
+    stored copy exists), and ``DeadlineExceeded`` once the run deadline has
+    passed; failures are not memoized.
+    """
+    return current_run_memo().call("http:get", {"url": url}, lambda: _download(url, timeout))
+
+
+# One client (and connection pool) per event loop; clients cannot be shared across loops
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+MAX_ASYNC_CONNECTIONS = 100
+
+
+def _async_client():
+    """The ``httpx.AsyncClient`` of the running loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        import httpx
+
+        client = httpx.AsyncClient(
+            verify=False,  # Same SSL tolerance as the blocking path
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_ASYNC_CONNECTIONS),
+        )
+        _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Close the running loop's client; call before the loop shuts down."""
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _adownload(url: str, timeout: float) -> FetchedResponse:
+    store = default_store()
+    # SQLite and blob reads are short; they run on the default executor so the loop never blocks on disk
+    stored = await asyncio.to_thread(store.get, url)
+    if stored is not None and stored.age() <= document_max_age():
+        return _from_store(stored)
+
+    timeout = call_timeout(timeout, f"GET {url}")
+    breaker = default_breaker()
+    try:
+        await asyncio.to_thread(breaker.before, url)
+    except HostUnavailable:
+        if stored is not None:
+            return _from_store(stored)
+        raise
+    client, headers = _async_client(), _request_headers(stored)
+
+    def get():
+        return client.get(url, headers=headers, timeout=timeout)
+
+    import httpx
+
+    hedge = HedgePolicy.from_env()
+    try:
+        response = await (_ahedged(get, hedge.after_seconds) if hedge.applies(url) else get())
+    except httpx.TransportError as exc:
+        await asyncio.to_thread(breaker.record_failure, url, str(exc) or type(exc).__name__)
+        raise
+    await asyncio.to_thread(breaker.record_status, url, response.status_code)
+    if response.status_code == 304 and stored is not None:
+        await asyncio.to_thread(store.touch, url, response.headers)
+        return _from_store(stored)
+    response.raise_for_status()
+    await asyncio.to_thread(store.put, url, response.content, response.headers)
+    return FetchedResponse(
+        url=str(response.url),
+        status_code=response.status_code,
+        content=response.content,
+        headers=response.headers,
+        encoding=response.encoding or "utf-8",
+    )
+
+
+async def afetch(url: str, timeout: float = 30) -> FetchedResponse:
+    """Non-blocking ``fetch``: same memo, coalescing and document store, over ``httpx``.
+
+    Raises ``httpx.HTTPError`` subclasses on network errors and HTTP error statuses,
+    and ``HostUnavailable``/``DeadlineExceeded`` like ``fetch``.
+    """
+    return await current_run_memo().acall("http:get", {"url": url}, lambda: _adownload(url, timeout))
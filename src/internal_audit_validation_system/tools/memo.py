@@ -0,0 +1,138 @@
+"""Per-run memoization of tool calls and HTTP fetches.
+
+Agents with a high ``max_iter`` often repeat identical tool calls, and the HKMA
+and SFC specialists (plus the aggregator during revision) fetch the same URLs
+and files within one run. ``RunMemo`` returns the stored result for a repeated
+call instantly and lets concurrent identical calls share one in-flight
+execution. Error results are shared with concurrent callers but not stored, so
+a transient failure can be retried later in the run.
+
+``start_run()`` resets the process-wide memo at the beginning of a crew run and
+``RunMemo.as_dict()`` reports the dedup counters for the run metrics. Async tool
+paths use ``RunMemo.acall`` and share the same stored results.
+"""
+
+import functools
+import inspect
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from internal_audit_validation_system.tools.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, str) and result.startswith("Error")
+
+
+class RunMemo:
+    """Memo of results keyed by namespace (tool or fetch kind) and arguments."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Tuple[str, str], Any] = {}
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, counter: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(namespace, {"calls": 0, "memo_hits": 0, "coalesced": 0})
+            stats[counter] += 1
+
+    def _lookup(self, namespace: str, arguments: Dict[str, Any]) -> Tuple[Tuple[str, str], bool, Any]:
+        key = (namespace, json.dumps(arguments, sort_keys=True, default=str))
+        self._count(namespace, "calls")
+        with self._lock:
+            if key in self._results:
+                self._stats[namespace]["memo_hits"] += 1
+                return key, True, self._results[key]
+        return key, False, None
+
+    def _store(self, namespace: str, key: Tuple[str, str], result: Any, shared: bool) -> None:
+        if shared:
+            self._count(namespace, "coalesced")
+        elif not _is_error(result):
+            with self._lock:
+                self._results[key] = result
+
+    def call(self, namespace: str, arguments: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """Return the memoized result for ``arguments`` or compute it once via ``fn``."""
+        key, hit, result = self._lookup(namespace, arguments)
+        if hit:
+            return result
+        result, shared = self._flight.do(key, fn)
+        self._store(namespace, key, result, shared)
+        return result
+
+    async def acall(self, namespace: str, arguments: Dict[str, Any], fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async ``call``: concurrent identical awaits on one event loop share one execution."""
+        key, hit, result = self._lookup(namespace, arguments)
+        if hit:
+            return result
+        result, shared = await self._async_flight.do(key, fn)
+        self._store(namespace, key, result, shared)
+        return result
+
+    def as_dict(self) -> Dict[str, object]:
+        with self._lock:
+            per_namespace = {namespace: dict(stats) for namespace, stats in self._stats.items()}
+        return {
+            "calls": sum(stats["calls"] for stats in per_namespace.values()),
+            "memo_hits": sum(stats["memo_hits"] for stats in per_namespace.values()),
+            "coalesced": sum(stats["coalesced"] for stats in per_namespace.values()),
+            "by_namespace": per_namespace,
+        }
+
+
+_CURRENT = RunMemo()
+
+
+def current_run_memo() -> RunMemo:
+    return _CURRENT
+
+
+def start_run() -> RunMemo:
+    """Discard results memoized by a previous run and return the fresh memo."""
+    global _CURRENT
+    _CURRENT = RunMemo()
+    return _CURRENT
+
+
+def memoized_tool(key_extra: Optional[Callable[[Any, Dict[str, Any]], Dict[str, Any]]] = None):
+    """Decorate a tool's ``_run`` (or async ``_arun``) so identical calls within a run are served once.
+
+    Args:
+        key_extra: Optional function of the tool and its bound arguments returning
+            extra key material, e.g. a file's mtime so edits made during the run are seen.
+    """
+
+    def decorator(run: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(run)
+
+        def key_of(self, args, kwargs) -> Dict[str, Any]:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = {name: value for name, value in bound.arguments.items() if name != "self"}
+            key = dict(arguments)
+            if key_extra is not None:
+                key.update(key_extra(self, arguments))
+            return key
+
+        if inspect.iscoroutinefunction(run):
+
+            @functools.wraps(run)
+            async def async_wrapper(self, *args, **kwargs):
+                key = key_of(self, args, kwargs)
+                return await current_run_memo().acall(f"tool:{self.name}", key, lambda: run(self, *args, **kwargs))
+
+            return async_wrapper
+
+        @functools.wraps(run)
+        def wrapper(self, *args, **kwargs):
+            key = key_of(self, args, kwargs)
+            return current_run_memo().call(f"tool:{self.name}", key, lambda: run(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,115 @@
+"""Page-parallel PDF text extraction for ``PDFDownloadTool``.
+
+PyPDF2's ``extract_text`` is pure Python and CPU bound, so a 300+ page SFC code
+or HKMA manual keeps one core busy while the others idle. ``extract_pages``
+splits the page range into contiguous chunks, extracts them on a shared
+process pool (each worker parses the PDF bytes itself) and reassembles the
+pages in order. Small documents, single-core machines and pool failures fall
+back to the serial loop.
+
+``AUDIT_PDF_WORKERS`` caps the pool size (default: CPU count).
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+# Below this many pages the pool's pickling and start-up overhead outweighs the gain
+PARALLEL_MIN_PAGES = 40
+# Chunks per worker; more than one evens out pages of very different density
+CHUNKS_PER_WORKER = 2
+
+PageText = Tuple[int, str]
+
+# Pools by worker count; a pool is never shut down while another thread may still be using it
+_POOLS: Dict[int, ProcessPoolExecutor] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def pdf_workers() -> int:
+    configured = os.environ.get("AUDIT_PDF_WORKERS")
+    return max(int(configured), 1) if configured else (os.cpu_count() or 1)
+
+
+def _extract_range(content: bytes, start: int, stop: int) -> List[PageText]:
+    """Extract pages ``start``..``stop - 1`` (0-based) as ``(page_number, text)`` pairs."""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(content))
+    return [(index + 1, reader.pages[index].extract_text() or "") for index in range(start, stop)]
+
+
+def _page_count(content: bytes) -> int:
+    from PyPDF2 import PdfReader
+
+    return len(PdfReader(io.BytesIO(content)).pages)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool of ``workers`` processes shared by all extractions in this process, created on first use."""
+    with _POOL_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            # forkserver/spawn: forking the multi-threaded crew process is not safe
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            pool = _POOLS[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method)
+            )
+        return pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a failed pool so the next extraction starts a fresh one.
+
+    Its other users see the same failure and fall back to the serial loop, so
+    their work is not cancelled here.
+    """
+    with _POOL_LOCK:
+        for workers, known in list(_POOLS.items()):
+            if known is pool:
+                del _POOLS[workers]
+    pool.shutdown(wait=False)
+
+
+def _chunks(num_pages: int, count: int) -> List[Tuple[int, int]]:
+    size, remainder = divmod(num_pages, count)
+    ranges, start = [], 0
+    for index in range(count):
+        stop = start + size + (1 if index < remainder else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_pages(
+    content: bytes,
+    workers: Optional[int] = None,
+    min_pages: int = PARALLEL_MIN_PAGES,
+) -> Tuple[List[PageText], int]:
+    """Extract the text of every page of a PDF in page order.
+
+    Returns:
+        ``(pages, num_pages)`` where ``pages`` holds ``(page_number, text)`` with
+        1-based page numbers. Raises PyPDF2's errors for unreadable documents.
+    """
+    num_pages = _page_count(content)
+    workers = min(workers or pdf_workers(), num_pages)
+    if workers < 2 or num_pages < min_pages:
+        return _extract_range(content, 0, num_pages), num_pages
+
+    ranges = _chunks(num_pages, workers * CHUNKS_PER_WORKER)
+    pool = None
+    try:
+        pool = _pool(workers)
+        futures = [pool.submit(_extract_range, content, start, stop) for start, stop in ranges]
+        pages = [page for future in futures for page in future.result()]
+    except (BrokenProcessPool, OSError):
+        if pool is not None:
+            _discard_pool(pool)
+        return _extract_range(content, 0, num_pages), num_pages
+    return pages, num_pages
@@ -0,0 +1,118 @@
+"""Chunked ReportLab table rendering for large policy tables.
+
+A single ReportLab ``Table`` holding thousands of rows is expensive twice over:
+every row is materialised as ``Paragraph`` flowables up front, and each page
+split re-wraps every row still carried by the remaining table. The helpers here
+split the table into page-sized sub-tables that repeat the header row and are
+only materialised when the layout engine reaches them, so peak memory is
+bounded by one chunk and render time grows linearly.
+"""
+
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.platypus import Flowable, Paragraph, Table, TableStyle
+
+TABLE_STYLE_COMMANDS = [
+    # Header row
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('TOPPADDING', (0, 0), (-1, 0), 8),
+    # Data rows
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 7),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('LEFTPADDING', (0, 0), (-1, -1), 5),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+    # Grid
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    # Alternating row colors
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+]
+
+
+class DeferredTable(Flowable):
+    """Placeholder flowable that builds its ``Table`` only when laid out.
+
+    The factory is dropped once called so the raw rows can be released, and the
+    flowable itself is discarded by the doc template after it is drawn or split.
+    """
+
+    def __init__(self, factory: Callable[[], Table]):
+        super().__init__()
+        self._factory: Optional[Callable[[], Table]] = factory
+        self._table: Optional[Table] = None
+
+    def _materialise(self) -> Table:
+        if self._table is None:
+            self._table = self._factory()
+            self._factory = None
+        return self._table
+
+    def wrap(self, availWidth, availHeight):
+        return self._materialise().wrap(availWidth, availHeight)
+
+    def split(self, availWidth, availHeight):
+        return self._materialise().split(availWidth, availHeight)
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self._materialise().drawOn(canvas, x, y, _sW)
+
+    def getSpaceBefore(self):
+        return self._materialise().getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self._materialise().getSpaceAfter()
+
+
+def _chunk_rows(rows: Sequence[Sequence[str]], size: int) -> Iterator[Sequence[Sequence[str]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def build_table_flowables(
+    table_data: Sequence[Sequence[str]],
+    cell_style,
+    col_widths: Sequence[float],
+    format_cell: Callable[[str], str],
+    rows_per_table: int,
+) -> List[Flowable]:
+    """Return one deferred sub-table per chunk of data rows.
+
+    Args:
+        table_data: Header row followed by data rows (raw markdown cell text).
+        cell_style: ParagraphStyle used for every cell.
+        col_widths: Column widths shared by every sub-table.
+        format_cell: Converts raw cell text into Paragraph markup.
+        rows_per_table: Data rows per sub-table. Values below 1 render a single table.
+    """
+    header, rows = table_data[0], table_data[1:]
+    if rows_per_table < 1:
+        rows_per_table = max(len(rows), 1)
+    # Keep chunks even so the alternating row background stays continuous.
+    if rows_per_table > 1 and rows_per_table % 2:
+        rows_per_table += 1
+
+    def factory_for(chunk: Sequence[Sequence[str]]) -> Callable[[], Table]:
+        def build() -> Table:
+            processed = [[Paragraph(f"<b>{cell}</b>", cell_style) for cell in header]]
+            for row in chunk:
+                processed.append([Paragraph(format_cell(cell), cell_style) for cell in row])
+            table = Table(processed, colWidths=col_widths, repeatRows=1)
+            table.setStyle(TableStyle(TABLE_STYLE_COMMANDS))
+            return table
+
+        return build
+
+    if not rows:
+        return [DeferredTable(factory_for([]))]
+    return [DeferredTable(factory_for(chunk)) for chunk in _chunk_rows(rows, rows_per_table)]
@@ -0,0 +1,261 @@
+"""Cached, quota-aware web search for the retrieval agents.
+
+``CachedSearchTool`` is a drop-in replacement for ``SerperDevTool``. Queries
+differing only in case or whitespace share a cache entry, results are kept in a
+local SQLite cache with a TTL that is shared across runs and processes,
+concurrent identical queries collapse into one backend call, and every paid
+backend call is counted against a monthly quota.
+
+The backend is pluggable: ``SerperSearchBackend`` calls the Serper API through
+``SerperDevTool``; ``LocalSearchBackend`` serves canned results for tests and
+benchmarks. Set ``AUDIT_SEARCH_BACKEND=local`` (optionally with
+``AUDIT_SEARCH_FIXTURES=<json file>``) to use the local stand-in in a crew run.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Protocol, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from internal_audit_validation_system.deadline import current_deadline
+from internal_audit_validation_system.tools.singleflight import SingleFlight
+
+DEFAULT_CACHE_PATH = Path(".cache") / "search_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+def normalise_query(query: str) -> str:
+    """Canonical form of a search query used as the cache key.
+
+    Only case and whitespace are normalised. Quotes, operators and term order
+    change what Serper returns, so queries differing in them are cached apart.
+    """
+    return " ".join(query.lower().split())
+
+
+class SearchBackend(Protocol):
+    """Anything that can execute a search query and return JSON-serialisable results."""
+
+    def search(self, query: str, n_results: int) -> Any:
+        ...
+
+
+class SerperSearchBackend:
+    """Backend calling the Serper API through crewAI's ``SerperDevTool``."""
+
+    def __init__(self):
+        self._tools: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def search(self, query: str, n_results: int) -> Any:
+        with self._lock:
+            tool = self._tools.get(n_results)
+            if tool is None:
+                from crewai_tools import SerperDevTool
+
+                tool = self._tools[n_results] = SerperDevTool(n_results=n_results)
+        return tool._run(search_query=query)
+
+
+class LocalSearchBackend:
+    """Offline stand-in returning canned results keyed by normalised query.
+
+    Unknown queries return an empty organic result list. ``latency`` simulates
+    the round trip of a real search API for benchmarks.
+    """
+
+    def __init__(self, results: Optional[Mapping[str, Any]] = None, latency: float = 0.0):
+        self.results = {normalise_query(query): value for query, value in (results or {}).items()}
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path, latency: float = 0.0) -> "LocalSearchBackend":
+        return cls(json.loads(Path(path).read_text()), latency=latency)
+
+    def search(self, query: str, n_results: int) -> Any:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        result = self.results.get(normalise_query(query))
+        if result is None:
+            return {"searchParameters": {"q": query, "num": n_results}, "organic": []}
+        return result
+
+
+def default_backend() -> SearchBackend:
+    """Backend selected by ``AUDIT_SEARCH_BACKEND`` (``serper`` by default)."""
+    if os.environ.get("AUDIT_SEARCH_BACKEND", "serper").lower() == "local":
+        fixtures = os.environ.get("AUDIT_SEARCH_FIXTURES")
+        return LocalSearchBackend.from_file(Path(fixtures)) if fixtures else LocalSearchBackend()
+    return SerperSearchBackend()
+
+
+class SearchCache:
+    """SQLite-backed search result cache and monthly quota ledger.
+
+    A connection is opened per operation so the cache is safe to share between
+    threads and between concurrent runs on the same machine.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, query TEXT NOT NULL, result TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS search_quota (period TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return ``{"result": ..., "fetched_at": ...}`` for a cached key, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT result, fetched_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {"result": json.loads(row[0]), "fetched_at": row[1]}
+
+    def put(self, key: str, query: str, result: Any) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, query, result, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, query, json.dumps(result), time.time()),
+            )
+
+    def try_consume_quota(self, limit: Optional[int], period: Optional[str] = None) -> bool:
+        """Atomically count one backend call against ``period`` unless ``limit`` is reached."""
+        period = period or datetime.utcnow().strftime("%Y-%m")
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT used FROM search_quota WHERE period = ?", (period,)).fetchone()
+            used = row[0] if row else 0
+            if limit is not None and used >= limit:
+                conn.rollback()
+                return False
+            conn.execute("INSERT OR REPLACE INTO search_quota (period, used) VALUES (?, ?)", (period, used + 1))
+            conn.commit()
+            return True
+
+    def quota_used(self, period: Optional[str] = None) -> int:
+        period = period or datetime.utcnow().strftime("%Y-%m")
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT used FROM search_quota WHERE period = ?", (period,)).fetchone()
+        return row[0] if row else 0
+
+
+@dataclass
+class SearchStats:
+    """Per-process counters for search traffic."""
+
+    backend_calls: int = 0
+    cache_hits: int = 0
+    stale_hits: int = 0
+    coalesced: int = 0
+    quota_denied: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+_STATS = SearchStats()
+_STATS_LOCK = threading.Lock()
+_SINGLE_FLIGHT = SingleFlight()
+_CACHES: Dict[Path, SearchCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def search_stats() -> SearchStats:
+    """Counters accumulated by every ``CachedSearchTool`` in this process."""
+    return _STATS
+
+
+def _count(field_name: str) -> None:
+    with _STATS_LOCK:
+        setattr(_STATS, field_name, getattr(_STATS, field_name) + 1)
+
+
+def _shared_cache(path: Path) -> SearchCache:
+    resolved = Path(path).resolve()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(resolved)
+        if cache is None:
+            cache = _CACHES[resolved] = SearchCache(resolved)
+        return cache
+
+
+class CachedSearchToolSchema(BaseModel):
+    """Input schema for CachedSearchTool."""
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+
+class CachedSearchTool(BaseTool):
+    name: str = "Search the internet with Serper"
+    description: str = (
+        "A tool that can be used to search the internet with a search_query. "
+        "Results for identical or near-identical queries are served from a local cache."
+    )
+    args_schema: Type[BaseModel] = CachedSearchToolSchema
+    n_results: int = 10
+    ttl_seconds: int = DEFAULT_TTL_SECONDS
+    cache_path: str = str(DEFAULT_CACHE_PATH)
+    monthly_quota: Optional[int] = Field(
+        default_factory=lambda: int(os.environ["SERPER_MONTHLY_QUOTA"]) if os.environ.get("SERPER_MONTHLY_QUOTA") else None,
+        description="Maximum backend calls per calendar month (None = unlimited).",
+    )
+    backend: Optional[Any] = Field(default=None, exclude=True)
+
+    def _backend(self) -> SearchBackend:
+        if self.backend is None:
+            self.backend = default_backend()
+        return self.backend
+
+    def _run(self, search_query: str, **kwargs: Any) -> Any:
+        key = f"{self.n_results}:{normalise_query(search_query)}"
+        cache = _shared_cache(Path(self.cache_path))
+
+        cached = cache.get(key)
+        if cached is not None and time.time() - cached["fetched_at"] < self.ttl_seconds:
+            _count("cache_hits")
+            return cached["result"]
+
+        result, shared = _SINGLE_FLIGHT.do(key, lambda: self._fetch(cache, key, search_query, cached))
+        if shared:
+            _count("coalesced")
+        return result
+
+    def _fetch(self, cache: SearchCache, key: str, search_query: str, stale: Optional[Dict[str, Any]]) -> Any:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            if stale is not None:
+                _count("stale_hits")
+                return stale["result"]
+            return f"Error: the run deadline has passed; '{search_query}' was not searched."
+
+        if not cache.try_consume_quota(self.monthly_quota):
+            _count("quota_denied")
+            if stale is not None:
+                _count("stale_hits")
+                return stale["result"]
+            return (
+                f"Error: monthly search quota of {self.monthly_quota} calls is exhausted and no cached "
+                f"result exists for '{search_query}'. Rely on local documents or previously retrieved sources."
+            )
+
+        _count("backend_calls")
+        result = self._backend().search(search_query, self.n_results)
+        cache.put(key, search_query, result)
+        return result
@@ -0,0 +1,88 @@
+"""In-process request coalescing for the custom tools.
+
+When several agents (or threads of one agent) ask for the same expensive
+result at the same time, only the first caller does the work; the others wait
+for it and receive the same result. ``AsyncSingleFlight`` does the same for
+coroutines without blocking the event loop.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one in-flight call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``fn`` unless an identical call is already running.
+
+        Returns:
+            ``(result, shared)`` where ``shared`` is true when the result came from
+            another caller's in-flight call. Exceptions propagate to every waiter.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return future.result(), False
+
+
+class AsyncSingleFlight:
+    """Collapse concurrent awaits that share a key; calls are coalesced per event loop."""
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Await ``fn()`` unless an identical call is already in flight on this loop.
+
+        Returns ``(result, shared)`` like ``SingleFlight.do``. Exceptions propagate
+        to every waiter; cancelling the leader cancels the waiters.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        future = self._in_flight.get(slot)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future), True
+
+        future = loop.create_future()
+        self._in_flight[slot] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved so an unawaited future does not log it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._in_flight.pop(slot, None)
+        return result, False
@@ -0,0 +1,188 @@
+"""Parallel per-row verification of the consolidated policy table.
+
+``reflect_policy_retrieval`` normally reviews the whole table in one long
+``senior_audit_reviewer`` agent loop. With ``AUDIT_REFLECTION_ENGINE=fanout``
+it is replaced by ``RowVerifier``:
+
+- Provenance gaps (a missing document URL, an unknown effective date) are found
+  in code. Duplicates were already removed when the table was consolidated (see
+  ``aggregation.py``).
+- The rows are split into groups of ``AUDIT_VERIFIER_GROUP_SIZE`` (default 3).
+- The groups are checked concurrently by a smaller model (``AUDIT_VERIFIER_MODEL``).
+- Every request first takes a slot from the crew's shared requests-per-minute limiter.
+
+The per-group findings are merged into the reflection's PASS / NEEDS REVISION
+format and findings JSON block, so delta revision (``revision.py``) consumes the
+result unchanged. Reflection wall-clock time is then roughly one small-model
+call rather than one long agent loop over the whole table.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+from internal_audit_validation_system.policy_table import PolicyTable
+from internal_audit_validation_system.revision import (
+    ReflectionFindings,
+    RowFinding,
+    finding_from_dict,
+    json_block,
+    keyed_markdown,
+    row_key,
+)
+
+AGENT = "agent"
+FANOUT = "fanout"
+
+DEFAULT_VERIFIER_MODEL = "gpt-4.1-nano"
+DEFAULT_GROUP_SIZE = 3
+DEFAULT_MAX_WORKERS = 8
+
+_MISSING = {"", "n/a", "na", "unknown", "-", "none"}
+
+_PROMPT = """You verify rows of a regulatory policy table compiled for the audit observation: "{observation}".
+
+Check each row below for:
+- a specific section-level citation (e.g. "Section 4.2.1", not just "Section 4")
+- a Key Excerpt that reads as a verbatim quote of at most one sentence
+- a Relevance note that explains why the policy applies to the observation
+- a Confidence level justified by the excerpt and relevance
+- a weak or indirect match to the observation without justification
+
+{rows}
+
+Answer with only a JSON object: {{"findings": [{{"key": "<row key>", "column": "<column>", "issue": "...", "fix": "..."}}]}}
+with one finding per problem, using the keys above. Use an empty list if every row is sound."""
+
+
+def reflection_engine() -> str:
+    """``AUDIT_REFLECTION_ENGINE``: ``agent`` (default) or ``fanout``."""
+    engine = os.environ.get("AUDIT_REFLECTION_ENGINE", AGENT).strip().lower()
+    return FANOUT if engine == FANOUT else AGENT
+
+
+def verifier_model() -> str:
+    return os.environ.get("AUDIT_VERIFIER_MODEL", DEFAULT_VERIFIER_MODEL)
+
+
+def _is_missing(value: str) -> bool:
+    return value.strip().lower() in _MISSING
+
+
+def provenance_findings(table: PolicyTable) -> List[RowFinding]:
+    """Findings that need no model: rows without a document URL or effective date."""
+    findings = []
+    for index, row in enumerate(table.rows):
+        key = row_key(index)
+        if row.url is None and _is_missing(row.document_url):
+            findings.append(
+                RowFinding(key, "No document path or URL.", "Add the full URL or file path of the source.", "Document Path / URL")
+            )
+        if "Effective Date" in table.headers and _is_missing(row.effective_date):
+            findings.append(
+                RowFinding(key, "Effective date is missing.", "Add the date the policy became effective.", "Effective Date")
+            )
+    return findings
+
+
+@dataclass
+class VerificationResult:
+    findings: ReflectionFindings
+    groups: int = 0
+    # Keys of rows whose group could not be verified (model error or unusable answer)
+    unverified: List[str] = field(default_factory=list)
+
+    def render(self) -> str:
+        """Markdown in the reflection task's format, ending with the findings JSON block."""
+        findings = self.findings
+        rows = len(findings.flagged_keys)
+        lines = [
+            f"1) Verdict: {findings.verdict} - {len(findings.findings)} issue(s) in {rows} row(s); "
+            f"rows were verified in {self.groups} parallel group(s).",
+            "",
+            "2) Issues and fixes:",
+        ]
+        for finding in findings.findings:
+            where = f"{finding.key} ({finding.column})" if finding.column else (finding.key or "Table")
+            fix = f" Fix: {finding.fix}" if finding.fix else ""
+            lines.append(f"- {where}: {finding.issue}{fix}")
+        if not findings.findings:
+            lines.append("- None.")
+        lines.extend(["", "3) Gaps/additional sources to check next:"])
+        lines.extend(f"- {gap}" for gap in findings.gaps or ["None identified by per-row verification."])
+        lines.extend(["", "```json", json.dumps(findings.as_dict(), indent=2), "```"])
+        return "\n".join(lines) + "\n"
+
+
+class RowVerifier:
+    """Checks row groups of a policy table concurrently with a (small) model.
+
+    ``complete`` sends one prompt and returns the model's text. ``throttle``,
+    if given, is called before every request (e.g. a crew's
+    ``RPMController.check_or_wait``) so the fan-out respects the shared rate limit.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[str], str],
+        throttle: Optional[Callable[[], object]] = None,
+        group_size: int = DEFAULT_GROUP_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        self.complete = complete
+        self.throttle = throttle
+        self.group_size = max(1, group_size)
+        self.max_workers = max(1, max_workers)
+
+    @classmethod
+    def from_env(cls, complete: Callable[[str], str], throttle: Optional[Callable[[], object]] = None) -> "RowVerifier":
+        size = os.environ.get("AUDIT_VERIFIER_GROUP_SIZE")
+        return cls(complete, throttle, group_size=int(size) if size else DEFAULT_GROUP_SIZE)
+
+    def groups(self, table: PolicyTable) -> List[List[int]]:
+        indexes = list(range(len(table.rows)))
+        return [indexes[start:start + self.group_size] for start in range(0, len(indexes), self.group_size)]
+
+    def _verify_group(
+        self, table: PolicyTable, keyed_lines: Sequence[str], indexes: Sequence[int], observation: str
+    ) -> List[RowFinding]:
+        # The table header plus the group's rows, keyed as in the full table
+        rows = "\n".join(list(keyed_lines[:2]) + [keyed_lines[2 + index] for index in indexes])
+        prompt = _PROMPT.format(observation=observation, rows=rows)
+        keys = {row_key(index) for index in indexes}
+        if self.throttle is not None:
+            self.throttle()
+        data = json_block(self.complete(prompt), "findings")
+        findings = []
+        for number, item in enumerate(data.get("findings") or [], start=1):
+            finding = finding_from_dict(item, table, f"Finding {number}")
+            # A finding about a row outside the group is the model wandering; the row's own group covers it
+            if finding.key in keys:
+                findings.append(finding)
+        return findings
+
+    def verify(self, table: PolicyTable, observation: str) -> VerificationResult:
+        findings = provenance_findings(table)
+        groups = self.groups(table)
+        keyed_lines = keyed_markdown(table).splitlines()
+        unverified: List[str] = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups) or 1)) as pool:
+            futures = [pool.submit(self._verify_group, table, keyed_lines, indexes, observation) for indexes in groups]
+            for indexes, future in zip(groups, futures):
+                try:
+                    findings.extend(future.result())
+                except Exception as exc:
+                    # One failed group must not lose the others; its rows go to the reviser as unverified
+                    for index in indexes:
+                        key = row_key(index)
+                        unverified.append(key)
+                        findings.append(
+                            RowFinding(key, f"Could not be verified automatically ({exc}).", "Re-check this row against its source.")
+                        )
+        findings.sort(key=lambda finding: (int(finding.key[1:]) if finding.key else 0))
+        verdict = "NEEDS REVISION" if findings else "PASS"
+        return VerificationResult(ReflectionFindings(verdict, findings), groups=len(groups), unverified=unverified)
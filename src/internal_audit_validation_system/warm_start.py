@@ -0,0 +1,195 @@
+"""Warm start of policy retrieval from the final tables of similar past observations.
+
+Many audit observations are rephrasings of earlier ones ("lack of risk
+assessment for investment products" in ten wordings), and each would otherwise
+repeat the full HKMA and SFC retrieval. ``ObservationIndex`` is a local
+similarity index over the observations of completed runs in the run registry
+(``registry.py``) that produced a final policy table (``policy_retrieval_final.md``).
+Similarity is the cosine of TF-IDF vectors of word stems and character trigrams,
+so it needs no model and no network.
+
+For the best match of a new observation:
+
+- at least ``AUDIT_WARM_START_SKIP`` (default 0.9, near-identical wording): retrieval
+  is skipped. The cached table becomes the run's consolidated table, and only
+  reflection and revision (and the compliance stage) run.
+- at least ``AUDIT_WARM_START_SEED`` (default 0.5): each retrieval agent is seeded
+  with the cached rows of its regulator to re-verify, and searches only for gaps.
+
+Wording similarity cannot tell "insurance products" from "investment products",
+which is why only near-identical observations skip retrieval.
+``AUDIT_WARM_START=off`` disables warm starts. A batch (``batch.py``) uses a
+third mode, ``reuse``, to hand the final table of a topic's shared retrieval to
+each of its observations.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from internal_audit_validation_system.aggregation import TASK_REGULATORS, regulator_of
+from internal_audit_validation_system.policy_table import PolicyTable, parse_markdown_table
+from internal_audit_validation_system.registry import RunRegistry, default_registry
+
+SKIP = "skip"
+SEED = "seed"
+# A final table retrieved for this run's topic by a batch (see batch.py); only the compliance stage runs
+REUSE = "reuse"
+
+DEFAULT_SKIP_THRESHOLD = 0.9
+DEFAULT_SEED_THRESHOLD = 0.5
+# The task whose output is cached, and the one whose summary a skipped retrieval reuses
+FINAL_TASK = "revise_policy_retrieval"
+CONSOLIDATION_TASK = "retrieve_relevant_policies"
+
+_STOPWORDS = frozenset(
+    "a an and any are as at be before by for from in is its no not of on or the their this to was were when with "
+    "without".split()
+)
+_SUFFIXES = ("ments", "ment", "ings", "ing", "edly", "ed", "es", "s")
+_SUMMARY = re.compile(r"^#+\s*.*critical requirements.*$", re.IGNORECASE | re.MULTILINE)
+
+
+def warm_start_enabled() -> bool:
+    """``AUDIT_WARM_START``: on by default; ``off``, ``0`` or ``false`` disables it."""
+    return os.environ.get("AUDIT_WARM_START", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+def thresholds() -> Tuple[float, float]:
+    """``(skip, seed)`` similarity thresholds from ``AUDIT_WARM_START_SKIP`` and ``AUDIT_WARM_START_SEED``."""
+    skip = float(os.environ.get("AUDIT_WARM_START_SKIP", DEFAULT_SKIP_THRESHOLD))
+    seed = float(os.environ.get("AUDIT_WARM_START_SEED", DEFAULT_SEED_THRESHOLD))
+    return skip, min(seed, skip)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[: -len(suffix)]
+            break
+    # "derivatives" loses "es" but "derivative" keeps its "e"; dropping a final "e" gives both one stem
+    return word[:-1] if word.endswith("e") and len(word) >= 5 else word
+
+
+def observation_words(text: str) -> List[str]:
+    """Word stems of ``text`` without stopwords."""
+    return [_stem(word) for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in _STOPWORDS]
+
+
+def observation_terms(text: str) -> Counter:
+    """Word stems (without stopwords) and the character trigrams of each stem."""
+    words = observation_words(text)
+    terms = Counter(f"w:{word}" for word in words)
+    for word in words:
+        padded = f" {word} "
+        terms.update(f"c:{padded[index:index + 3]}" for index in range(len(padded) - 2))
+    return terms
+
+
+class ObservationIndex:
+    """TF-IDF index of observations; ``best`` returns the most similar one and its cosine similarity."""
+
+    def __init__(self, observations: Sequence[str]):
+        self.observations = list(observations)
+        self._terms = [observation_terms(observation) for observation in self.observations]
+        self._document_frequency = Counter(term for terms in self._terms for term in terms)
+
+    def _weights(self, terms: Counter) -> Dict[str, float]:
+        # Smoothed IDF over the indexed observations plus the query
+        count = len(self._terms) + 1
+        return {
+            term: frequency * (math.log((1 + count) / (2 + self._document_frequency[term])) + 1)
+            for term, frequency in terms.items()
+        }
+
+    def similarity(self, observation: str, index: int) -> float:
+        query, other = self._weights(observation_terms(observation)), self._weights(self._terms[index])
+        dot = sum(weight * other[term] for term, weight in query.items() if term in other)
+        norm = math.sqrt(sum(weight * weight for weight in query.values())) * math.sqrt(
+            sum(weight * weight for weight in other.values())
+        )
+        return dot / norm if norm else 0.0
+
+    def best(self, observation: str) -> Optional[Tuple[int, float]]:
+        scored = [(index, self.similarity(observation, index)) for index in range(len(self.observations))]
+        return max(scored, key=lambda item: item[1], default=None)
+
+
+def _critical_requirements(markdown: Optional[str]) -> str:
+    """The "Top Three Critical Requirements" section of a consolidated output, if it has one."""
+    match = _SUMMARY.search(markdown or "")
+    if match is None:
+        return ""
+    following = re.search(r"^#+\s", markdown[match.end():], re.MULTILINE)
+    end = match.end() + following.start() if following else len(markdown)
+    return markdown[match.start():end].strip()
+
+
+@dataclass(frozen=True)
+class WarmStart:
+    """The cached final table a run starts from, and how."""
+
+    mode: str
+    run_id: str
+    observation: str
+    score: float
+    table: PolicyTable
+    # Critical-requirements summary of the cached run's consolidated output
+    summary: str = ""
+
+    def seed_table(self, task_name: str) -> PolicyTable:
+        """The cached rows of the regulator ``task_name`` retrieves."""
+        regulator = TASK_REGULATORS.get(task_name)
+        return PolicyTable(
+            task_name=task_name,
+            headers=list(self.table.headers),
+            rows=[row for row in self.table.rows if regulator_of(row) == regulator],
+        )
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode,
+            "run_id": self.run_id,
+            "observation": self.observation,
+            "similarity": round(self.score, 3),
+            "rows": len(self.table.rows),
+        }
+
+
+def find_warm_start(observation: str, registry: Optional[RunRegistry] = None) -> Optional[WarmStart]:
+    """The warm start for ``observation`` from the most similar past run, if one is similar enough.
+
+    A registry that cannot be read means a cold start; it never fails the run.
+    """
+    if not warm_start_enabled():
+        return None
+    try:
+        registry = registry or default_registry()
+        candidates: List[Tuple[dict, PolicyTable]] = []
+        for run in registry.latest_outputs(FINAL_TASK):
+            table = parse_markdown_table(run["markdown"], FINAL_TASK)
+            if table is not None and table.rows:
+                candidates.append((run, table))
+        best = ObservationIndex([run["observation"] for run, _ in candidates]).best(observation)
+        skip, seed = thresholds()
+        if best is None or best[1] < seed:
+            return None
+        run, table = candidates[best[0]]
+        summary = _critical_requirements(registry.output(run["run_id"], CONSOLIDATION_TASK))
+    except (OSError, sqlite3.Error) as exc:
+        print(f"Warm start unavailable: {exc}")
+        return None
+    return WarmStart(
+        mode=SKIP if best[1] >= skip else SEED,
+        run_id=run["run_id"],
+        observation=run["observation"],
+        score=best[1],
+        table=table,
+        summary=summary,
+    )
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_document_store(tmp_path, monkeypatch):
+    """Keep tool downloads made by tests out of the developer's document store and circuit breaker."""
+    monkeypatch.setenv("AUDIT_DOCUMENT_STORE", str(tmp_path / "document-store"))
+    monkeypatch.setenv("AUDIT_CIRCUIT_BREAKER", str(tmp_path / "circuit_breaker.sqlite3"))
@@ -0,0 +1,101 @@
+from internal_audit_validation_system.aggregation import (
+    merge_tables,
+    normalise_clause,
+    regulator_of,
+    render_consolidated,
+)
+from internal_audit_validation_system.evaluation.criteria import retrieve_policies_checks, run_checks
+from internal_audit_validation_system.policy_table import PolicyRow, PolicyTable, normalise_url, parse_markdown_table
+
+HKMA = PolicyTable(
+    task_name="retrieve_hkma_policies",
+    headers=["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Confidence", "Link or Reference"],
+    rows=[
+        PolicyRow(
+            source_name="HKMA SPM SB-1",
+            section_clause="Paragraph 3.1",
+            key_excerpt="Banks should assess product risk.",
+            relevance="Risk assessment",
+            confidence="Med",
+            link_or_reference="https://www.hkma.gov.hk/sb-1.pdf",
+        ),
+        PolicyRow(
+            source_name="SFC Code of Conduct",
+            section_clause="5.2",
+            key_excerpt="Recommendations must be suitable.",
+            relevance="",
+            confidence="Low",
+            link_or_reference="N/A",
+        ),
+    ],
+)
+SFC = PolicyTable(
+    task_name="retrieve_sfc_policies",
+    headers=["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Confidence", "Link or Reference"],
+    rows=[
+        PolicyRow(
+            source_name="Code of Conduct (SFC)",
+            section_clause="para. 5.2",
+            key_excerpt="Recommendations must be suitable.",
+            relevance="Suitability gap",
+            confidence="High",
+            link_or_reference="https://sfc.hk/coc.pdf",
+        ),
+        PolicyRow(
+            source_name="SFC Code of Conduct",
+            section_clause="Para 5.2",
+            key_excerpt="Recommendations must be suitable.",
+            relevance="Suitability gap",
+            confidence="High",
+            link_or_reference="http://www.sfc.hk/coc.pdf/",
+        ),
+    ],
+)
+
+SUMMARY = """### Top Three Critical Requirements
+- Assess product risk (HKMA SPM SB-1, 3.1).
+- Ensure suitability (SFC Code of Conduct, 5.2).
+- Document the assessment (SFC Code of Conduct, 5.2).
+"""
+
+
+def test_normalisers():
+    assert normalise_clause("Paragraph 5.1.3 ( a )") == "5.1.3(a)"
+    assert normalise_clause("para. 5.2") == normalise_clause("5.2")
+    assert normalise_url("http://www.sfc.hk/coc.pdf/#p3") == normalise_url("https://sfc.hk/coc.pdf")
+    assert regulator_of(SFC.rows[0]) == "SFC"
+    assert regulator_of(PolicyRow(source_name="Internal memo"), "HKMA") == "HKMA"
+
+
+def test_merge_drops_duplicates_across_tables_and_fills_gaps():
+    result = merge_tables([HKMA, SFC])
+
+    assert result.duplicates_removed == 2
+    assert len(result.table.rows) == 2
+    suitability = result.table.rows[0]
+    assert suitability.confidence == "High"
+    assert suitability.relevance == "Suitability gap"
+    assert suitability.url is not None
+    assert result.coverage == {"SFC": 1, "HKMA": 1}
+    assert "1 HKMA and 1 SFC" in result.coverage_note
+    assert "Gap" not in result.coverage_note
+
+
+def test_coverage_note_flags_missing_regulator():
+    result = merge_tables([PolicyTable(task_name="retrieve_hkma_policies", rows=HKMA.rows[:1])])
+
+    assert "Gap: no SFC requirements" in result.coverage_note
+
+
+def test_rendered_output_passes_fast_retrieve_checks():
+    markdown = render_consolidated(merge_tables([HKMA, SFC]), "| echoed | table |\n" + SUMMARY)
+
+    assert parse_markdown_table(markdown).rows == merge_tables([HKMA, SFC]).table.rows
+    evaluation = run_checks("retrieve_relevant_policies", markdown, retrieve_policies_checks, fast=True)
+    assert evaluation.failed == []
+
+
+def test_empty_merge_says_nothing_was_located():
+    markdown = render_consolidated(merge_tables([]), SUMMARY)
+
+    assert markdown.startswith("No relevant policy located.")
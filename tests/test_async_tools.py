@@ -0,0 +1,129 @@
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from internal_audit_validation_system.tools.custom_tool import (
+    DocumentSectionTool,
+    PDFDownloadTool,
+    RobustFileReadTool,
+    SecureWebScraperTool,
+)
+from internal_audit_validation_system.tools.http import aclose_async_client
+from internal_audit_validation_system.tools.memo import start_run
+
+DELAY_SECONDS = 0.2
+
+
+def _pdf() -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    pdf.drawString(72, 720, "5.2 Know your client")
+    pdf.drawString(72, 700, "Ensure the suitability of the recommendation.")
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def slow_site():
+    hits = []
+    pdf = _pdf()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            time.sleep(DELAY_SECONDS)
+            if self.path.endswith(".pdf"):
+                body, content_type = pdf, "application/pdf"
+            else:
+                body = f"<html><script>x()</script><body><p>Circular {self.path}</p></body></html>".encode()
+                content_type = "text/html; charset=utf-8"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    start_run()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+def _run(make_awaitable):
+    async def main():
+        # Two executor threads: the downloads must not need a thread each
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=2))
+        try:
+            return await make_awaitable()
+        finally:
+            await aclose_async_client()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_async_scrapes_do_not_hold_a_thread_each(slow_site):
+    base, hits = slow_site
+    tool = SecureWebScraperTool()
+    calls = 40
+
+    started = time.perf_counter()
+    results = _run(lambda: asyncio.gather(*(tool.arun(website_url=f"{base}/circular-{n}") for n in range(calls))))
+    elapsed = time.perf_counter() - started
+
+    assert results[7] == "Circular /circular-7"
+    assert len(hits) == calls
+    # Serialised over two threads this would take calls * DELAY / 2 = 4s
+    assert elapsed < calls * DELAY_SECONDS / 4
+    assert tool.current_usage_count == calls
+
+
+def test_async_and_sync_paths_share_downloads_and_results(slow_site):
+    base, hits = slow_site
+    url = f"{base}/code.pdf"
+
+    async def calls():
+        structured = PDFDownloadTool().to_structured_tool()
+        return await asyncio.gather(
+            structured.ainvoke({"pdf_url": url}),
+            PDFDownloadTool().arun(pdf_url=url),
+            DocumentSectionTool().arun(pdf_url=url, section="5.2"),
+        )
+
+    text, again, section = _run(calls)
+
+    assert "Ensure the suitability" in text and again == text
+    assert section.startswith("[5.2 Know your client, pages 1-1]")
+    assert hits == ["/code.pdf"]
+    # The blocking path is served from the same run memo
+    assert PDFDownloadTool().run(pdf_url=url) == text
+    assert hits == ["/code.pdf"]
+
+
+def test_async_errors_are_reported_like_the_sync_path(slow_site, tmp_path):
+    base, _ = slow_site
+    (tmp_path / "notes.md").write_text("line 1\nline 2\n")
+
+    async def calls():
+        return await asyncio.gather(
+            PDFDownloadTool().arun(pdf_url="http://127.0.0.1:9/missing.pdf"),
+            RobustFileReadTool().arun(file_path=str(tmp_path / "notes.md"), start_line=2),
+        )
+
+    missing, read = _run(calls)
+
+    assert missing.startswith("Error downloading PDF from http://127.0.0.1:9/missing.pdf")
+    assert read == "line 2\n"
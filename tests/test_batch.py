@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+from internal_audit_validation_system import main
+from internal_audit_validation_system.batch import FAILED, Cluster, load_topics, plan_batch, run_batch
+from internal_audit_validation_system.policy_table import PolicyRow, PolicyTable
+from internal_audit_validation_system.scheduler import RETRIEVAL_PIPELINE
+from internal_audit_validation_system.warm_start import REUSE, WarmStart
+
+OBSERVATIONS = [
+    "Lack of risk assessment procedures for selling investment products.",
+    "Customer due diligence was not refreshed for high-risk corporate clients.",
+    "Suitability assessments were missing for complex products sold to elderly customers.",
+    "Backup tapes for the core banking system are not tested.",
+    "Staff expense claims were approved without receipts.",
+    "Sanctions screening alerts were closed without review of the KYC file.",
+    "Expense claims by staff were approved without supporting receipts.",
+]
+TABLE = PolicyTable(
+    task_name="revise_policy_retrieval",
+    headers=["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Confidence", "Link or Reference"],
+    rows=[
+        PolicyRow(
+            source_name="SFC Code of Conduct",
+            section_clause="5.2",
+            key_excerpt="Recommendations must be suitable.",
+            relevance="Suitability",
+            confidence="High",
+            link_or_reference="https://www.sfc.hk/code.pdf",
+        )
+    ],
+)
+
+
+def test_plan_groups_observations_by_topic_then_similarity():
+    clusters = plan_batch(OBSERVATIONS + OBSERVATIONS[:1], load_topics(), threshold=0.5)
+
+    assert [(cluster.topic, cluster.observations) for cluster in clusters] == [
+        ("suitability", [OBSERVATIONS[0], OBSERVATIONS[2]]),
+        ("kyc_aml", [OBSERVATIONS[1], OBSERVATIONS[5]]),
+        ("business_continuity", [OBSERVATIONS[3]]),
+        (None, [OBSERVATIONS[4], OBSERVATIONS[6]]),
+    ]
+    assert clusters[0].query.startswith("Suitability and product risk assessment")
+    assert f"(2) {OBSERVATIONS[2]}" in clusters[0].query
+    assert clusters[2].query == OBSERVATIONS[3]
+
+
+def test_plural_observations_match_singular_keywords():
+    topics = load_topics()
+    clusters = plan_batch(
+        ["Sale of derivatives without documented review", "Customer disputes not logged", "Outsourcing vendors not reviewed"],
+        topics,
+    )
+
+    assert [cluster.topic for cluster in clusters] == ["suitability", "complaints", "business_continuity"]
+
+
+def test_batch_retrieves_once_per_topic(tmp_path, monkeypatch):
+    observations = tmp_path / "observations.txt"
+    observations.write_text("# weekly batch\n" + "\n".join(OBSERVATIONS[:4] + OBSERVATIONS[5:6]) + "\n\n")
+    monkeypatch.setattr(main, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(main, "find_warm_start", lambda observation: None)
+    monkeypatch.setattr(main.sys, "argv", ["batch", str(observations)])
+    runs = []
+
+    def run_crew(inputs, warm_start=None, pipeline=None):
+        run_id = f"run_{len(runs)}"
+        runs.append((inputs["audit_observation"], warm_start, pipeline))
+        run_dir = tmp_path / "output" / run_id
+        run_dir.mkdir(parents=True)
+        # The KYC group's shared retrieval finds nothing usable
+        if pipeline == RETRIEVAL_PIPELINE and "Customer due diligence" not in inputs["audit_observation"]:
+            (run_dir / "policy_retrieval_final.md").write_text(TABLE.to_markdown())
+        return run_id, "completed"
+
+    monkeypatch.setattr(main, "_run_crew", run_crew)
+    assert main.batch() == 0
+
+    assert [(observation[:20], pipeline) for observation, _, pipeline in runs] == [
+        ("Suitability and prod", RETRIEVAL_PIPELINE),
+        (OBSERVATIONS[0][:20], None),
+        (OBSERVATIONS[2][:20], None),
+        ("Customer due diligen", RETRIEVAL_PIPELINE),
+        (OBSERVATIONS[1][:20], None),
+        (OBSERVATIONS[5][:20], None),
+        (OBSERVATIONS[3][:20], None),
+    ]
+    shared = runs[1][1]
+    assert shared.mode == REUSE and shared.run_id == "run_0" and shared.table.rows == TABLE.rows
+    assert runs[2][1] is shared and all(warm_start is None for _, warm_start, _ in runs[4:])
+    report = json.loads(next((tmp_path / "output").glob("batch_*.json")).read_text())
+    assert report["observations"] == 5 and report["clusters"][0]["retrieval"] == {"run_id": "run_0", "status": "completed"}
+    assert [run["run_id"] for run in report["clusters"][0]["runs"]] == ["run_1", "run_2"]
+
+
+def test_failed_runs_are_reported_and_the_batch_goes_on(tmp_path):
+    attempts = []
+
+    def run_crew(inputs, warm_start=None, pipeline=None):
+        attempts.append(inputs["audit_observation"])
+        if pipeline == RETRIEVAL_PIPELINE or inputs["audit_observation"] == OBSERVATIONS[0]:
+            raise RuntimeError("LLM provider unavailable")
+        if inputs["audit_observation"] == OBSERVATIONS[3]:
+            raise KeyboardInterrupt
+        return f"run_{len(attempts)}", "completed"
+
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(OBSERVATIONS[:4], run_crew, tmp_path, warm_start=lambda observation: None)
+
+    assert len(attempts) == 5
+    report = json.loads(next(tmp_path.glob("batch_*.json")).read_text())
+    suitability, kyc, continuity = report["clusters"]
+    assert suitability["retrieval"] == {"run_id": None, "status": FAILED, "error": "RuntimeError: LLM provider unavailable"}
+    assert [run["status"] for run in suitability["runs"]] == [FAILED, "completed"]
+    assert kyc["runs"][0]["run_id"] == "run_4" and continuity["runs"] == []
+
+
+def test_crew_reuses_a_shared_final_table(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from crewai import Task
+    from crewai.tasks.task_output import TaskOutput
+
+    from internal_audit_validation_system.crew import InternalAuditValidationSystemCrew
+
+    contexts = {}
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        contexts[self.name] = context
+        self.output = TaskOutput(description=self.description, raw=f"{self.name} output", agent=agent.role, name=self.name)
+        return self.output
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Task, "execute_sync", execute_sync)
+    shared = WarmStart(REUSE, "20240101_090000", Cluster("suitability", "Suitability", OBSERVATIONS[:2]).query, 1.0, TABLE)
+    built = InternalAuditValidationSystemCrew(timestamp="20240201_090000", warm_start=shared).crew()
+    built._rpm_controller.stop_rpm_counter()
+
+    assert [task.name for task in built.tasks] == [
+        "revise_policy_retrieval",
+        "analyze_compliance_status",
+        "prepare_peer_review_package",
+        "reflection_of_compliance_status",
+        "review_compliance_analysis",
+    ]
+    built._execute_tasks(built.tasks)
+    assert "revise_policy_retrieval" not in contexts
+    assert "https://www.sfc.hk/code.pdf" in contexts["analyze_compliance_status"]
+    final = tmp_path / "output" / "20240201_090000" / "policy_retrieval_final.md"
+    assert "SFC Code of Conduct" in final.read_text()
+
+    retrieval = InternalAuditValidationSystemCrew(pipeline=RETRIEVAL_PIPELINE).crew()
+    retrieval._rpm_controller.stop_rpm_counter()
+    assert [task.name for task in retrieval.tasks][-1] == "revise_policy_retrieval"
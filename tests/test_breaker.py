@@ -0,0 +1,107 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from internal_audit_validation_system.documents.store import default_store
+from internal_audit_validation_system.tools.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BreakerPolicy,
+    CircuitBreaker,
+    HostUnavailable,
+    default_breaker,
+)
+from internal_audit_validation_system.tools.custom_tool import PDFDownloadTool
+from internal_audit_validation_system.tools.http import fetch
+from internal_audit_validation_system.tools.memo import start_run
+
+URL = "https://www.sfc.hk/en/Rules-and-standards/Codes-and-guidelines"
+
+
+@pytest.fixture
+def failing_site():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    start_run()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+def test_circuit_opens_probes_and_closes(tmp_path):
+    breaker = CircuitBreaker(tmp_path / "breaker.sqlite3", BreakerPolicy(failure_threshold=2, cooldown_seconds=0.2))
+
+    breaker.record_failure(URL, "Read timed out")
+    breaker.before(URL)
+    breaker.record_failure(URL, "Read timed out")
+    with pytest.raises(HostUnavailable, match="www.sfc.hk is unavailable after 2 failed request.*Read timed out"):
+        breaker.before(URL)
+
+    # Another run on the same machine sees the open circuit
+    other_run = CircuitBreaker(tmp_path / "breaker.sqlite3", breaker.policy)
+    assert other_run.state(URL).state == OPEN
+
+    time.sleep(0.25)
+    breaker.before(URL)  # admitted as the half-open probe
+    assert breaker.state(URL).state == HALF_OPEN
+    with pytest.raises(HostUnavailable):
+        other_run.before(URL)  # only one probe at a time
+
+    breaker.record_failure(URL, "HTTP 503")
+    assert breaker.state(URL).state == OPEN
+    time.sleep(0.25)
+    breaker.before(URL)
+    breaker.record_status(URL, 404)  # the host answered, so it is up
+    assert breaker.state(URL).state == CLOSED
+    assert breaker.open_hosts() == []
+
+
+def test_failures_outside_the_window_do_not_add_up(tmp_path):
+    breaker = CircuitBreaker(tmp_path / "breaker.sqlite3", BreakerPolicy(failure_threshold=2, failure_window_seconds=0.1))
+
+    breaker.record_failure(URL)
+    time.sleep(0.15)
+    breaker.record_failure(URL)
+
+    assert breaker.state(URL).state == CLOSED
+    assert breaker.state(URL).failures == 1
+
+
+def test_tools_fail_fast_while_a_host_is_down(failing_site):
+    base, hits = failing_site
+    tool = PDFDownloadTool()
+
+    for _ in range(3):
+        assert "503" in tool.run(pdf_url=f"{base}/code.pdf")
+    assert len(hits) == 3
+
+    message = tool.run(pdf_url=f"{base}/other.pdf")
+    assert message.startswith(f"Error downloading PDF from {base}/other.pdf: 127.0.0.1 is unavailable")
+    assert len(hits) == 3
+
+
+def test_stale_stored_copy_is_served_while_the_circuit_is_open(failing_site, monkeypatch):
+    base, hits = failing_site
+    url = f"{base}/circular"
+    default_store().put(url, b"<p>Stored circular</p>", {"Content-Type": "text/html"})
+    monkeypatch.setenv("AUDIT_DOCUMENT_MAX_AGE_DAYS", "0")
+    for _ in range(3):
+        default_breaker().record_failure(url, "Connection refused")
+
+    assert fetch(url).text == "<p>Stored circular</p>"
+    assert hits == []
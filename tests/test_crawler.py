@@ -0,0 +1,120 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from internal_audit_validation_system.documents.crawler import CrawlConfig, Crawler
+from internal_audit_validation_system.documents.store import DocumentStore
+from internal_audit_validation_system.tools.http import fetch
+from internal_audit_validation_system.tools.memo import start_run
+
+PDF_BODY = b"%PDF-1.4\n% Guideline on Anti-Money Laundering\n%%EOF\n"
+
+
+@pytest.fixture
+def regulator_site():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            base = f"http://127.0.0.1:{self.server.server_address[1]}"
+            pages = {
+                "/robots.txt": (b"User-agent: *\nDisallow: /private/\n", "text/plain"),
+                "/guidelines/": (
+                    b'<html><body><a href="/docs/aml.pdf">AML</a> <a href="/docs/conduct.pdf#p2">Conduct</a>'
+                    b' <a href="/private/draft.pdf">Draft</a> <a href="https://elsewhere.test/x.pdf">X</a></body></html>',
+                    "text/html; charset=utf-8",
+                ),
+                "/sitemap.xml": (
+                    f"<urlset><url><loc>{base}/docs/circular.pdf</loc></url></urlset>".encode(),
+                    "application/xml",
+                ),
+                "/docs/aml.pdf": (PDF_BODY, "application/pdf"),
+                "/docs/conduct.pdf": (PDF_BODY + b"conduct", "application/pdf"),
+                "/docs/circular.pdf": (PDF_BODY + b"circular", "application/pdf"),
+                "/private/draft.pdf": (PDF_BODY, "application/pdf"),
+            }
+            if self.path not in pages:
+                self.send_error(404)
+                return
+            body, content_type = pages[self.path]
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUDIT_DOCUMENT_STORE", str(tmp_path / "documents"))
+    return DocumentStore(tmp_path / "documents")
+
+
+def _config(base_url):
+    return CrawlConfig(
+        seeds=[f"{base_url}/guidelines/"],
+        sitemaps=[f"{base_url}/sitemap.xml"],
+        allowed_hosts=["127.0.0.1"],
+        include_patterns=[r"\.pdf$"],
+        max_depth=1,
+        max_workers=3,
+        host_delay_seconds=0,
+        timeout=5,
+    )
+
+
+def test_crawl_stores_in_scope_documents_and_respects_robots(regulator_site, store):
+    base_url, _ = regulator_site
+
+    report = Crawler(_config(base_url), store).run()
+
+    assert set(store.urls()) == {
+        f"{base_url}/guidelines/",
+        f"{base_url}/sitemap.xml",
+        f"{base_url}/docs/aml.pdf",
+        f"{base_url}/docs/conduct.pdf",
+        f"{base_url}/docs/circular.pdf",
+    }
+    assert report.disallowed == [f"{base_url}/private/draft.pdf"]
+    assert store.get(f"{base_url}/docs/aml.pdf").content == PDF_BODY
+
+
+def test_recrawl_revalidates_instead_of_downloading(regulator_site, store):
+    base_url, hits = regulator_site
+    Crawler(_config(base_url), store).run()
+
+    report = Crawler(_config(base_url), store).run()
+
+    assert report.fetched == []
+    assert len(report.not_modified) == 5
+
+
+def test_fetch_serves_prefetched_documents_without_network(regulator_site, store):
+    base_url, hits = regulator_site
+    Crawler(_config(base_url), store).run()
+    hits.clear()
+    start_run()
+
+    response = fetch(f"{base_url}/docs/aml.pdf")
+
+    assert response.content == PDF_BODY
+    assert response.headers["Content-Type"] == "application/pdf"
+    assert hits == []
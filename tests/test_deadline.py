@@ -0,0 +1,117 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from internal_audit_validation_system.deadline import (
+    MIN_CALL_TIMEOUT,
+    Deadline,
+    DeadlineExceeded,
+    call_timeout,
+    run_deadline_seconds,
+    start_deadline,
+)
+from internal_audit_validation_system.tools.http import HedgePolicy, fetch
+from internal_audit_validation_system.tools.memo import start_run
+
+
+@pytest.fixture(autouse=True)
+def no_deadline():
+    start_deadline(None)
+    yield
+    start_deadline(None)
+
+
+@pytest.fixture
+def first_request_stalls():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if len(hits) == 1:
+                time.sleep(2.0)
+            body = f"<p>{len(hits)}</p>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    start_run()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+def test_call_timeouts_are_capped_by_the_remaining_budget(monkeypatch):
+    assert call_timeout(30) == 30
+
+    start_deadline(10)
+    assert 9 < call_timeout(30) <= 10
+    assert call_timeout(5) == 5
+
+    deadline = Deadline(10, started_at=time.monotonic() - 9.9)
+    assert deadline.timeout(30) == MIN_CALL_TIMEOUT
+
+    monkeypatch.setenv("AUDIT_RUN_DEADLINE_SECONDS", "none")
+    assert run_deadline_seconds() is None
+
+
+def test_expired_deadline_refuses_new_calls():
+    start_deadline(0)
+
+    with pytest.raises(DeadlineExceeded):
+        call_timeout(30, "GET https://example.invalid/")
+    with pytest.raises(TimeoutError, match="GET https://example.invalid/"):
+        fetch("https://example.invalid/")
+
+
+def test_hedged_fetch_answers_from_the_duplicate_request(first_request_stalls, monkeypatch):
+    base, hits = first_request_stalls
+    monkeypatch.setenv("AUDIT_HEDGE_AFTER_SECONDS", "0.2")
+    monkeypatch.setenv("AUDIT_HEDGE_HOSTS", "127.0.0.1")
+
+    started = time.perf_counter()
+    response = fetch(f"{base}/circular")
+    elapsed = time.perf_counter() - started
+
+    assert response.text == "<p>2</p>"
+    assert elapsed < 1.5
+    assert hits == ["/circular", "/circular"]
+
+
+def test_hedge_policy_hosts():
+    policy = HedgePolicy(after_seconds=1.0, hosts=frozenset({"sfc.hk"}))
+
+    assert policy.applies("https://www.sfc.hk/en/Rules")
+    assert not policy.applies("https://www.hkma.gov.hk/")
+    assert not HedgePolicy().applies("https://www.sfc.hk/")
+
+
+def test_llm_requests_get_the_remaining_budget():
+    pytest.importorskip("crewai")
+    from internal_audit_validation_system.crew import DeadlineLLM
+
+    llm = DeadlineLLM(model="gpt-4o-mini", timeout=120)
+    messages = [{"role": "user", "content": "hi"}]
+    assert llm._prepare_completion_params(messages)["timeout"] == 120
+
+    start_deadline(20)
+    assert llm._prepare_completion_params(messages)["timeout"] <= 20
+
+    retrying = DeadlineLLM(model="gpt-4o-mini", timeout=60, max_retries=5)
+    start_deadline(None)
+    assert retrying._prepare_completion_params(messages)["max_retries"] == 5
+    start_deadline(200)
+    # Three 60-second attempts fit in the remaining 200 seconds
+    assert retrying._prepare_completion_params(messages)["max_retries"] == 2
+    start_deadline(45)
+    params = retrying._prepare_completion_params(messages)
+    assert params["max_retries"] == 0 and params["timeout"] <= 45
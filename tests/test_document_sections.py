@@ -0,0 +1,72 @@
+import io
+
+from internal_audit_validation_system.documents.sections import SectionIndex
+from internal_audit_validation_system.documents.store import default_store
+from internal_audit_validation_system.tools.custom_tool import DocumentSectionTool
+from internal_audit_validation_system.tools.memo import start_run
+
+PAGES = [
+    (1, "Code of Conduct\nChapter 5 Know your client\n5.1 Know your client: in general\nA licensed person should take all reasonable steps."),
+    (2, "5.1.3 Investor characterisation\nClients should be assessed before products are recommended.\n5.2 Suitability\nThe recommendation should be reasonably suitable."),
+    (3, "Chapter 6 Client agreement\n6.1 Written agreement\nA client agreement should be entered into."),
+]
+
+
+def test_index_detects_clauses_with_page_spans():
+    index = SectionIndex(PAGES)
+
+    assert [section.number for section in index.sections] == ["Chapter 5", "5.1", "5.1.3", "5.2", "Chapter 6", "6.1"]
+    clause = index.find("Paragraph 5.1")
+    assert (clause.page_start, clause.page_end) == (1, 2)
+    assert "5.1.3 Investor characterisation" in index.section_text(clause)
+    assert "5.2 Suitability" not in index.section_text(clause)
+
+
+def test_dates_amounts_and_numbered_sentences_are_not_headings():
+    body = "5.1 Know your client\nEffective from\n3 April 2020\nthe threshold is\n100 HKD minimum\nper order, and\n12 The client must\nsign the form.\n"
+    index = SectionIndex([(1, "5 Clients\n" + body + "6 Agreements\n6.1 Written agreement\nSign it.")])
+
+    assert [section.number for section in index.sections] == ["5", "5.1", "6", "6.1"]
+    clause = index.section_text(index.find("5.1"))
+    assert clause.endswith("sign the form.") and "100 HKD minimum" in clause
+    restarted = SectionIndex([(1, "Chapter 2 Scope\n1 Introduction\nText.\n2 Definitions\nText.")])
+    assert [section.number for section in restarted.sections] == ["Chapter 2", "1", "2"]
+
+
+def test_find_by_title_and_page_range():
+    index = SectionIndex(PAGES)
+
+    assert index.find("suitability").number == "5.2"
+    assert index.find("chapter 6").page_start == 3
+    assert index.find("9.9") is None
+    assert index.page_range(2, 3).startswith("--- Page 2 ---\n5.1.3 Investor")
+
+
+def _pdf() -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for _, text in PAGES:
+        for offset, line in enumerate(text.split("\n")):
+            pdf.drawString(72, 720 - 16 * offset, line)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_tool_returns_single_clause_from_stored_pdf():
+    url = "https://www.sfc.hk/code-of-conduct.pdf"
+    default_store().put(url, _pdf(), {"Content-Type": "application/pdf"})
+    start_run()
+    tool = DocumentSectionTool()
+
+    toc = tool._run(pdf_url=url)
+    clause = tool._run(pdf_url=url, section="5.1.3")
+    pages = tool._run(pdf_url=url, pages="3")
+
+    assert "5.1.3 Investor characterisation (pages 2-2)" in toc
+    assert clause.startswith("[5.1.3 Investor characterisation, pages 2-2]")
+    assert "Suitability" not in clause
+    assert pages.startswith("--- Page 3 ---") and "Written agreement" in pages
+    assert tool._run(pdf_url=url, pages="x").startswith("Error")
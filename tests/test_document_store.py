@@ -0,0 +1,119 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from internal_audit_validation_system.documents.store import DocumentStore, RetentionPolicy, default_store
+from internal_audit_validation_system.tools.http import fetch
+from internal_audit_validation_system.tools.memo import start_run
+
+GUIDELINE = b"Guideline on Anti-Money Laundering and Counter-Financing of Terrorism. " * 200
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(tmp_path / "store")
+
+
+def test_identical_versions_are_stored_once_and_compressed(store):
+    store.put("https://www.sfc.hk/aml.pdf", GUIDELINE, {"Content-Type": "application/pdf"})
+    store.put("https://www.sfc.hk/aml.pdf", GUIDELINE, {"Content-Type": "application/pdf"})
+    store.put("https://www.sfc.hk/mirror/aml.pdf", GUIDELINE, {"Content-Type": "application/pdf"})
+
+    stats = store.stats()
+    assert stats["urls"] == 2
+    assert stats["blobs"] == 1
+    assert stats["stored_bytes"] < stats["raw_bytes"] / 10
+    assert store.get("https://www.sfc.hk/mirror/aml.pdf").content == GUIDELINE
+
+
+def test_new_content_adds_a_version(store):
+    url = "https://www.hkma.gov.hk/spm/ic-1.pdf"
+    store.put(url, b"version 1")
+    store.put(url, b"version 2")
+
+    versions = store.versions(url)
+    assert len(versions) == 2
+    assert store.get(url).content == b"version 2"
+    assert store.get_version(versions[1].sha256) == b"version 1"
+
+
+def test_prune_keeps_current_and_recent_versions(store):
+    url = "https://www.hkma.gov.hk/spm/cg-1.pdf"
+    for number in range(5):
+        store.put(url, f"version {number}".encode(), fetched_at=time.time() + number)
+
+    removed = store.prune(RetentionPolicy(keep_versions=1, max_version_age_days=None))
+
+    assert removed == {"versions_removed": 3, "blobs_removed": 3}
+    assert [store.get_version(v.sha256) for v in store.versions(url)] == [b"version 4", b"version 3"]
+
+
+def test_prune_waits_for_a_put_reusing_an_expiring_blob(store, monkeypatch):
+    url = "https://www.sfc.hk/circular.pdf"
+    store.put(url, b"version 1")
+    store.put(url, b"version 2")
+    write_blob, pruner = store._write_blob, None
+
+    def write_then_prune(sha256, content, compressed=None):
+        nonlocal pruner
+        # Version 1's blob is still on disk, and its superseded version is about to expire
+        stored_size = write_blob(sha256, content, compressed)
+        pruner = threading.Thread(target=store.prune, args=(RetentionPolicy(keep_versions=0, max_version_age_days=None),))
+        pruner.start()
+        pruner.join(0.3)
+        assert pruner.is_alive()
+        return stored_size
+
+    monkeypatch.setattr(store, "_write_blob", write_then_prune)
+    store.put(url, b"version 1")
+    pruner.join()
+
+    assert store.get(url).content == b"version 1"
+    assert [version.sha256 for version in store.versions(url)] == [store.get(url).sha256]
+
+
+@pytest.fixture
+def regulator_site():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(GUIDELINE)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(GUIDELINE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+def test_fetch_writes_through_and_revalidates_stale_copies(regulator_site, monkeypatch):
+    base_url, hits = regulator_site
+    url = f"{base_url}/guideline.pdf"
+
+    start_run()
+    assert fetch(url).content == GUIDELINE
+    start_run()
+    assert fetch(url).content == GUIDELINE
+    assert hits == [None]
+
+    monkeypatch.setenv("AUDIT_DOCUMENT_MAX_AGE_DAYS", "0")
+    start_run()
+    assert fetch(url).content == GUIDELINE
+    assert hits == [None, '"v1"']
+    assert default_store().stats()["blobs"] == 1
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+
+from internal_audit_validation_system.early_stop import EarlyStopMonitor, StopPolicy, early_stop_stats, load_stop_policies
+from internal_audit_validation_system.policy_table import PolicyRow, PolicyTable
+from internal_audit_validation_system.tools.memo import start_run
+
+HEADERS = [
+    "Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation",
+    "Document Path / URL", "Effective Date", "Confidence", "Link or Reference",
+]
+
+
+def _table(rows):
+    return PolicyTable(headers=HEADERS, rows=rows)
+
+
+def _row(number, confidence="High", url="https://www.hkma.gov.hk/spm/sb-1.pdf", source="HKMA SPM SB-1"):
+    return PolicyRow(
+        source_name=source,
+        section_clause=f"3.{number}",
+        key_excerpt=f"Authorized institutions should assess product risk {number}.",
+        relevance="Risk assessment",
+        document_url=url,
+        effective_date="2023-01-01",
+        confidence=confidence,
+        link_or_reference="N/A",
+    )
+
+
+class FakeExecutor:
+    def __init__(self, max_iter=25):
+        self.max_iter = max_iter
+        self.iterations = 0
+
+
+def _step(thought, tool="Search the internet"):
+    return SimpleNamespace(thought=thought, tool=tool, tool_input="{}", text=thought)
+
+
+def test_policy_lists_unmet_criteria():
+    policy = load_stop_policies()["retrieve_hkma_policies"]
+
+    assert policy.unmet(None) == ["no findings table"]
+    assert policy.unmet(_table([_row(1), _row(2), _row(3), _row(4)])) == []
+    sparse = _table([_row(1, "Med"), _row(2, "Low", url="N/A", source="Internal policy"), _row(3, "High", url="https://x.com")])
+    assert policy.unmet(sparse) == ["3 of 4 rows", "rows without a URL or path: 2", "1 of 2 rows with High confidence"]
+    assert StopPolicy(min_rows=1, regulators=("SFC",)).unmet(_table([_row(1)])) == ["no SFC source"]
+    broken_link = _table([PolicyRow(**{**_row(1).__dict__, "link_or_reference": "see above"})])
+    assert StopPolicy(min_rows=1).unmet(broken_link)[0].startswith("link_column_format")
+    with pytest.raises(ValueError, match="min_confidence"):
+        StopPolicy(min_confidence="Certain")
+
+
+def test_monitor_ends_the_loop_once_the_findings_suffice():
+    executor, seen, tokens = FakeExecutor(), [], iter(range(0, 100000, 1000))
+    monitor = EarlyStopMonitor(
+        "retrieve_hkma_policies", StopPolicy(min_rows=2, regulators=("HKMA",), confident_rows=2),
+        executor, tokens=lambda: next(tokens), then=seen.append,
+    )
+
+    steps = [
+        _step("I should search the HKMA site first."),
+        SimpleNamespace(result="search results", result_as_answer=False),
+        _step("Findings so far:\n" + _table([_row(1), _row(2, "Low")]).to_markdown()),
+        _step("Findings so far:\n" + _table([_row(1), _row(2), _row(3, "Med")]).to_markdown()),
+    ]
+    for step in steps:
+        monitor(step)
+        executor.iterations += hasattr(step, "tool")
+        if executor.iterations == 2:
+            assert monitor.unmet == ["1 of 2 rows with High confidence"] and executor.max_iter == 25
+
+    assert seen == steps
+    assert executor.max_iter == 3
+    assert early_stop_stats()["retrieve_hkma_policies"] == {
+        "task_name": "retrieve_hkma_policies",
+        "max_iter": 25,
+        "iterations": 3,
+        "stopped_early": True,
+        "rows": 3,
+        "iterations_saved": 21,
+        "tokens_saved_estimate": 21 * 1000,
+    }
+
+    # The next run of a batch reports only the tasks it monitored itself
+    start_run()
+    assert early_stop_stats() == {}
+    EarlyStopMonitor("retrieve_sfc_policies", StopPolicy(), FakeExecutor(10))
+    assert list(early_stop_stats()) == ["retrieve_sfc_policies"]
+
+
+def test_retrieval_agents_get_the_monitor(monkeypatch):
+    pytest.importorskip("crewai")
+    from internal_audit_validation_system.crew import EarlyStopAgent, InternalAuditValidationSystemCrew
+
+    crew = InternalAuditValidationSystemCrew()
+    task = crew.retrieve_sfc_policies()
+    assert isinstance(task.agent, EarlyStopAgent)
+    assert "findings table so far" in task.description
+
+    task.agent.create_agent_executor(task=task)
+    monitor = task.agent.agent_executor.step_callback
+    assert isinstance(monitor, EarlyStopMonitor) and monitor.policy.regulators == ("SFC",)
+
+    monkeypatch.setenv("AUDIT_EARLY_STOP", "off")
+    unmonitored = InternalAuditValidationSystemCrew().retrieve_sfc_policies()
+    unmonitored.agent.create_agent_executor(task=unmonitored)
+    assert unmonitored.agent.agent_executor.step_callback is None
+    assert "findings table so far" not in unmonitored.description
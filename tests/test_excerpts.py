@@ -0,0 +1,109 @@
+import time
+
+from internal_audit_validation_system.documents.excerpts import (
+    APPROXIMATE,
+    EXACT,
+    MISMATCH,
+    UNINDEXED,
+    UNVERIFIABLE,
+    DocumentGrams,
+    ExcerptIndex,
+    match_excerpt,
+)
+from internal_audit_validation_system.documents.store import default_store
+from internal_audit_validation_system.evaluation.criteria import retrieve_policies_checks, run_checks
+
+CODE_PAGE = b"""<html><head><style>p { color: red; }</style><script>var x = "suitable";</script></head>
+<body><h1>Code of Conduct</h1>
+<p>5.2 Know your client: reasonable advice. Having regard to information about the client of which the
+licensed or registered person is or should be aware through the exercise of due diligence, the licensed or
+registered person should, when making a recommendation or solicitation, ensure the suitability of the
+recommendation or solicitation for that client is reasonable in all the circumstances.</p>
+""" + b"<p>Filler paragraph about unrelated record keeping obligations.</p>" * 2000 + b"</body></html>"
+
+TABLE = """| Source Name | Section / Clause | Key Excerpt | Relevance to Observation | Link or Reference |
+|---|---|---|---|---|
+| SFC Code of Conduct | 5.2 | "ensure the suitability of the recommendation or solicitation for that client is reasonable" | Suitability | https://www.sfc.hk/code.html |
+| SFC Code of Conduct | 5.2 | {excerpt} | Suitability | http://sfc.hk/code.html/ |
+| HKMA SPM | 3.1 | Banks should assess product risk. | Risk | https://www.hkma.gov.hk/not-fetched.pdf |
+
+### Top Three Critical Requirements
+- Suitability (SFC)
+- Due diligence (SFC)
+- Product risk (HKMA)
+"""
+
+EXCERPT_CHECKS = [check for check in retrieve_policies_checks if check.id == "excerpt_verification"]
+
+
+def _index():
+    store = default_store()
+    store.put("https://www.sfc.hk/code.html", CODE_PAGE, {"Content-Type": "text/html; charset=utf-8"})
+    return ExcerptIndex.from_store(store, ["http://www.sfc.hk/code.html", "https://www.hkma.gov.hk/missing.pdf"])
+
+
+def test_exact_and_approximate_matches_across_url_variants():
+    index = _index()
+
+    assert len(index) == 1
+    exact = index.verify("https://sfc.hk/code.html/", "Ensure the suitability of the recommendation — or solicitation!")
+    assert exact.status == EXACT
+    elided = index.verify(
+        "https://www.sfc.hk/code.html",
+        "the licensed or registered person should ... ensure the suitability of the recommendation for that client",
+    )
+    assert elided.status == APPROXIMATE
+    assert "ensure the suitability" in elided.source_text
+
+
+def test_invented_excerpts_and_unfetched_sources():
+    index = _index()
+
+    assert index.verify("https://www.sfc.hk/code.html", "Intermediaries must record all telephone orders.").status == MISMATCH
+    # Script and style content is not part of the indexed text
+    assert index.verify("https://www.sfc.hk/code.html", 'var x = "suitable"').status == MISMATCH
+    assert index.verify("https://www.hkma.gov.hk/missing.pdf", "Anything.").status == UNINDEXED
+
+
+def test_check_reports_mismatched_rows_quickly():
+    _index()
+    passing = TABLE.format(excerpt="through the exercise of due diligence")
+    failing = TABLE.format(excerpt="Licensed persons must never sell complex products.")
+
+    started = time.perf_counter()
+    ok = run_checks("retrieve_relevant_policies", passing, EXCERPT_CHECKS)
+    elapsed = time.perf_counter() - started
+    bad = run_checks("retrieve_relevant_policies", failing, EXCERPT_CHECKS)
+
+    assert ok.passed == ["excerpt_verification"]
+    assert elapsed < 1.0
+    (check_id, notes), = bad.failed
+    assert check_id == "excerpt_verification"
+    assert "Row 2" in notes and "Row 3" not in notes
+
+
+def test_unreadable_source_makes_only_its_rows_unverifiable():
+    store = default_store()
+    store.put("https://www.hkma.gov.hk/not-fetched.pdf", b"%PDF-1.4 truncated", {"Content-Type": "application/pdf"})
+    _index()
+    failing = TABLE.format(excerpt="Licensed persons must never sell complex products.")
+
+    index = ExcerptIndex.from_store(store, ["https://www.sfc.hk/code.html", "https://www.hkma.gov.hk/not-fetched.pdf"])
+    unreadable = index.verify("https://www.hkma.gov.hk/not-fetched.pdf", "Banks should assess product risk.")
+    assert unreadable.status == UNVERIFIABLE and "EOF" in unreadable.note
+    assert index.verify("https://www.sfc.hk/code.html", "ensure the suitability of the recommendation").status == EXACT
+    (check_id, notes), = run_checks("retrieve_relevant_policies", failing, EXCERPT_CHECKS).failed
+    assert "Row 2: excerpt not found" in notes and "Row 3: unverifiable" in notes
+    passing = run_checks("retrieve_relevant_policies", TABLE.format(excerpt="exercise of due diligence"), EXCERPT_CHECKS)
+    assert passing.passed == ["excerpt_verification"]
+
+
+def test_repetitive_sources_and_excerpts_match_in_linear_time():
+    grams = DocumentGrams("the bank shall " * 50000 + "promptly notify the authority")
+    excerpt = "the bank shall " * 200 + "promptly notify authority"
+
+    started = time.perf_counter()
+    match = match_excerpt(excerpt, grams)
+
+    assert time.perf_counter() - started < 1.0
+    assert match.status == APPROXIMATE
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from internal_audit_validation_system.tools.custom_tool import FetchDocumentTool, PDFDownloadTool, SecureWebScraperTool
+from internal_audit_validation_system.tools.http import BINARY, HTML, PDF, TEXT, sniff
+from internal_audit_validation_system.tools.memo import start_run
+
+
+def _pdf() -> bytes:
+    import io
+
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    pdf.drawString(72, 720, "Circular on the suitability obligations")
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def mislabelled_site():
+    hits = []
+    routes = {
+        # PDF served by a download endpoint as HTML, without a .pdf extension
+        "/download?id=42": (_pdf(), "text/html"),
+        "/missing.pdf": (b"<!DOCTYPE html><html><body><p>Page not found</p></body></html>", "application/pdf"),
+        "/notes": (b"Plain text notice.\nSecond line.", "text/plain"),
+        "/logo": (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + bytes(64), "image/png"),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body, content_type = routes[self.path]
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    start_run()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+def test_sniff_prefers_content_over_headers():
+    assert sniff(b"%PDF-1.7\n%\xe2\xe3", "text/html") == PDF
+    assert sniff(b"\xef\xbb\xbf\n<!DOCTYPE html><html>", "application/pdf") == HTML
+    assert sniff(b"", "text/html; charset=utf-8") == HTML
+    assert sniff(b"Section 5.2", "") == TEXT
+    assert sniff(b"\x89PNG\r\n\x1a\n\x00\x00", "application/octet-stream") == BINARY
+
+
+def test_one_tool_routes_by_content_in_one_download(mislabelled_site):
+    base, hits = mislabelled_site
+    tool = FetchDocumentTool()
+
+    assert "suitability obligations" in tool.run(url=f"{base}/download?id=42")
+    assert tool.run(url=f"{base}/notes") == "Plain text notice.\nSecond line."
+    assert tool.run(url=f"{base}/logo").startswith(f"Error: {base}/logo returned 80 bytes of binary content")
+    assert asyncio.run(tool.arun(url=f"{base}/missing.pdf")) == "Page not found"
+
+    # The scraper and PDF tool reuse the run's download and no longer reject or garble mislabelled PDFs
+    assert "suitability obligations" in SecureWebScraperTool().run(website_url=f"{base}/download?id=42")
+    assert "suitability obligations" in PDFDownloadTool().run(pdf_url=f"{base}/download?id=42")
+    assert PDFDownloadTool().run(pdf_url=f"{base}/missing.pdf").startswith(
+        "Error: The URL does not appear to point to a PDF document (html content)"
+    )
+    assert sorted(hits) == sorted(["/download?id=42", "/notes", "/logo", "/missing.pdf"])
+
+
+def test_missing_requests_is_reported_by_the_tools(monkeypatch):
+    from internal_audit_validation_system.tools import http
+
+    def missing():
+        raise ImportError("No module named 'requests'")
+
+    monkeypatch.setattr(http, "_requests", missing)
+    start_run()
+
+    assert "No module named 'requests'" in FetchDocumentTool()._run(url="http://127.0.0.1:9/policy")
+    assert "No module named 'requests'" in PDFDownloadTool()._run(pdf_url="http://127.0.0.1:9/policy.pdf")
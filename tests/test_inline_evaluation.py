@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from internal_audit_validation_system.evaluation.inline import (
+    ABORT,
+    RETRY,
+    EvaluationAborted,
+    InlineEvaluator,
+    InlinePolicy,
+    load_policies,
+)
+
+GOOD_TABLE = """| Source Name | Section / Clause | Key Excerpt | Relevance to Observation | Link or Reference |
+|-------------|-----------------|-------------|--------------------------|-------------------|
+| HKMA Guideline | 1.1 | Enforces risk controls. | Demonstrates regulatory requirement. | N/A |
+| SFC Code of Conduct | 5.2 | Know your client. | Suitability obligation. | N/A |
+
+### Top Three Critical Requirements
+- Maintain documented risk assessments.
+- Perform periodic reviews.
+- Evidence compliance to HKMA and SFC.
+"""
+
+BROKEN_TABLE = """| Source | Clause | Excerpt |
+|--------|--------|---------|
+| HKMA | 1.1 | Something. |
+"""
+
+
+def _evaluator(tmp_path, policy):
+    return InlineEvaluator(
+        audit_observation="No risk assessment for investment clients",
+        policies={"retrieve_relevant_policies": policy},
+        report_path=tmp_path / "evaluation_partial.json",
+    )
+
+
+def test_guardrail_passes_structurally_valid_output(tmp_path):
+    evaluator = _evaluator(tmp_path, InlinePolicy(on_failure=ABORT, blocking_checks=("table_present",)))
+    guardrail = evaluator.guardrail_for("retrieve_relevant_policies")
+
+    ok, result = guardrail(SimpleNamespace(raw=GOOD_TABLE))
+
+    assert ok and result == GOOD_TABLE
+    report = json.loads((tmp_path / "evaluation_partial.json").read_text())
+    assert report["status"] == "running"
+    assert report["task_results"][0]["score"] == 1.0
+
+
+def test_guardrail_retries_then_aborts_on_broken_table(tmp_path):
+    evaluator = _evaluator(tmp_path, InlinePolicy(on_failure=RETRY, max_retries=1, blocking_checks=("table_present",)))
+    guardrail = evaluator.guardrail_for("retrieve_relevant_policies")
+
+    ok, feedback = guardrail(SimpleNamespace(raw=BROKEN_TABLE))
+    assert not ok
+    assert "table_present" in feedback
+
+    with pytest.raises(EvaluationAborted) as excinfo:
+        guardrail(SimpleNamespace(raw=BROKEN_TABLE))
+    assert excinfo.value.evaluation.task_name == "retrieve_relevant_policies"
+    report = json.loads((tmp_path / "evaluation_partial.json").read_text())
+    assert report["status"] == "aborted"
+    assert report["task_results"][0]["attempts"] == 2
+
+
+def test_non_blocking_failures_do_not_stop_the_run(tmp_path):
+    evaluator = _evaluator(tmp_path, InlinePolicy(on_failure=ABORT, blocking_checks=("table_present",)))
+    output = GOOD_TABLE.replace("### Top Three Critical Requirements", "Notes")
+
+    ok, _ = evaluator.guardrail_for("retrieve_relevant_policies")(SimpleNamespace(raw=output))
+
+    assert ok
+    assert any(check_id == "critical_requirements" for check_id, _ in evaluator.results["retrieve_relevant_policies"].failed)
+
+
+def test_default_policies_load_and_validate():
+    policies = load_policies()
+    assert policies["retrieve_relevant_policies"].on_failure == ABORT
+    with pytest.raises(ValueError):
+        InlinePolicy(on_failure="explode")
@@ -0,0 +1,49 @@
+from internal_audit_validation_system.tools.custom_tool import MarkdownToPDFTool
+from internal_audit_validation_system.tools.pdf_tables import DeferredTable, build_table_flowables
+
+
+def _policy_markdown(rows: int) -> str:
+    header = (
+        "| Source Name | Section / Clause | Key Excerpt | Relevance to Observation | Link or Reference |\n"
+        "|-------------|-----------------|-------------|--------------------------|-------------------|\n"
+    )
+    body = "".join(
+        f"| HKMA Guideline {i} | {i}.1 | Enforces risk controls. | Demonstrates requirement. | N/A |\n"
+        for i in range(rows)
+    )
+    return "# Policy Retrieval\n\n" + header + body
+
+
+def test_build_table_flowables_chunks_rows_with_header():
+    table_data = [["Source Name", "Key Excerpt"]] + [[f"Source {i}", "Excerpt"] for i in range(45)]
+    flowables = build_table_flowables(table_data, None, [100, 100], str, rows_per_table=20)
+    assert len(flowables) == 3
+    assert all(isinstance(item, DeferredTable) for item in flowables)
+
+
+def test_markdown_to_pdf_renders_large_table_in_chunks(tmp_path):
+    md_path = tmp_path / "policy_retrieval_final.md"
+    md_path.write_text(_policy_markdown(45), encoding="utf-8")
+
+    result = MarkdownToPDFTool(rows_per_table=20)._run(str(md_path))
+
+    pdf_path = tmp_path / "policy_retrieval_final.pdf"
+    assert result == f"Success: PDF created at {pdf_path}"
+    assert pdf_path.read_bytes().startswith(b"%PDF")
+
+
+def test_markdown_to_pdf_writes_the_pdf_on_every_call(tmp_path):
+    from internal_audit_validation_system.tools.memo import start_run
+
+    start_run()
+    md_path = tmp_path / "policy_retrieval_final.md"
+    md_path.write_text(_policy_markdown(3), encoding="utf-8")
+    tool = MarkdownToPDFTool()
+
+    tool._run(str(md_path))
+    (tmp_path / "policy_retrieval_final.pdf").unlink()
+    tool._run(str(md_path))
+    other = tool._run(str(md_path), pdf_output_path=str(tmp_path / "copy.pdf"))
+
+    assert (tmp_path / "policy_retrieval_final.pdf").exists()
+    assert other == f"Success: PDF created at {tmp_path / 'copy.pdf'}" and (tmp_path / "copy.pdf").exists()
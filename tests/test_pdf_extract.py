@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from internal_audit_validation_system.tools import pdf_extract
+from internal_audit_validation_system.tools.pdf_extract import _chunks, extract_pages
+
+
+def _pdf(num_pages: int) -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for number in range(1, num_pages + 1):
+        pdf.drawString(72, 720, f"Paragraph {number}: suitability obligations of licensed persons.")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_chunks_cover_pages_in_order():
+    assert _chunks(10, 4) == [(0, 3), (3, 6), (6, 8), (8, 10)]
+    assert _chunks(2, 4) == [(0, 1), (1, 2)]
+
+
+def test_parallel_extraction_matches_serial_order():
+    content = _pdf(24)
+
+    serial, serial_count = extract_pages(content, workers=1)
+    parallel, parallel_count = extract_pages(content, workers=2, min_pages=10)
+
+    assert parallel == serial
+    assert parallel_count == serial_count == 24
+    assert [number for number, _ in parallel] == list(range(1, 25))
+    assert "Paragraph 24" in parallel[-1][1]
+
+
+def test_small_documents_stay_serial(monkeypatch):
+    monkeypatch.setattr(pdf_extract, "_pool", lambda workers: pytest.fail("pool used for a small PDF"))
+
+    pages, num_pages = extract_pages(_pdf(3), workers=8)
+
+    assert num_pages == 3
+    assert "Paragraph 1" in pages[0][1]
+
+
+def test_a_different_worker_count_does_not_replace_a_pool_in_use():
+    content = _pdf(24)
+    pool = pdf_extract._pool(2)
+
+    pages, _ = extract_pages(content, workers=3, min_pages=10)
+
+    assert pdf_extract._pool(2) is pool and pdf_extract._pool(3) is not pool
+    assert pool.submit(pdf_extract._page_count, content).result() == 24
+    assert [number for number, _ in pages] == list(range(1, 25))
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from internal_audit_validation_system.evaluation.criteria import retrieve_policies_checks, run_checks
+from internal_audit_validation_system.policy_table import (
+    PolicyTable,
+    load_policy_table,
+    load_run_tables,
+    parse_markdown_table,
+    sidecar_path,
+    write_sidecar,
+)
+from internal_audit_validation_system.tools.custom_tool import MarkdownToPDFTool
+
+FULL_TABLE = """Consolidated policies:
+
+| Source Name | Section / Clause | Key Excerpt | Relevance to Observation | Document Path / URL | Effective Date | Confidence | Link or Reference |
+|---|---|---|---|---|---|---|---|
+| SFC Code of Conduct | 5.2 | Recommendations must be suitable \\| reasonable. | Suitability gap | https://www.sfc.hk/coc.pdf | 2023-06-12 | High | N/A |
+
+| HKMA SPM SB-1 | 3.1 | Banks should assess product risk. | Risk assessment | [SPM](https://www.hkma.gov.hk/sb-1.pdf) | Unknown | Med | https://www.hkma.gov.hk/sb-1.pdf |
+
+### Top Three Critical Requirements
+- Assess suitability.
+"""
+
+
+def test_parse_maps_columns_by_header():
+    table = parse_markdown_table(FULL_TABLE, "retrieve_relevant_policies")
+
+    assert len(table.rows) == 2
+    assert table.has_columns()
+    first, second = table.rows
+    assert first.key_excerpt == "Recommendations must be suitable | reasonable."
+    assert first.effective_date == "2023-06-12"
+    assert first.url == "https://www.sfc.hk/coc.pdf"
+    assert second.confidence == "Med"
+    assert table.cells()[0][2] == "Key Excerpt"
+
+
+def test_sidecar_round_trip_and_staleness(tmp_path):
+    markdown_path = tmp_path / "policy_retrieval_final.md"
+    markdown_path.write_text(FULL_TABLE)
+
+    path = write_sidecar(markdown_path, FULL_TABLE, "revise_policy_retrieval")
+
+    assert path == sidecar_path(markdown_path) == tmp_path / "policy_retrieval_final.table.json"
+    assert load_policy_table(markdown_path).as_dict() == json.loads(path.read_text())
+
+    markdown_path.write_text(FULL_TABLE.replace("Banks should", "Authorized institutions should"))
+    assert load_policy_table(markdown_path).rows[1].key_excerpt.startswith("Authorized institutions")
+
+    assert write_sidecar(markdown_path, "No relevant policy located", "revise_policy_retrieval") is None
+    assert not path.exists()
+
+
+def test_invalid_sidecar_is_rejected():
+    with pytest.raises(ValueError):
+        PolicyTable.from_dict({"schema_version": 1, "headers": ["Source Name"], "rows": [{"source_name": 3}]})
+    with pytest.raises(ValueError):
+        PolicyTable.from_dict({"schema_version": 1, "headers": ["Owner"], "rows": []})
+
+
+def test_checks_read_the_sidecar_table():
+    sidecar = parse_markdown_table(FULL_TABLE)
+    sidecar.rows = []
+
+    from_markdown = run_checks("retrieve_relevant_policies", FULL_TABLE, retrieve_policies_checks, fast=True)
+    from_sidecar = run_checks(
+        "retrieve_relevant_policies", FULL_TABLE, retrieve_policies_checks, fast=True, policy_table=sidecar
+    )
+
+    assert "table_present" in from_markdown.passed and "table_rows" in from_markdown.passed
+    assert any(check_id == "table_rows" for check_id, _ in from_sidecar.failed)
+
+
+def test_table_present_needs_the_required_headers_as_written(tmp_path):
+    loose = "| Source | Section | Quote | Relevance | Reference |\n|---|---|---|---|---|\n| SFC Code | 5.2 | Be suitable. | Gap | N/A |\n"
+    table = parse_markdown_table(loose)
+    markdown_path = tmp_path / "policy_retrieval_aggregated.md"
+    markdown_path.write_text(loose)
+    write_sidecar(markdown_path, loose)
+
+    assert table.has_columns() and not table.has_columns(exact=True)
+    assert load_policy_table(markdown_path).written_headers == table.written_headers
+    result = run_checks(
+        "retrieve_relevant_policies", loose, retrieve_policies_checks, fast=True, policy_table=load_policy_table(markdown_path)
+    )
+    assert any(check_id == "table_present" for check_id, _ in result.failed)
+    assert parse_markdown_table(FULL_TABLE.replace("Key Excerpt", "key   EXCERPT")).has_columns(exact=True)
+    annotated = parse_markdown_table(FULL_TABLE.replace("Key Excerpt", "Key Excerpt (one sentence max)"))
+    assert annotated.has_columns() and not annotated.has_columns(exact=True)
+
+
+def test_run_tables_and_pdf_rendering_use_sidecars(tmp_path):
+    markdown_path = tmp_path / "policy_retrieval_final.md"
+    markdown_path.write_text(FULL_TABLE)
+    write_sidecar(markdown_path, FULL_TABLE, "revise_policy_retrieval")
+
+    assert list(load_run_tables(tmp_path)) == ["revise_policy_retrieval"]
+    result = MarkdownToPDFTool()._run(markdown_file_path=str(markdown_path))
+    assert result.startswith("Success"), result
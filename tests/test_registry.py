@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from internal_audit_validation_system.evaluation.criteria import TaskEvaluation
+from internal_audit_validation_system.registry import RunRegistry, collect_run, main, token_usage_of
+
+OBSERVATION = "Lack of risk assessment procedures for selling investment products."
+
+
+def _run_dir(output_dir, run_id, days_ago=0, status="completed", reachability_ok=True):
+    run_dir = output_dir / run_id
+    run_dir.mkdir(parents=True)
+    (run_dir / "policy_retrieval_aggregated.md").write_text("| Source Name |\n|---|\n| SFC |\n")
+    (run_dir / "review_report.md").write_text("# Review\n")
+    failed = [] if reachability_ok else [{"id": "url_reachability", "notes": "Row 1: 404"}]
+    (run_dir / "evaluation_partial.json").write_text(
+        json.dumps(
+            {
+                "audit_observation": OBSERVATION,
+                "status": status,
+                "task_results": [
+                    {
+                        "task_name": "retrieve_relevant_policies",
+                        "score": 1.0 if reachability_ok else 0.5,
+                        "passed": ["table_present"],
+                        "failed": failed,
+                        "skipped": [],
+                        "durations": {"table_present": 0.001},
+                    }
+                ],
+            }
+        )
+    )
+    (run_dir / "run_metrics.json").write_text(json.dumps({"token_usage": {"total_tokens": 1200}}))
+    stamp = time.time() - days_ago * 86400
+    for path in run_dir.iterdir():
+        os.utime(path, (stamp, stamp))
+    return run_dir
+
+
+def test_collect_and_query_runs(tmp_path):
+    registry = RunRegistry(tmp_path / "runs.sqlite3")
+    registry.record(collect_run(_run_dir(tmp_path / "output", "20240101_090000", reachability_ok=False)))
+    registry.record(
+        collect_run(
+            _run_dir(tmp_path / "output", "20990101_090000"),
+            observation="Other observation",
+            evaluations=[TaskEvaluation("review_compliance_analysis", passed=["has_summary"], score=1.0)],
+            token_usage={"prompt_tokens": 10, "total_tokens": 15},
+        )
+    )
+
+    runs = registry.runs(observation="  lack of RISK assessment procedures for selling investment products. ")
+    assert [run["run_id"] for run in runs] == ["20240101_090000"]
+    assert runs[0]["total_tokens"] == 1200 and runs[0]["successful"] == 0
+    assert len(registry.runs(observation="risk assessment", contains=True)) == 1
+
+    failing = registry.failing("url_reachability")
+    assert [(row["run_id"], row["notes"]) for row in failing] == [("20240101_090000", "Row 1: 404")]
+    assert registry.failing("url_reachability", since=time.time() - 30 * 86400) == []
+
+    run = registry.run("20990101_090000")
+    assert run["total_tokens"] == 15
+    assert {output["task_name"] for output in run["outputs"]} == {"retrieve_relevant_policies", "review_compliance_analysis"}
+    assert run["checks"] == [
+        {"task_name": "review_compliance_analysis", "check_id": "has_summary", "status": "passed", "notes": None, "duration": None}
+    ]
+    assert registry.output("20990101_090000", "review_compliance_analysis") == "# Review\n"
+
+
+def test_recording_a_run_twice_replaces_it(tmp_path):
+    registry = RunRegistry(tmp_path / "runs.sqlite3")
+    record = collect_run(_run_dir(tmp_path / "output", "20240101_090000"))
+    registry.record(record)
+    registry.record(record)
+
+    assert len(registry.runs()) == 1
+    assert len(registry.run("20240101_090000")["checks"]) == 1
+
+
+def test_cli_backfills_and_answers_queries(tmp_path, capsys):
+    output_dir = tmp_path / "output"
+    _run_dir(output_dir, "20240101_090000", reachability_ok=False)
+    _run_dir(output_dir, "20240102_090000", status="aborted")
+    (output_dir / "not-a-run").mkdir()
+    database = str(tmp_path / "runs.sqlite3")
+
+    assert main(["--registry", database, "index", str(output_dir)]) == 0
+    assert "Indexed 2 run(s)" in capsys.readouterr().out
+
+    main(["--registry", database, "failing", "url_reachability"])
+    out = capsys.readouterr().out
+    assert "20240101_090000" in out and "20240102_090000" not in out
+
+    main(["--registry", database, "--json", "list", "--status", "aborted"])
+    assert [run["run_id"] for run in json.loads(capsys.readouterr().out)] == ["20240102_090000"]
+
+
+def test_token_usage_from_crew_output():
+    usage = SimpleNamespace(model_dump=lambda: {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5})
+
+    assert token_usage_of(SimpleNamespace(token_usage=usage)) == {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+    assert token_usage_of(None) == {}
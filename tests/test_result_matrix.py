@@ -0,0 +1,110 @@
+import json
+import time
+
+import numpy as np
+
+from internal_audit_validation_system.evaluation.criteria import EvaluateResult, TaskEvaluation
+from internal_audit_validation_system.evaluation.matrix import FAILED, NOT_RUN, PASSED, ResultMatrix
+from internal_audit_validation_system.evaluation.runner import main as runner_main
+
+
+def _result(table_ok=True, review_ok=True):
+    retrieve = TaskEvaluation(
+        "retrieve_relevant_policies",
+        passed=["table_present"] + (["table_rows"] if table_ok else []),
+        failed=[] if table_ok else [("table_rows", "Only 0 row(s) detected in policy table.")],
+        score=1.0 if table_ok else 0.5,
+        skipped=["url_reachability"],
+    )
+    review = TaskEvaluation(
+        "review_compliance_analysis",
+        passed=["has_summary"] if review_ok else [],
+        failed=[] if review_ok else [("has_summary", None)],
+        score=1.0 if review_ok else 0.0,
+    )
+    return EvaluateResult("observation", [retrieve, review])
+
+
+def test_matrix_layout_and_pass_rates():
+    matrix = ResultMatrix.from_results(
+        [_result(), _result(table_ok=False), _result(review_ok=False)], models=["a", "a", "b"], run_ids=["1", "2", "3"]
+    )
+
+    assert matrix.check_ids == ["has_summary", "table_present", "table_rows"]
+    assert matrix.outcomes.shape == (6, 3) and matrix.outcomes.dtype == np.int8
+    assert matrix.outcomes[2].tolist() == [NOT_RUN, PASSED, FAILED]
+    assert matrix.notes == {(2, 2): "Only 0 row(s) detected in policy table."}
+
+    assert matrix.pass_rates()["all"] == {"has_summary": 2 / 3, "table_present": 1.0, "table_rows": 2 / 3}
+    by_task = matrix.pass_rates("task")
+    assert by_task["review_compliance_analysis"] == {"has_summary": 2 / 3}
+    assert matrix.pass_rates("model")["b"] == {"has_summary": 0.0, "table_present": 1.0, "table_rows": 1.0}
+
+    scores = matrix.score_distribution("task")
+    assert scores["retrieve_relevant_policies"]["count"] == 3
+    assert scores["retrieve_relevant_policies"]["mean"] == np.float32(2.5 / 3)
+    assert sum(scores["review_compliance_analysis"]["histogram"]) == 3
+
+
+def test_save_load_round_trip_and_diff(tmp_path):
+    baseline = ResultMatrix.from_results([_result(), _result(table_ok=False)], run_ids=["1", "2"])
+    candidate = ResultMatrix.from_results([_result(table_ok=False), _result()], run_ids=["1", "2"])
+    baseline.save(tmp_path / "baseline.npz")
+    loaded = ResultMatrix.load(tmp_path / "baseline.npz")
+
+    assert loaded.notes == baseline.notes
+    assert (loaded.outcomes == baseline.outcomes).all()
+    report = loaded.diff(candidate)
+    assert report["table_rows"]["delta"] == 0.0
+    assert (report["table_rows"]["regressions"], report["table_rows"]["fixes"]) == (1, 1)
+    assert report["has_summary"]["paired"] == 2
+
+
+def test_diff_of_100k_evaluations_takes_seconds():
+    rows, checks = 100_000, 8
+    rng = np.random.default_rng(7)
+    tasks = rng.integers(0, 3, rows).astype(np.int32)
+
+    def synthetic(pass_probability):
+        return ResultMatrix(
+            check_ids=[f"check_{i}" for i in range(checks)],
+            outcomes=(rng.random((rows, checks)) < pass_probability).astype(np.int8),
+            scores=rng.random(rows).astype(np.float32),
+            task_codes=tasks,
+            task_names=["analyze", "retrieve", "review"],
+            model_codes=np.zeros(rows, dtype=np.int32),
+            models=["model"],
+            run_ids=np.arange(rows).astype(str),
+        )
+
+    baseline, candidate = synthetic(0.9), synthetic(0.8)
+    started = time.perf_counter()
+    report = baseline.diff(candidate)
+    by_task = candidate.pass_rates("task")
+    candidate.score_distribution("task")
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 5.0
+    assert report["check_0"]["paired"] == rows
+    assert abs(report["check_0"]["delta"] + 0.1) < 0.01
+    assert set(by_task) == {"analyze", "retrieve", "review"}
+
+
+def test_runner_writes_matrix(tmp_path, capsys):
+    payload = tmp_path / "payload.json"
+    payload.write_text(
+        json.dumps(
+            [
+                {"audit_observation": "obs", "outputs": {}, "model": "gpt", "run_id": "r1"},
+                {"audit_observation": "obs", "outputs": {}, "run_id": "r2"},
+            ]
+        )
+    )
+
+    runner_main(["--input-json", str(payload), "--fast", "--model", "claude", "--write-matrix", str(tmp_path / "m.npz")])
+    matrix = ResultMatrix.load(tmp_path / "m.npz")
+
+    assert len(matrix) == 6
+    assert matrix.models == ["claude", "gpt"]
+    assert sorted(set(matrix.run_ids.tolist())) == ["r1", "r2"]
+    assert (tmp_path / "m.notes.json").exists()
@@ -0,0 +1,160 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from internal_audit_validation_system.aggregation import merge_tables, render_consolidated
+from internal_audit_validation_system.evaluation.criteria import retrieve_policies_checks, run_checks
+from internal_audit_validation_system.policy_table import PolicyRow, PolicyTable, parse_markdown_table
+from internal_audit_validation_system.revision import (
+    PatchError,
+    apply_patches,
+    parse_findings,
+    parse_patches,
+    render_revision,
+)
+
+TABLE = PolicyTable(
+    task_name="retrieve_relevant_policies",
+    headers=["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Effective Date", "Link or Reference"],
+    rows=[
+        PolicyRow(
+            source_name=f"SFC Code of Conduct {number}",
+            section_clause=f"5.{number}",
+            key_excerpt=excerpt,
+            relevance="Suitability",
+            effective_date="Unknown",
+            link_or_reference="https://www.sfc.hk/coc.pdf",
+        )
+        for number, excerpt in enumerate(
+            [
+                "Recommendations must be suitable.",
+                "Know your client before advising.",
+                "Disclose conflicts of interest.",
+                "Keep records of the assessment.",
+                "Explain product risks to clients.",
+            ],
+            start=1,
+        )
+    ],
+)
+SUMMARY = """### Top Three Critical Requirements
+- Ensure suitability (SFC Code of Conduct, 5.1).
+- Know the client (SFC Code of Conduct, 5.2).
+- Keep records (SFC Code of Conduct, 5.4).
+"""
+
+
+def _answer(patches, summary="Fixed the flagged rows."):
+    return f"```json\n{json.dumps({'patches': patches})}\n```\n\n{summary}"
+
+
+def test_keyed_consolidated_table_parses_and_passes_checks_like_the_plain_one():
+    result = merge_tables([TABLE])
+    keyed = render_consolidated(result, SUMMARY, keyed=True)
+
+    assert "| Key | Source Name |" in keyed and "| R5 | SFC Code of Conduct 5 |" in keyed
+    assert parse_markdown_table(keyed).rows == result.table.rows
+    plain = run_checks("retrieve_relevant_policies", render_consolidated(result, SUMMARY), retrieve_policies_checks, fast=True)
+    evaluation = run_checks("retrieve_relevant_policies", keyed, retrieve_policies_checks, fast=True)
+    assert evaluation.failed == plain.failed
+
+
+def test_findings_are_validated_against_row_keys():
+    review = """Verdict: NEEDS REVISION
+
+```json
+{"verdict": "needs revision", "findings": [
+  {"key": "R4", "column": "effective date", "issue": "Date missing", "fix": "Use 2023-04-01"},
+  {"key": "R2", "issue": "Duplicate of R1"},
+  {"key": null, "issue": "No HKMA coverage"}
+], "gaps": ["HKMA SPM SB-1"]}
+```"""
+    findings = parse_findings(review, TABLE)
+
+    assert findings.verdict == "NEEDS REVISION"
+    assert findings.flagged_keys == ["R2", "R4"]
+    assert findings.findings[0].column == "Effective Date"
+    assert findings.gaps == ["HKMA SPM SB-1"]
+    with pytest.raises(PatchError, match="'R9' is not a row key"):
+        parse_findings(review.replace('"R4"', '"R9"'), TABLE)
+
+
+def test_patches_touch_only_the_flagged_rows():
+    patches = parse_patches(
+        _answer(
+            [
+                {"op": "modify", "key": "R4", "fields": {"Effective Date": "2023-04-01"}, "reason": "date"},
+                {"op": "delete", "key": "r2", "reason": "duplicate"},
+                {
+                    "op": "add",
+                    "fields": {
+                        "Source Name": "HKMA SPM SB-1",
+                        "Section / Clause": "3.1",
+                        "Key Excerpt": "Banks should assess product risk.",
+                        "confidence": "High",
+                    },
+                },
+            ]
+        )
+    )
+    result = apply_patches(TABLE, patches, "revise_policy_retrieval")
+
+    rows = result.table.rows
+    assert [row.source_name for row in rows] == [
+        "SFC Code of Conduct 1", "SFC Code of Conduct 3", "SFC Code of Conduct 4", "SFC Code of Conduct 5", "HKMA SPM SB-1",
+    ]
+    assert rows[2] == PolicyRow(**{**TABLE.rows[3].__dict__, "effective_date": "2023-04-01"})
+    assert rows[0] is TABLE.rows[0] and rows[3] is TABLE.rows[4]
+    assert result.table.headers[-2:] == ["Confidence", "Link or Reference"]
+    assert result.change_log == "**Revision:** 1 modified (R4), 1 deleted (R2), 1 added relative to the consolidated table."
+
+    markdown = render_revision(result, _answer([], "Fixed the flagged rows."))
+    assert parse_markdown_table(markdown).rows == rows
+    assert "```" not in markdown and markdown.rstrip().endswith("Fixed the flagged rows.")
+
+
+def test_invalid_patches_are_reported_together():
+    patches = parse_patches(
+        _answer(
+            [
+                {"op": "delete", "key": "R7"},
+                {"op": "modify", "key": "R1", "fields": {"Confidence": "High"}},
+                {"op": "delete", "key": "R1"},
+                {"op": "add", "fields": {"Source Name": "Circular"}},
+            ]
+        )
+    )
+
+    with pytest.raises(PatchError) as error:
+        apply_patches(TABLE, patches)
+    assert str(error.value).splitlines() == [
+        "Patch 1: 'R7' is not a row key of the table (R1-R5).",
+        "Patch 3: R1 was already modified by an earlier patch.",
+        "Patch 4: an added row needs Section / Clause, Key Excerpt.",
+    ]
+    with pytest.raises(PatchError, match="Unknown column 'Regulator'"):
+        parse_patches(_answer([{"op": "modify", "key": "R1", "fields": {"Regulator": "SFC"}}]))
+    with pytest.raises(PatchError, match="No fenced"):
+        parse_patches("| Source Name | ... |")
+
+
+def test_revision_guardrail_patches_the_stored_consolidated_table(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from internal_audit_validation_system.crew import InternalAuditValidationSystemCrew
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AUDIT_REVISION_MODE", "delta")
+    crew = InternalAuditValidationSystemCrew(timestamp="20250101_093000")
+    aggregated = tmp_path / "output" / "20250101_093000" / "policy_retrieval_aggregated.md"
+    aggregated.parent.mkdir(parents=True)
+    aggregated.write_text(render_consolidated(merge_tables([TABLE]), SUMMARY, keyed=True))
+
+    guardrail = crew.revise_policy_retrieval().guardrail
+    ok, feedback = guardrail(SimpleNamespace(raw=_answer([{"op": "delete", "key": "R9"}])))
+    assert not ok and "'R9' is not a row key" in feedback
+
+    ok, markdown = guardrail(SimpleNamespace(raw=_answer([{"op": "delete", "key": "R5"}])))
+    assert ok
+    assert len(parse_markdown_table(markdown).rows) == 4
+    assert "1 deleted (R5)" in markdown
@@ -0,0 +1,50 @@
+import time
+
+from internal_audit_validation_system.evaluation.criteria import (
+    COST_CPU,
+    COST_IO,
+    CheckDefinition,
+    retrieve_policies_checks,
+    run_checks,
+)
+
+
+def _sleeping_check(check_id: str, seconds: float, cost: str) -> CheckDefinition:
+    def evaluator(output, _):
+        time.sleep(seconds)
+        return True, None
+
+    return CheckDefinition(id=check_id, description=check_id, evaluator=evaluator, cost=cost)
+
+
+def test_io_checks_overlap_with_cpu_checks():
+    checks = [
+        _sleeping_check("io_a", 0.3, COST_IO),
+        _sleeping_check("io_b", 0.3, COST_IO),
+        _sleeping_check("cpu_a", 0.3, COST_CPU),
+    ]
+
+    started = time.perf_counter()
+    result = run_checks("task", "output", checks)
+    elapsed = time.perf_counter() - started
+
+    assert result.passed == ["io_a", "io_b", "cpu_a"]
+    assert elapsed < 0.8
+    assert set(result.as_dict()["durations"]) == {"io_a", "io_b", "cpu_a"}
+
+
+def test_fast_mode_runs_only_cpu_checks():
+    sample_output = """| Source Name | Section / Clause | Key Excerpt | Relevance to Observation | Link or Reference |
+|-------------|-----------------|-------------|--------------------------|-------------------|
+| HKMA Guideline | 1.1 | Enforces risk controls. | Demonstrates regulatory requirement. | https://unreachable.invalid |
+
+### Top Three Critical Requirements
+- Maintain documented backup procedures.
+- Perform periodic risk assessments.
+- Evidence regulatory compliance to HKMA and SFC.
+"""
+    result = run_checks("retrieve_relevant_policies", sample_output, retrieve_policies_checks, fast=True)
+
+    assert result.skipped == ["url_reachability", "excerpt_verification"]
+    assert "url_reachability" not in result.durations
+    assert result.score == 1.0
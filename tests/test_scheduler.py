@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from internal_audit_validation_system.scheduler import TaskGraph
+
+LATENCY = 0.1
+
+NEEDS = {
+    "retrieve_hkma_policies": [],
+    "retrieve_sfc_policies": [],
+    "retrieve_relevant_policies": ["retrieve_hkma_policies", "retrieve_sfc_policies"],
+    "reflect_policy_retrieval": ["retrieve_relevant_policies"],
+    "revise_policy_retrieval": ["retrieve_relevant_policies", "reflect_policy_retrieval"],
+    "analyze_compliance_status": ["revise_policy_retrieval"],
+    "prepare_peer_review_package": ["analyze_compliance_status"],
+    "reflection_of_compliance_status": ["analyze_compliance_status", "prepare_peer_review_package"],
+    "review_compliance_analysis": ["analyze_compliance_status"],
+}
+
+
+def test_graph_is_validated_and_staged():
+    graph = TaskGraph.build(list(NEEDS), NEEDS)
+
+    assert graph.stages() == [
+        ["retrieve_hkma_policies", "retrieve_sfc_policies"],
+        ["retrieve_relevant_policies"],
+        ["reflect_policy_retrieval"],
+        ["revise_policy_retrieval"],
+        ["analyze_compliance_status"],
+        ["prepare_peer_review_package", "review_compliance_analysis"],
+        ["reflection_of_compliance_status"],
+    ]
+    with pytest.raises(ValueError, match="cycle between: a, b"):
+        TaskGraph.build(["a", "b", "c"], {"a": ["b"], "b": ["a"]})
+    with pytest.raises(ValueError, match="'b' needs z, which the crew does not run"):
+        TaskGraph.build(["a", "b"], {"b": ["z"]})
+
+
+def test_independent_tasks_run_concurrently_but_never_on_the_same_agent():
+    graph = TaskGraph.build(list(NEEDS), NEEDS)
+    # The last three tasks share one agent here, so they run one after another
+    senior = ["prepare_peer_review_package", "reflection_of_compliance_status", "review_compliance_analysis"]
+    agents = dict.fromkeys(senior, "senior")
+    running, overlaps, finished = set(), [], []
+    lock = threading.Lock()
+
+    def execute(name):
+        with lock:
+            overlaps.append({name, *running})
+            running.add(name)
+        time.sleep(LATENCY)
+        with lock:
+            running.discard(name)
+        return name.upper()
+
+    started = time.perf_counter()
+    results = graph.run(execute, resource=lambda name: agents.get(name, name), on_done=lambda name, _: finished.append(name))
+    elapsed = time.perf_counter() - started
+
+    assert results == {name: name.upper() for name in NEEDS}
+    # Seven stages, plus one because the review waits for the agent instead of running beside the peer package
+    assert 8 * LATENCY <= elapsed < 9 * LATENCY
+    assert {"retrieve_hkma_policies", "retrieve_sfc_policies"} in overlaps
+    assert all(len(seen & set(senior)) <= 1 for seen in overlaps)
+    assert finished[:2] == ["retrieve_hkma_policies", "retrieve_sfc_policies"] and finished[-3:] == senior
+
+
+def test_failure_stops_the_schedule():
+    graph = TaskGraph.build(["a", "b", "c"], {"c": ["a"]})
+    ran = []
+
+    def execute(name):
+        ran.append(name)
+        if name == "a":
+            raise TimeoutError("deadline")
+        time.sleep(LATENCY)
+        return name
+
+    with pytest.raises(TimeoutError):
+        graph.run(execute, done={})
+    assert "c" not in ran
+
+
+def test_crew_runs_the_full_pipeline_as_a_graph(monkeypatch):
+    pytest.importorskip("crewai")
+    from crewai import Task
+    from crewai.tasks.task_output import TaskOutput
+
+    from internal_audit_validation_system.crew import GraphCrew, InternalAuditValidationSystemCrew
+
+    calls = []
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        calls.append((self.name, context))
+        time.sleep(LATENCY)
+        self.output = TaskOutput(description=self.description, raw=f"{self.name} output", agent=agent.role, name=self.name)
+        return self.output
+
+    monkeypatch.setattr(Task, "execute_sync", execute_sync)
+    built = InternalAuditValidationSystemCrew().crew()
+    # The crew's rate limiter runs a non-daemon timer thread
+    built._rpm_controller.stop_rpm_counter()
+    assert isinstance(built, GraphCrew) and [task.name for task in built.tasks] == list(NEEDS)
+
+    started = time.perf_counter()
+    output = built._execute_tasks(built.tasks)
+    elapsed = time.perf_counter() - started
+
+    assert 7 * LATENCY <= elapsed < 8.5 * LATENCY
+    assert [item.name for item in output.tasks_output] == list(NEEDS)
+    assert output.raw == "review_compliance_analysis output"
+    context = dict(calls)
+    assert context["retrieve_hkma_policies"] == ""
+    assert "retrieve_hkma_policies output" in context["retrieve_relevant_policies"]
+    assert "analyze_compliance_status output" in context["reflection_of_compliance_status"]
+    assert "prepare_peer_review_package output" in context["reflection_of_compliance_status"]
+
+    monkeypatch.setenv("AUDIT_PIPELINE", "retrieval")
+    retrieval = InternalAuditValidationSystemCrew().crew()
+    retrieval._rpm_controller.stop_rpm_counter()
+    assert [task.name for task in retrieval.tasks] == list(NEEDS)[:5]
@@ -0,0 +1,73 @@
+import threading
+
+from internal_audit_validation_system.tools.search import (
+    CachedSearchTool,
+    LocalSearchBackend,
+    normalise_query,
+    search_stats,
+)
+
+RESULT = {"organic": [{"title": "Code of Conduct", "link": "https://www.sfc.hk/code.pdf"}]}
+
+
+def _tool(tmp_path, backend, **kwargs):
+    return CachedSearchTool(backend=backend, cache_path=str(tmp_path / "search.sqlite3"), **kwargs)
+
+
+def test_normalise_query_only_folds_case_and_whitespace():
+    assert normalise_query("  SFC suitability\t site:sfc.hk ") == normalise_query("sfc SUITABILITY site:sfc.hk")
+    assert normalise_query("suitability") != normalise_query("suitability site:sfc.hk")
+    assert normalise_query('"suitability obligations"') != normalise_query("suitability obligations")
+    assert normalise_query("SFC suitability") != normalise_query("suitability SFC")
+    assert normalise_query("suitability suitability") != normalise_query("suitability")
+    assert normalise_query('site:"sfc.hk"') != normalise_query("site:sfc.hk")
+
+
+def test_repeated_queries_are_served_from_cache_across_instances(tmp_path):
+    backend = LocalSearchBackend({"sfc suitability": RESULT})
+
+    first = _tool(tmp_path, backend)._run(search_query="SFC suitability")
+    second = _tool(tmp_path, backend)._run(search_query="  sfc  SUITABILITY")
+
+    assert first == second == RESULT
+    assert backend.calls == 1
+
+
+def test_expired_entries_are_refetched(tmp_path):
+    backend = LocalSearchBackend({"kyc": RESULT})
+    tool = _tool(tmp_path, backend, ttl_seconds=0)
+
+    tool._run(search_query="kyc")
+    tool._run(search_query="kyc")
+
+    assert backend.calls == 2
+
+
+def test_concurrent_identical_queries_share_one_backend_call(tmp_path):
+    backend = LocalSearchBackend({"hkma suitability": RESULT}, latency=0.3)
+    tool = _tool(tmp_path, backend)
+    coalesced_before = search_stats().coalesced
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(tool._run(search_query="HKMA suitability")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [RESULT] * 5
+    assert backend.calls == 1
+    assert search_stats().coalesced - coalesced_before == 4
+
+
+def test_quota_exhaustion_serves_stale_result_or_error(tmp_path):
+    backend = LocalSearchBackend({"client assets": RESULT})
+    tool = _tool(tmp_path, backend, monthly_quota=1, ttl_seconds=0)
+
+    assert tool._run(search_query="client assets") == RESULT
+    assert tool._run(search_query="client assets") == RESULT  # stale copy, no backend call
+    assert tool._run(search_query="fund manager code").startswith("Error: monthly search quota")
+    assert backend.calls == 1
@@ -0,0 +1,44 @@
+"""Startup-time guard for the lightweight entry points.
+
+The evaluation runner and ``main`` must import without pulling in crewAI, the
+HTTP stack or the PDF libraries; those load only when a crew or tool runs.
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["crewai", "requests", "reportlab", "PyPDF2", "bs4"]
+IMPORT_BUDGET_SECONDS = 0.25
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe_import(module: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "internal_audit_validation_system.evaluation.runner",
+        "internal_audit_validation_system.main",
+    ],
+)
+def test_lightweight_entry_points_start_fast(module):
+    result = _probe_import(module)
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS, f"{module} took {result['elapsed']:.3f}s to import"
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from internal_audit_validation_system.tools.custom_tool import RobustFileReadTool, SecureWebScraperTool
+from internal_audit_validation_system.tools.http import fetch
+from internal_audit_validation_system.tools.memo import RunMemo, start_run
+
+
+@pytest.fixture
+def memo():
+    return start_run()
+
+
+@pytest.fixture
+def regulator_site():
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            time.sleep(0.2)
+            body = b"<html><body><h1>Code of Conduct</h1><p>Know your client.</p></body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+
+def test_run_memo_serves_repeats_and_skips_errors():
+    memo = RunMemo()
+    calls = []
+
+    assert memo.call("tool:x", {"a": 1}, lambda: calls.append(1) or "ok") == "ok"
+    assert memo.call("tool:x", {"a": 1}, lambda: calls.append(1) or "ok") == "ok"
+    memo.call("tool:x", {"a": 2}, lambda: calls.append(1) or "Error: boom")
+    memo.call("tool:x", {"a": 2}, lambda: calls.append(1) or "Error: boom")
+
+    assert len(calls) == 3
+    assert memo.as_dict()["memo_hits"] == 1
+
+
+def test_concurrent_fetches_share_one_download(memo, regulator_site):
+    base_url, hits = regulator_site
+    threads = [threading.Thread(target=fetch, args=(f"{base_url}/code",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert hits == ["/code"]
+    stats = memo.as_dict()["by_namespace"]["http:get"]
+    assert stats["coalesced"] + stats["memo_hits"] == 3
+
+
+def test_repeated_scrapes_hit_the_network_once(memo, regulator_site):
+    base_url, hits = regulator_site
+    tool = SecureWebScraperTool()
+
+    first = tool._run(website_url=f"{base_url}/conduct")
+    second = tool._run(f"{base_url}/conduct")
+
+    assert "Know your client." in first
+    assert first == second
+    assert hits == ["/conduct"]
+
+
+def test_file_reads_are_memoized_until_the_file_changes(memo, tmp_path):
+    path = tmp_path / "policy.md"
+    path.write_text("version one")
+    tool = RobustFileReadTool()
+
+    assert tool._run(file_path=str(path)) == "version one"
+    assert tool._run(file_path=str(path)) == "version one"
+    path.write_text("version two!")
+    os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+
+    assert tool._run(file_path=str(path)) == "version two!"
+    assert memo.as_dict()["memo_hits"] == 1
@@ -0,0 +1,122 @@
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from internal_audit_validation_system.aggregation import merge_tables, render_consolidated
+from internal_audit_validation_system.policy_table import PolicyRow, PolicyTable
+from internal_audit_validation_system.revision import parse_findings
+from internal_audit_validation_system.verification import RowVerifier, provenance_findings
+
+LATENCY = 0.2
+
+TABLE = PolicyTable(
+    task_name="retrieve_relevant_policies",
+    headers=["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Effective Date", "Link or Reference"],
+    rows=[
+        PolicyRow(
+            source_name=f"SFC Circular {number}",
+            section_clause=f"{number}.1",
+            key_excerpt=f"Obligation number {number} applies to every intermediary without exception.",
+            relevance="Suitability",
+            effective_date="2023-01-01" if number != 7 else "Unknown",
+            link_or_reference=f"https://www.sfc.hk/circular-{number}.pdf",
+        )
+        for number in range(1, 13)
+    ],
+)
+
+
+class FakeModel:
+    """Flags Section / Clause of every row whose number is divisible by four."""
+
+    def __init__(self, fail_on=None):
+        self.prompts = []
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        time.sleep(LATENCY)
+        keys = re.findall(r"^\| (R\d+) \|", prompt, re.MULTILINE)
+        if self.fail_on in keys:
+            return "I cannot help with that."
+        findings = [
+            {"key": key, "column": "Section / Clause", "issue": "Citation is too broad.", "fix": "Cite the paragraph."}
+            for key in keys
+            if int(key[1:]) % 4 == 0
+        ]
+        # A wandering finding about a row outside the group is ignored
+        findings.append({"key": "R1", "issue": "Unrelated"} if "R1" not in keys else {"key": keys[0], "issue": "x"})
+        return "```json\n" + json.dumps({"findings": findings}) + "\n```"
+
+
+def test_row_groups_are_verified_concurrently_under_the_throttle():
+    model, throttled = FakeModel(), []
+    verifier = RowVerifier(model, throttle=lambda: throttled.append(1), group_size=3)
+
+    started = time.perf_counter()
+    result = verifier.verify(TABLE, "Lack of risk assessment procedures")
+    elapsed = time.perf_counter() - started
+
+    assert len(model.prompts) == len(throttled) == 4
+    # Serially this would take 4 * LATENCY
+    assert elapsed < 2.5 * LATENCY
+    assert "| R4 | SFC Circular 4 |" in model.prompts[1] and "| R1 |" not in model.prompts[1]
+    findings = result.findings
+    assert findings.verdict == "NEEDS REVISION"
+    assert findings.flagged_keys == ["R1", "R4", "R7", "R8", "R12"]
+    assert [finding.issue for finding in findings.findings if finding.key == "R7"] == ["Effective date is missing."]
+
+
+def test_rendered_review_round_trips_through_the_reflection_format():
+    result = RowVerifier(FakeModel(fail_on="R5"), group_size=3).verify(TABLE, "observation")
+
+    review = result.render()
+    assert review.startswith("1) Verdict: NEEDS REVISION")
+    assert result.unverified == ["R4", "R5", "R6"]
+    assert "R5: Could not be verified automatically" in review
+    parsed = parse_findings(review, TABLE)
+    assert parsed.findings == result.findings.findings
+
+
+def test_clean_table_passes_without_findings():
+    clean = PolicyTable(headers=TABLE.headers, rows=[row for row in TABLE.rows if row.effective_date != "Unknown"][:3])
+
+    result = RowVerifier(lambda prompt: '{"findings": []}').verify(clean, "observation")
+
+    assert provenance_findings(clean) == []
+    assert result.findings.verdict == "PASS" and result.groups == 1
+
+
+def test_fan_out_reviewer_replaces_the_reflection_agent_loop(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from internal_audit_validation_system.crew import FanOutReviewer, InternalAuditValidationSystemCrew
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AUDIT_REVISION_MODE", "delta")
+    monkeypatch.setenv("AUDIT_REFLECTION_ENGINE", "fanout")
+    crew = InternalAuditValidationSystemCrew(timestamp="20250101_093000")
+    aggregated = tmp_path / "output" / "20250101_093000" / "policy_retrieval_aggregated.md"
+    aggregated.parent.mkdir(parents=True)
+    aggregated.write_text(render_consolidated(merge_tables([TABLE]), "- summary"))
+
+    task = crew.reflect_policy_retrieval()
+    reviewer = task.agent
+    assert isinstance(reviewer, FanOutReviewer)
+    built = crew.crew()
+    # The crew's rate limiter runs a non-daemon timer thread
+    built._rpm_controller.stop_rpm_counter()
+    assert any(agent is reviewer for agent in built.agents)
+
+    model = FakeModel()
+    monkeypatch.setattr(reviewer.llm, "call", lambda messages: model(messages[0]["content"]))
+    review = reviewer.execute_task(task)
+
+    assert len(model.prompts) == 4
+    ok, _ = task.guardrail(SimpleNamespace(raw=review))
+    assert ok
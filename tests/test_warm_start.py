@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+from internal_audit_validation_system.policy_table import PolicyRow, PolicyTable
+from internal_audit_validation_system.registry import RunRecord, RunRegistry, TaskOutputRecord
+from internal_audit_validation_system.warm_start import SEED, SKIP, ObservationIndex, WarmStart, find_warm_start
+
+OBSERVATION = "Lack of risk assessment procedures for selling investment products."
+FINAL = PolicyTable(
+    task_name="revise_policy_retrieval",
+    headers=["Source Name", "Section / Clause", "Key Excerpt", "Relevance to Observation", "Confidence", "Link or Reference"],
+    rows=[
+        PolicyRow(
+            source_name="HKMA SPM SB-1",
+            section_clause="Paragraph 3.1",
+            key_excerpt="Banks should assess product risk.",
+            relevance="Risk assessment",
+            confidence="High",
+            link_or_reference="https://www.hkma.gov.hk/sb-1.pdf",
+        ),
+        PolicyRow(
+            source_name="SFC Code of Conduct",
+            section_clause="5.2",
+            key_excerpt="Recommendations must be suitable.",
+            relevance="Suitability",
+            confidence="High",
+            link_or_reference="https://www.sfc.hk/code.pdf",
+        ),
+    ],
+)
+SUMMARY = "### Top Three Critical Requirements\n\n- Assess product risk (HKMA, SB-1, 3.1)"
+
+
+def _record(registry, run_id, observation, status="completed", final=FINAL.to_markdown()):
+    registry.record(
+        RunRecord(
+            run_id=run_id,
+            observation=observation,
+            status=status,
+            started_at=time.time(),
+            outputs=[
+                TaskOutputRecord("retrieve_relevant_policies", f"{FINAL.to_markdown()}\n\n{SUMMARY}\n"),
+                TaskOutputRecord("revise_policy_retrieval", final),
+            ],
+        )
+    )
+
+
+def test_index_ranks_paraphrases_above_unrelated_observations():
+    index = ObservationIndex(
+        [
+            "Inadequate anti-money laundering screening of new corporate customers.",
+            "Risk assessment of investment products was not performed before sale.",
+            "Backup tapes for the core banking system are not tested.",
+        ]
+    )
+
+    position, score = index.best(OBSERVATION)
+    assert position == 1 and score > 0.5
+    assert index.similarity(OBSERVATION, 2) < 0.35
+    assert index.best(index.observations[0]) == (0, pytest.approx(1.0))
+    assert ObservationIndex([]).best(OBSERVATION) is None
+
+
+def test_find_warm_start_picks_mode_by_similarity(tmp_path, monkeypatch):
+    registry = RunRegistry(tmp_path / "runs.sqlite3")
+    _record(registry, "20240101_090000", OBSERVATION)
+    _record(registry, "20240102_090000", "Risk assessment of investment products was not performed before sale.")
+    _record(registry, "20240103_090000", "Backup tapes are not tested.", status="aborted")
+    _record(registry, "20240104_090000", "Backup tapes for the core banking system are not tested.", final="No table")
+
+    skip = find_warm_start("lack of risk assessment procedures for selling investment products", registry)
+    assert skip.mode == SKIP and skip.run_id == "20240101_090000"
+    assert skip.summary == SUMMARY and len(skip.table.rows) == 2
+    assert [row.source_name for row in skip.seed_table("retrieve_sfc_policies").rows] == ["SFC Code of Conduct"]
+
+    seed = find_warm_start("Investment products sold without a risk assessment being performed.", registry)
+    assert seed.mode == SEED and seed.run_id == "20240102_090000"
+    # Aborted runs and outputs without a table are not indexed
+    assert find_warm_start("Backup tapes are not tested.", registry) is None
+
+    monkeypatch.setenv("AUDIT_WARM_START", "off")
+    assert find_warm_start(OBSERVATION, registry) is None
+
+
+def test_crew_skips_or_seeds_retrieval(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    from crewai import Task
+    from crewai.tasks.task_output import TaskOutput
+
+    from internal_audit_validation_system.crew import InternalAuditValidationSystemCrew
+
+    contexts = {}
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        contexts[self.name] = context
+        self.output = TaskOutput(description=self.description, raw=f"{self.name} output", agent=agent.role, name=self.name)
+        return self.output
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AUDIT_PIPELINE", "retrieval")
+    monkeypatch.setattr(Task, "execute_sync", execute_sync)
+    skip = WarmStart(SKIP, "20240101_090000", OBSERVATION, 0.95, FINAL, SUMMARY)
+    built = InternalAuditValidationSystemCrew(timestamp="20240201_090000", warm_start=skip).crew()
+    built._rpm_controller.stop_rpm_counter()
+
+    assert [task.name for task in built.tasks] == [
+        "retrieve_relevant_policies",
+        "reflect_policy_retrieval",
+        "revise_policy_retrieval",
+    ]
+    output = built._execute_tasks(built.tasks)
+    assert list(contexts) == ["reflect_policy_retrieval", "revise_policy_retrieval"]
+    assert "https://www.sfc.hk/code.pdf" in contexts["reflect_policy_retrieval"]
+    assert output.tasks_output[0].raw.strip().endswith(SUMMARY)
+    consolidated = tmp_path / "output" / "20240201_090000" / "policy_retrieval_aggregated.md"
+    assert "HKMA SPM SB-1" in consolidated.read_text()
+
+    seed = WarmStart(SEED, "20240101_090000", OBSERVATION, 0.7, FINAL, SUMMARY)
+    seeded = InternalAuditValidationSystemCrew(warm_start=seed).crew()
+    seeded._rpm_controller.stop_rpm_counter()
+    hkma, sfc = seeded.tasks[:2]
+    assert "HKMA SPM SB-1" in hkma.description and "SFC Code of Conduct" not in hkma.description
+    assert "SFC Code of Conduct" in sfc.description